@@ -16,6 +16,8 @@
 """Init file for android_env package."""
 
 from android_env import loader
+from android_env import vector_env
 
 load = loader.load
 load_remote = loader.load_remote
+VectorAndroidEnv = vector_env.VectorAndroidEnv
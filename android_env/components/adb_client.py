@@ -0,0 +1,258 @@
+# coding=utf-8
+# vim: set tabstop=2 shiftwidth=2:
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A client speaking the smart-socket protocol of the adb server directly."""
+
+import os
+import posixpath
+import socket
+import stat
+import struct
+import time
+
+#from absl import logging
+import logging
+from android_env.components import errors
+
+logger = logging.getLogger("mobile_env.adb_controller.client")
+
+_OKAY = b'OKAY'
+_FAIL = b'FAIL'
+# The sync service packets are an id and a little-endian uint32.
+_SYNC_HEADER = struct.Struct('<4sI')
+_SYNC_STAT = struct.Struct('<4sIII')
+_SYNC_DATA_MAX = 64 * 1024
+# The id of the transport replied to `host:tport:`.
+_TRANSPORT_ID = struct.Struct('<Q')
+_ROOT_POLL_INTERVAL = 0.1
+
+
+class AdbClient():
+  """Talks to the adb server without spawning adb client processes.
+
+  Each request opens a new connection to the server, as the server closes it
+  once the requested device service ends. Errors raised before the service
+  starts are `errors.AdbServerRequestError`, thus the request can be retried
+  safely in another way. Errors afterwards are raised as they are, e.g.,
+  `socket.timeout`.
+  """
+
+  def __init__(self, host: str = '127.0.0.1', port: int = 5037):
+    """Initializes the client.
+
+    Args:
+      host: Host of the adb server.
+      port: Port of the adb server.
+    """
+
+    self._host = host
+    self._port = port
+
+  def shell(self, serial: str, command: str, timeout: float) -> bytes:
+    """Runs `command` through `shell:` and returns its output."""
+    with self._open(serial, 'shell:' + command, timeout) as connection:
+      return _read_all(connection)
+
+  def root(self, serial: str, timeout: float) -> bytes:
+    """Restarts adbd as root.
+
+    As the `adb root` binary, it returns only after the device has
+    disconnected and come back, thus the following commands don't hit the
+    dropped transport.
+    """
+    deadline = time.monotonic() + timeout
+    connection = self._request(
+        'host:tport:serial:' + serial if serial else 'host:tport:any', timeout)
+    try:
+      transport_id, = _TRANSPORT_ID.unpack(
+          _read_exactly(connection, _TRANSPORT_ID.size))
+      _send_request(connection, 'root:')
+      _read_status(connection)
+      output = _read_all(connection)
+    except errors.AdbServerRequestError:
+      connection.close()
+      raise
+    except OSError as error:
+      connection.close()
+      raise errors.AdbServerRequestError(
+          'Service root: failed: {!r}'.format(error)) from error
+    connection.close()
+    if b'already running as root' in output:
+      return output
+
+    # The transport of the old adbd is gone once its id is refused.
+    while True:
+      try:
+        self._request('host:transport-id:{:d}'.format(transport_id),
+                      timeout).close()
+      except errors.AdbServerRequestError:
+        break
+      if time.monotonic() > deadline:
+        raise socket.timeout('adbd did not restart in time.')
+      time.sleep(_ROOT_POLL_INTERVAL)
+    with self._request(
+        self._host_prefix(serial) + 'wait-for-any-device',
+        max(deadline - time.monotonic(), _ROOT_POLL_INTERVAL)) as connection:
+      _read_status(connection)
+    logger.debug('adbd restarted as root on %s', serial or 'any')
+    return output
+
+  def forward(self, serial: str, local: str, remote: str,
+              timeout: float) -> bytes:
+    """Forwards `local` to `remote` on the device.
+
+    Returns:
+      The allocated port followed by a newline for `tcp:0`, as `adb forward`
+      prints, otherwise empty bytes.
+    """
+    with self._request(
+        self._host_prefix(serial) + 'forward:{:};{:}'.format(local, remote),
+        timeout) as connection:
+      # The first OKAY accepts the request and the second one is the result.
+      _read_status(connection)
+      if local == 'tcp:0':
+        return _read_protocol_string(connection) + b'\n'
+      return b''
+
+  def remove_forward(self, serial: str, local: str, timeout: float) -> None:
+    with self._request(
+        self._host_prefix(serial) + 'killforward:' + local,
+        timeout) as connection:
+      _read_status(connection)
+
+  def push(self, serial: str, src: str, dest: str, timeout: float) -> None:
+    """Pushes the local file `src` to `dest` through `sync:`.
+
+    If `dest` is a directory on the device, the file is pushed into it.
+    """
+    src_stat = os.stat(src)
+    with self._open(serial, 'sync:', timeout) as connection:
+      try:
+        dest_mode = _sync_stat(connection, dest)
+        if dest.endswith('/') or stat.S_ISDIR(dest_mode):
+          dest = posixpath.join(dest, os.path.basename(src))
+
+        path_and_mode = '{:},{:d}'.format(dest, src_stat.st_mode).encode()
+        connection.sendall(
+            _SYNC_HEADER.pack(b'SEND', len(path_and_mode)) + path_and_mode)
+        with open(src, 'rb') as f:
+          for chunk in iter(lambda: f.read(_SYNC_DATA_MAX), b''):
+            connection.sendall(_SYNC_HEADER.pack(b'DATA', len(chunk)) + chunk)
+        connection.sendall(_SYNC_HEADER.pack(b'DONE', int(src_stat.st_mtime)))
+
+        reply, length = _SYNC_HEADER.unpack(
+            _read_exactly(connection, _SYNC_HEADER.size))
+        if reply != _OKAY:
+          message = _read_exactly(connection, length)
+          raise errors.AdbServerRequestError(
+              'Failed to push {:} to {:}: {:}'.format(
+                  src, dest, message.decode('utf-8', 'replace')))
+      except (OSError, struct.error) as error:
+        # Pushing is idempotent, thus it can be done again in another way.
+        raise errors.AdbServerRequestError(
+            'Failed to push {:}: {!r}'.format(src, error)) from error
+      connection.sendall(_SYNC_HEADER.pack(b'QUIT', 0))
+
+  def _host_prefix(self, serial: str) -> str:
+    return 'host-serial:{:}:'.format(serial) if serial else 'host:'
+
+  def _request(self, service: str, timeout: float) -> socket.socket:
+    """Connects to the server and sends a host request."""
+    try:
+      connection = socket.create_connection((self._host, self._port),
+                                            timeout=timeout)
+    except OSError as error:
+      raise errors.AdbServerRequestError(
+          'Failed to connect to the adb server: {!r}'.format(error)) from error
+    try:
+      _send_request(connection, service)
+      _read_status(connection)
+    except errors.AdbServerRequestError:
+      connection.close()
+      raise
+    except OSError as error:
+      connection.close()
+      raise errors.AdbServerRequestError(
+          'Request {:} failed: {!r}'.format(service, error)) from error
+    return connection
+
+  def _open(self, serial: str, service: str, timeout: float) -> socket.socket:
+    """Opens a device service through the transport of `serial`."""
+    connection = self._request(
+        'host:transport:' + serial if serial else 'host:transport-any',
+        timeout)
+    try:
+      _send_request(connection, service)
+      _read_status(connection)
+    except errors.AdbServerRequestError:
+      connection.close()
+      raise
+    except OSError as error:
+      connection.close()
+      raise errors.AdbServerRequestError(
+          'Service {:} failed: {!r}'.format(service, error)) from error
+    logger.debug('Opened adb service %s on %s', service, serial or 'any')
+    return connection
+
+
+def _send_request(connection: socket.socket, request: str) -> None:
+  payload = request.encode('utf-8')
+  connection.sendall(b'%04x' % len(payload) + payload)
+
+
+def _read_exactly(connection: socket.socket, size: int) -> bytes:
+  chunks = []
+  while size > 0:
+    chunk = connection.recv(min(size, _SYNC_DATA_MAX))
+    if not chunk:
+      raise ConnectionResetError('Connection closed by the adb server.')
+    chunks.append(chunk)
+    size -= len(chunk)
+  return b''.join(chunks)
+
+
+def _read_all(connection: socket.socket) -> bytes:
+  chunks = []
+  for chunk in iter(lambda: connection.recv(_SYNC_DATA_MAX), b''):
+    chunks.append(chunk)
+  return b''.join(chunks)
+
+
+def _read_protocol_string(connection: socket.socket) -> bytes:
+  return _read_exactly(connection, int(_read_exactly(connection, 4), 16))
+
+
+def _read_status(connection: socket.socket) -> None:
+  status = _read_exactly(connection, 4)
+  if status == _OKAY:
+    return
+  message = _read_protocol_string(connection) if status == _FAIL else status
+  raise errors.AdbServerRequestError(
+      'adb server refused the request: {:}'.format(
+          message.decode('utf-8', 'replace')))
+
+
+def _sync_stat(connection: socket.socket, path: str) -> int:
+  """Returns the mode of `path` on the device, 0 if it doesn't exist."""
+  encoded_path = path.encode('utf-8')
+  connection.sendall(_SYNC_HEADER.pack(b'STAT', len(encoded_path)) +
+                     encoded_path)
+  reply, mode, _, _ = _SYNC_STAT.unpack(
+      _read_exactly(connection, _SYNC_STAT.size))
+  if reply != b'STAT':
+    raise errors.AdbServerRequestError(
+        'Unexpected sync reply {!r}'.format(reply))
+  return mode
@@ -32,19 +32,24 @@
 
 """A class to manage and control an external ADB process."""
 
+import hashlib
 import os
 import pathlib
 import re
+import socket
+import struct
 import subprocess
 import sys
 import threading
 import time
+import uuid
 from typing import List, Tuple, Dict
 from typing import Optional, Sequence
 import lxml.etree
 
 #from absl import logging
 import logging
+from android_env.components import adb_client
 from android_env.components import errors
 from android_env.proto import adb_pb2
 import pexpect
@@ -55,6 +60,21 @@ _MAX_INIT_RETRIES = 20
 _INIT_RETRY_SLEEP_SEC = 2.0
 
 _DEFAULT_TIMEOUT_SECONDS = 120.0
+_VIEW_HIERARCHY_REQUEST = b'DUMP\n'
+
+_ACCEPTED_KEY_CODES = { 'KEYCODE_HOME'
+                      , 'KEYCODE_BACK'
+                      , 'KEYCODE_ENTER' # '\n', '\r'
+                      , "KEYCODE_DEL" # '\b'
+                      , "KEYCODE_ESCAPE" # '\e'
+                      , "KEYCODE_TAB" # '\t'
+                      , "KEYCODE_GRAVE" # '`'
+                      , "KEYCODE_PASTE"
+                      }
+
+
+class _Unsupported(Exception):
+  """Raised for a command to send through the adb binary instead."""
 
 
 class AdbController():
@@ -68,7 +88,10 @@ class AdbController():
                default_timeout: float = _DEFAULT_TIMEOUT_SECONDS,
                #frida_server: Optional[str] = None,
                frida: Optional[str] = None,
-               frida_script: Optional[str] = None):
+               frida_script: Optional[str] = None,
+               view_hierarchy_socket: Optional[str] = None,
+               adb_server_protocol: bool = False,
+               max_num_shells: int = 4):
     """Instantiates an AdbController object.
 
     Args:
@@ -80,6 +103,24 @@ class AdbController():
       #frida_server: Path to the frida_server executable on the Android device.
       frida: Path to the frida binary executable on the host machine
       frida_script: Path to the frida script on the host machine
+      view_hierarchy_socket: Optional device socket of a long-lived view
+        hierarchy service, given in the `adb forward` syntax, e.g.,
+        `tcp:9008` or `localabstract:vh_dump`. The service is expected to
+        answer each `DUMP\\n` request with the length of the XML as a 4-byte
+        big-endian unsigned integer followed by the XML itself. If it is not
+        set or not reachable, `uiautomator dump` is used.
+      adb_server_protocol: Whether to send the shell, push, install,
+        uninstall, root and forward commands to the adb server through its
+        socket protocol directly, rather than through the adb binary (or the
+        pexpect shell for shell commands). The other commands, and any command
+        the adb server refuses, still go through the adb binary. Note that the
+        output of the shell commands then comes without a pty, thus the line
+        endings are LF rather than the CRLF of the pexpect shell. Off by
+        default for the compatibility of the callers parsing the output.
+      max_num_shells: Maximum number of the pexpect shells running shell
+        commands at the same time. Commands issued from different threads are
+        not serialized, thus a slow command doesn't hold the others back.
+        Commands from one thread are still executed in order.
     """
 
     self._device_name = device_name
@@ -93,10 +134,23 @@ class AdbController():
     if self._frida and self._frida_script:
       self._frida_processes: Dict[str, subprocess.Popen] = {}
 
+    self._view_hierarchy_socket: Optional[str] = view_hierarchy_socket
+    self._view_hierarchy_port: Optional[int] = None
+    self._view_hierarchy_connection: Optional[socket.socket] = None
+    self._view_hierarchy_lock = threading.Lock()
+    # (digest of the raw dump, parsed tree) of the last view hierarchy
+    self._last_view_hierarchy: Optional[Tuple[bytes, lxml.etree.Element]] = None
+
+    self._adb_client: Optional[adb_client.AdbClient] = adb_client.AdbClient(
+        port=adb_server_port) if adb_server_protocol else None
+
     self._platform_sys = sys.platform
+    # Only serializes the subclasses talking through a single channel, e.g.,
+    # RemoteAdbController.
     self._execute_command_lock = threading.Lock()
-    self._adb_shell = None
-    self._shell_is_ready = False
+    self._shell_semaphore = threading.BoundedSemaphore(max_num_shells)
+    self._idle_shells_lock = threading.Lock()
+    self._idle_shells: List[pexpect.spawn] = []
     # Unset problematic environment variables. ADB commands will fail if these
     # are set. They are normally exported by AndroidStudio.
     if 'ANDROID_HOME' in os.environ:
@@ -136,8 +190,8 @@ class AdbController():
     timeout - float or None
     """
 
+    # Both the server protocol and the adb binary return after adbd restarts.
     self._execute_command(["root"], timeout=timeout)
-    time.sleep(0.2)
     #if self._prompt.endswith(r"\$"):
       #self._prompt = self._prompt[:-2] + "#"
     #self._init_shell()
@@ -162,11 +216,8 @@ class AdbController():
   def close(self) -> None:
     """Closes internal threads and processes."""
     logger.info('Closing ADB controller...')
-    if self._adb_shell is not None:
-      logger.info('Killing ADB shell')
-      self._adb_shell.close(force=True)
-      self._adb_shell = None
-      self._shell_is_ready = False
+    self._close_idle_shells()
+    self._close_view_hierarchy_channel(remove_forward=True)
     logger.info('Done closing ADB controller.')
     if hasattr(self, "_frida_processes"):
       for prcss in self._frida_processes.values():
@@ -190,9 +241,12 @@ class AdbController():
     Returns:
       The output of running such command as a string, None if it fails.
     """
-    # The lock here prevents commands from multiple threads from messing up the
-    # output from this AdbController object.
-    with self._execute_command_lock:
+    # Each command gets its own channel, i.e., a connection to the adb server,
+    # an adb process or a pexpect shell from the pool, thus commands from
+    # multiple threads don't mess up the output of each other.
+    try:
+      adb_output = self._execute_server_command(args, timeout=timeout)
+    except _Unsupported:
       if self._platform_sys == 'win32':
         adb_output = self._execute_normal_command(args, timeout=timeout)
       elif args and args[0] == 'shell':
@@ -202,6 +256,101 @@ class AdbController():
     logger.debug('ADB output: %s', adb_output)
     return adb_output
 
+  def _execute_server_command(
+      self,
+      args: List[str],
+      timeout: Optional[float] = None) -> Optional[bytes]:
+    """Executes `adb args` through the protocol of the adb server.
+
+    Raises:
+      _Unsupported: If the command should go through the adb binary
+        instead, i.e., the command isn't supported here, or the adb server
+        refused it before the command started.
+    """
+
+    if self._adb_client is None or not args:
+      raise _Unsupported()
+    timeout = self._resolve_timeout(timeout)
+    command, options = args[0], args[1:]
+    logger.info('Executing ADB command through the server: %s', args)
+
+    try:
+      if command == 'shell':
+        # A connection dropped by the server is retried once over a new one,
+        # as the pexpect shell is reinitialized on failures.
+        for num_tries in range(2):
+          try:
+            return self._adb_client.shell(
+                self._device_name, ' '.join(options), timeout)
+          except socket.timeout as error:
+            logger.exception('Shell command timed out.')
+            raise errors.AdbControllerPexpectError() from error
+          except OSError as error:
+            if num_tries == 0:
+              logger.warning('Shell connection dropped: %r. Retrying.', error)
+              continue
+            logger.exception('Shell connection dropped again.')
+            raise errors.AdbControllerPexpectError() from error
+      if command == 'root' and not options:
+        return self._adb_client.root(self._device_name, timeout)
+      if command == 'push' and len(options) == 2:
+        self._adb_client.push(self._device_name, options[0], options[1],
+                              timeout)
+        return b''
+      if command == 'forward' and len(options) == 2:
+        if options[0] == '--remove':
+          self._adb_client.remove_forward(self._device_name, options[1],
+                                          timeout)
+          return b''
+        if not options[0].startswith('-'):
+          return self._adb_client.forward(self._device_name, options[0],
+                                          options[1], timeout)
+      if command == 'install' and options\
+          and all(opt in ('-r', '-t', '-g', '-d') for opt in options[:-1]):
+        return self._install_through_server(options[-1], options[:-1], args,
+                                            timeout)
+      if command == 'uninstall' and len(options) == 1:
+        return self._check_package_manager_output(
+            self._adb_client.shell(self._device_name,
+                                   'pm uninstall ' + options[0], timeout),
+            args)
+    except errors.AdbServerRequestError:
+      logger.warning('ADB server refused %s. Fall back to the adb binary.',
+                     args, exc_info=True)
+      raise _Unsupported()
+    except socket.timeout as error:
+      raise subprocess.TimeoutExpired(self.command_prefix() + args,
+                                      timeout) from error
+    except OSError as error:
+      logger.exception('Connection to the adb server dropped during %s.', args)
+      raise errors.AdbControllerPexpectError() from error
+    raise _Unsupported()
+
+  def _install_through_server(self, local_apk_path: str, flags: List[str],
+                              args: List[str], timeout: float) -> bytes:
+    """Installs an apk as the legacy `adb install`: push and `pm install`."""
+    remote_path = '/data/local/tmp/mobile_env_{:}.apk'.format(uuid.uuid4().hex)
+    self._adb_client.push(self._device_name, local_apk_path, remote_path,
+                          timeout)
+    try:
+      output = self._adb_client.shell(
+          self._device_name,
+          ' '.join(['pm', 'install'] + flags + [remote_path]), timeout)
+    finally:
+      self._adb_client.shell(self._device_name, 'rm -f ' + remote_path,
+                             timeout)
+    return self._check_package_manager_output(output, args)
+
+  def _check_package_manager_output(self, output: bytes,
+                                    args: List[str]) -> bytes:
+    # `pm` reports failures in the output, while `adb install` and
+    # `adb uninstall` exit with an error then.
+    if b'Success' not in output:
+      logger.error('Failed to execute ADB command %s: %r', args, output)
+      raise subprocess.CalledProcessError(1, self.command_prefix() + args,
+                                          output)
+    return output
+
   def _execute_normal_command(
       self,
       args: List[str],
@@ -230,35 +379,55 @@ class AdbController():
     """Execute shell command."""
 
     timeout = self._resolve_timeout(timeout)
-    if not self._shell_is_ready:
-      self._init_shell(timeout=timeout)
     shell_args = ' '.join(args)
     logger.info('Executing ADB shell command: %s', shell_args)
 
-    num_tries = 0
-    while num_tries < max_num_retries:
-      num_tries += 1
-      try:
-        self._adb_shell.sendline(shell_args)
-        self._adb_shell.expect(self._prompt, timeout=timeout)
-        logger.info('Done executing ADB shell command: %s', shell_args)
-        output = self._adb_shell.before.partition('\n'.encode('utf-8'))[2]
-        return output
-      except (pexpect.exceptions.EOF, pexpect.exceptions.TIMEOUT):
-        logger.exception('Shell command failed. Reinitializing the shell.')
-        logger.warning('self._adb_shell.before: %r', self._adb_shell.before)
-        self._init_shell(timeout=timeout)
+    with self._shell_semaphore:
+      with self._idle_shells_lock:
+        adb_shell = self._idle_shells.pop() if self._idle_shells else None
+      if adb_shell is None:
+        adb_shell = self._init_shell(timeout=timeout)
+
+      num_tries = 0
+      while num_tries < max_num_retries:
+        num_tries += 1
+        try:
+          adb_shell.sendline(shell_args)
+          adb_shell.expect(self._prompt, timeout=timeout)
+          logger.info('Done executing ADB shell command: %s', shell_args)
+          output = adb_shell.before.partition('\n'.encode('utf-8'))[2]
+          with self._idle_shells_lock:
+            self._idle_shells.append(adb_shell)
+          return output
+        except (pexpect.exceptions.EOF, pexpect.exceptions.TIMEOUT):
+          logger.exception('Shell command failed. Reinitializing the shell.')
+          logger.warning('adb_shell.before: %r', adb_shell.before)
+          adb_shell.close(force=True)
+          adb_shell = self._init_shell(timeout=timeout)
+      adb_shell.close(force=True)
 
     logger.exception('Reinitializing the shell did not solve the issue.')
     raise errors.AdbControllerPexpectError()
 
-  def _init_shell(self, timeout: Optional[float] = None) -> None:
+  def _close_idle_shells(self) -> None:
+    with self._idle_shells_lock:
+      idle_shells = self._idle_shells
+      self._idle_shells = []
+    if idle_shells:
+      logger.info('Killing %d ADB shells', len(idle_shells))
+    for adb_shell in idle_shells:
+      adb_shell.close(force=True)
+
+  def _init_shell(self, timeout: Optional[float] = None) -> pexpect.spawn:
     """Starts an ADB shell process.
 
     Args:
       timeout: A timeout to use for this operation. If not set the default
         timeout set on the constructor will be used.
 
+    Returns:
+      The started shell with its first prompt consumed.
+
     Raises:
         errors.AdbControllerShellInitError when adb shell cannot be initialized.
     """
@@ -270,20 +439,22 @@ class AdbController():
     num_tries = 0
     while num_tries < _MAX_INIT_RETRIES:
       num_tries += 1
+      adb_shell = None
       try:
         logger.info('Spawning ADB shell...')
-        self._adb_shell = pexpect.spawn(command, use_poll=True, timeout=timeout)
+        adb_shell = pexpect.spawn(command, use_poll=True, timeout=timeout)
         # Setting this to None prevents a 50ms wait for each sendline.
-        self._adb_shell.delaybeforesend = None
-        self._adb_shell.delayafterread = None
+        adb_shell.delaybeforesend = None
+        adb_shell.delayafterread = None
         logger.info('Done spawning ADB shell. Consuming first prompt...')
-        self._adb_shell.expect(self._prompt, timeout=timeout)
+        adb_shell.expect(self._prompt, timeout=timeout)
         logger.info('Done consuming first prompt.')
-        self._shell_is_ready = True
-        return
+        return adb_shell
       except (pexpect.ExceptionPexpect, ValueError) as e:
         logger.exception(e)
-        logger.error('self._adb_shell.before: %r', self._adb_shell.before)
+        if adb_shell is not None:
+          logger.error('adb_shell.before: %r', adb_shell.before)
+          adb_shell.close(force=True)
         logger.error('Could not start ADB shell. Try %r of %r.',
                       num_tries, _MAX_INIT_RETRIES)
         time.sleep(_INIT_RETRY_SLEEP_SEC)
@@ -483,14 +654,45 @@ class AdbController():
     """
     timeout - floating or None
 
-    return lxml.etree.Element or None
+    return lxml.etree.Element or None. if the raw dump is identical to the
+      last one, the last parsed tree is returned again, thus the returned tree
+      shouldn't be modified (modify a `copy.deepcopy` of it instead) and an
+      unchanged view hierarchy can be told through the identity of the
+      tree.
     """
 
-    try:
-      view_hierarchy_output = self._execute_command(["shell", "uiautomator", "dump", "/dev/stdout"], timeout=timeout)
-    except errors.AdbControllerPexpectError:
-      logger.exception("View Hierarchy Acquistion Error!")
-      return None
+    return self.parse_view_hierarchy(self.dump_view_hierarchy(timeout=timeout))
+    #  }}} method `get_view_hierarchy` # 
+
+  def dump_view_hierarchy(self, timeout=None) -> Optional[bytes]:
+    #  method `dump_view_hierarchy` {{{ # 
+    """
+    timeout - floating or None
+
+    return bytes or None as the raw view hierarchy dump
+    """
+
+    view_hierarchy_output: Optional[bytes] = None
+    if self._view_hierarchy_socket is not None:
+      view_hierarchy_output = self._fetch_view_hierarchy(timeout=timeout)
+    if view_hierarchy_output is None:
+      try:
+        view_hierarchy_output = self._execute_command(["shell", "uiautomator", "dump", "/dev/stdout"], timeout=timeout)
+      except errors.AdbControllerPexpectError:
+        logger.exception("View Hierarchy Acquistion Error!")
+        return None
+    return view_hierarchy_output
+    #  }}} method `dump_view_hierarchy` # 
+
+  def parse_view_hierarchy(self, view_hierarchy_output: Optional[bytes])\
+      -> Optional[lxml.etree.Element]:
+    #  method `parse_view_hierarchy` {{{ # 
+    """
+    view_hierarchy_output - bytes or None as the raw dump, e.g., from
+      `dump_view_hierarchy`
+
+    return lxml.etree.Element or None, the same as `get_view_hierarchy`
+    """
 
     #logging.info("Got View Hierarchy Output")
     if view_hierarchy_output:
@@ -502,15 +704,134 @@ class AdbController():
           else view_hierarchy_output
       #logging.info("Fetched View Hierarchy XML: {:}".format(view_hierarchy_output.decode("utf-8")))
       logger.info("Fetched View Hierarchy XML")
+
+      digest: bytes = hashlib.blake2b(view_hierarchy_output, digest_size=16).digest()
+      last_view_hierarchy = self._last_view_hierarchy
+      if last_view_hierarchy is not None and last_view_hierarchy[0]==digest:
+        logger.debug("View Hierarchy Unchanged")
+        return last_view_hierarchy[1]
+
       try:
         root = lxml.etree.fromstring(view_hierarchy_output)
         #logging.info("Parsed View Hierarchy XML")
+        self._last_view_hierarchy = (digest, root)
       except lxml.etree.XMLSyntaxError:
         logger.exception("View Hierarchy XML Parsing Error!")
         root = None
       return root
     return None
-    #  }}} method `get_view_hierarchy` # 
+    #  }}} method `parse_view_hierarchy` # 
+
+  def _fetch_view_hierarchy(self,
+                            timeout: Optional[float] = None) -> Optional[bytes]:
+    """Fetches the view hierarchy XML from the long-lived device service.
+
+    A broken connection is re-established once, e.g., after the device is
+    restored from a snapshot.
+
+    Args:
+      timeout: A timeout to use for this operation. If not set the default
+        timeout set on the constructor will be used.
+
+    Returns:
+      The XML as bytes, None if the service is not reachable.
+    """
+    timeout = self._resolve_timeout(timeout)
+    with self._view_hierarchy_lock:
+      for _ in range(2):
+        try:
+          if self._view_hierarchy_connection is None:
+            self._open_view_hierarchy_channel(timeout=timeout)
+          connection = self._view_hierarchy_connection
+          connection.settimeout(timeout)
+          connection.sendall(_VIEW_HIERARCHY_REQUEST)
+          length, = struct.unpack('>I', self._receive_exactly(connection, 4))
+          return self._receive_exactly(connection, length)
+        except (OSError, subprocess.SubprocessError, ValueError):
+          logger.warning('View hierarchy channel failed.', exc_info=True)
+          self._close_view_hierarchy_channel()
+    logger.warning('Falling back to uiautomator dump.')
+    return None
+
+  def _open_view_hierarchy_channel(self, timeout: float) -> None:
+    if self._view_hierarchy_port is None:
+      # `adb forward tcp:0` allocates a free local port and prints it.
+      output = self._execute_command(
+          ['forward', 'tcp:0', self._view_hierarchy_socket], timeout=timeout)
+      self._view_hierarchy_port = int((output or b'').strip())
+      logger.info('Forwarded view hierarchy channel %s to local port %d',
+                  self._view_hierarchy_socket, self._view_hierarchy_port)
+    self._view_hierarchy_connection = socket.create_connection(
+        ('127.0.0.1', self._view_hierarchy_port), timeout=timeout)
+
+  def _close_view_hierarchy_channel(self, remove_forward: bool = False) -> None:
+    if self._view_hierarchy_connection is not None:
+      self._view_hierarchy_connection.close()
+      self._view_hierarchy_connection = None
+    if remove_forward and self._view_hierarchy_port is not None:
+      try:
+        self._execute_command(
+            ['forward', '--remove', 'tcp:%d' % self._view_hierarchy_port])
+      except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        logger.exception('Failed to remove the view hierarchy forwarding.')
+      self._view_hierarchy_port = None
+
+  def _receive_exactly(self, connection: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+      chunk = connection.recv(min(size, 1 << 16))
+      if not chunk:
+        raise ConnectionResetError('View hierarchy channel closed.')
+      chunks.append(chunk)
+      size -= len(chunk)
+    return b''.join(chunks)
+
+  def save_snapshot(self, name: str, timeout: Optional[float] = None) -> bool:
+    """Saves an emulator snapshot through the emulator console.
+
+    Args:
+      name: Name of the snapshot.
+      timeout: A timeout to use for this operation. If not set the default
+        timeout set on the constructor will be used.
+
+    Returns:
+      True if the snapshot is saved.
+    """
+    return self._execute_snapshot_command('save', name, timeout=timeout)
+
+  def load_snapshot(self, name: str, timeout: Optional[float] = None) -> bool:
+    """Restores an emulator snapshot through the emulator console.
+
+    The device is rolled back as a whole, thus the idle shells are dropped and
+    will be re-initialized by the next shell commands.
+
+    Args:
+      name: Name of the snapshot.
+      timeout: A timeout to use for this operation. If not set the default
+        timeout set on the constructor will be used.
+
+    Returns:
+      True if the snapshot is restored.
+    """
+    loaded = self._execute_snapshot_command('load', name, timeout=timeout)
+    if loaded:
+      self._close_idle_shells()
+    return loaded
+
+  def _execute_snapshot_command(self,
+                                operation: str,
+                                name: str,
+                                timeout: Optional[float] = None) -> bool:
+    try:
+      output = self._execute_command(
+          ['emu', 'avd', 'snapshot', operation, name], timeout=timeout)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+      return False
+    # The console answers "OK" on success and "KO: reason" on failure.
+    if not output or b'KO' in output:
+      logger.error('Failed to %s snapshot %s: %r', operation, name, output)
+      return False
+    return True
 
   def get_activity_dumpsys(self,
                            package_name: str,
@@ -746,16 +1067,29 @@ class AdbController():
       The output of running such command as a string, None if it fails.
     """
 
-    accepted_key_codes = { 'KEYCODE_HOME'
-                         , 'KEYCODE_BACK'
-                         , 'KEYCODE_ENTER' # '\n', '\r'
-                         , "KEYCODE_DEL" # '\b'
-                         , "KEYCODE_ESCAPE" # '\e'
-                         , "KEYCODE_TAB" # '\t'
-                         , "KEYCODE_GRAVE" # '`'
-                         , "KEYCODE_PASTE"
-                         }
-    assert key_code in accepted_key_codes, ('Rejected keycode: %r' % key_code)
+    assert key_code in _ACCEPTED_KEY_CODES, ('Rejected keycode: %r' % key_code)
 
     return self._execute_command(['shell', 'input', 'keyevent', key_code],
                                  timeout=timeout)
+
+  def input_keys(self,
+                 key_codes: Sequence[str],
+                 timeout: Optional[float] = None) -> Optional[bytes]:
+    """Presses several keyboard keys in order through one `input keyevent`.
+
+    Args:
+      key_codes: The keyboard keys to press, each accepted by `input_key`.
+      timeout: Optional time limit in seconds.
+
+    Returns:
+      The output of running such command as a string, None if it fails.
+    """
+
+    for key_code in key_codes:
+      assert key_code in _ACCEPTED_KEY_CODES, (
+          'Rejected keycode: %r' % key_code)
+    if not key_codes:
+      return b''
+
+    return self._execute_command(
+        ['shell', 'input', 'keyevent'] + list(key_codes), timeout=timeout)
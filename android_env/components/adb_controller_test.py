@@ -16,6 +16,9 @@
 """Tests for android_env.components.adb_controller."""
 
 import os
+import socket
+import struct
+import threading
 import time
 
 from absl.testing import absltest
@@ -208,6 +211,41 @@ class AdbControllerTest(parameterized.TestCase):
     # string, NOT bytes.
     self.assertEqual(activity_dumpsys, 'My awesome dumpsys output!!!')
 
+  def test_save_snapshot(self):
+    self._mock_execute_command.return_value = b'OK\r\n'
+    self.assertTrue(
+        self._adb_controller.save_snapshot('my_snapshot', timeout=_TIMEOUT))
+    self._mock_execute_command.assert_called_once_with(
+        self._adb_controller,
+        ['emu', 'avd', 'snapshot', 'save', 'my_snapshot'], _TIMEOUT)
+
+  def test_load_snapshot_failed(self):
+    self._mock_execute_command.return_value = b'KO: snapshot not found\r\n'
+    self.assertFalse(
+        self._adb_controller.load_snapshot('my_snapshot', timeout=_TIMEOUT))
+    self._mock_execute_command.assert_called_once_with(
+        self._adb_controller,
+        ['emu', 'avd', 'snapshot', 'load', 'my_snapshot'], _TIMEOUT)
+
+  def test_view_hierarchy_reused_if_unchanged(self):
+    self._mock_execute_command.return_value = b'<hierarchy><node /></hierarchy>'
+    first = self._adb_controller.get_view_hierarchy(timeout=_TIMEOUT)
+    self.assertIs(first,
+                  self._adb_controller.get_view_hierarchy(timeout=_TIMEOUT))
+
+    self._mock_execute_command.return_value = b'<hierarchy />'
+    second = self._adb_controller.get_view_hierarchy(timeout=_TIMEOUT)
+    self.assertIsNot(first, second)
+    self.assertEmpty(second)
+
+  def test_parse_dumped_view_hierarchy(self):
+    # A dump fetched elsewhere shares the cache of `get_view_hierarchy`.
+    self._mock_execute_command.return_value = b'<hierarchy><node /></hierarchy>'
+    first = self._adb_controller.get_view_hierarchy(timeout=_TIMEOUT)
+    self.assertIs(first, self._adb_controller.parse_view_hierarchy(
+        b'<hierarchy><node /></hierarchy>\n'))
+    self.assertIsNone(self._adb_controller.parse_view_hierarchy(None))
+
   def test_input_tap(self):
     self._mock_execute_command.return_value = b''
     self._adb_controller.input_tap(123, 456, timeout=_TIMEOUT)
@@ -238,6 +276,18 @@ class AdbControllerTest(parameterized.TestCase):
     self.assertRaises(AssertionError, self._adb_controller.input_key,
                       'KEYCODE_0')
 
+  def test_input_keys(self):
+    self._mock_execute_command.return_value = b''
+    self._adb_controller.input_keys(['KEYCODE_DEL', 'KEYCODE_PASTE'],
+                                    timeout=_TIMEOUT)
+    self._mock_execute_command.assert_called_once_with(
+        self._adb_controller,
+        ['shell', 'input', 'keyevent', 'KEYCODE_DEL', 'KEYCODE_PASTE'],
+        _TIMEOUT)
+
+    self.assertRaises(AssertionError, self._adb_controller.input_keys,
+                      ['KEYCODE_DEL', 'KEYCODE_0'])
+
   def test_install_apk(self):
     self._mock_execute_command.return_value = b''
     # Passing an invalid path should raise an exception.
@@ -384,6 +434,215 @@ package:baz
     mock_sleep.assert_called_once()
 
 
+class AdbControllerViewHierarchyTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._server = socket.create_server(('127.0.0.1', 0))
+    self.addCleanup(self._server.close)
+    self._mock_execute_command = self.enter_context(
+        mock.patch.object(
+            adb_controller.AdbController, '_execute_command', autospec=True))
+    self._adb_controller = adb_controller.AdbController(
+        adb_path='my_adb',
+        device_name='awesome_device',
+        prompt_regex='l33t>',
+        view_hierarchy_socket='localabstract:vh')
+
+  def _serve(self, xml: bytes, num_requests: int):
+    def serve():
+      connection, _ = self._server.accept()
+      with connection:
+        for _ in range(num_requests):
+          connection.recv(5)
+          connection.sendall(struct.pack('>I', len(xml)) + xml)
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+  def test_view_hierarchy_from_channel(self):
+    port = self._server.getsockname()[1]
+    self._mock_execute_command.return_value = str(port).encode()
+    thread = self._serve(b'<hierarchy><node /></hierarchy>', num_requests=2)
+
+    for _ in range(2):
+      root = self._adb_controller.get_view_hierarchy(timeout=_TIMEOUT)
+      self.assertEqual('hierarchy', root.tag)
+    thread.join(_TIMEOUT)
+    # The port is forwarded once and the connection is kept.
+    self._mock_execute_command.assert_called_once_with(
+        self._adb_controller, ['forward', 'tcp:0', 'localabstract:vh'],
+        _TIMEOUT)
+
+  def test_view_hierarchy_falls_back_to_uiautomator(self):
+    port = self._server.getsockname()[1]
+    self._server.close()
+    self._mock_execute_command.side_effect = [
+        str(port).encode(), b'<hierarchy />\nUI hierchary dumped']
+    root = self._adb_controller.get_view_hierarchy(timeout=_TIMEOUT)
+    self.assertEqual('hierarchy', root.tag)
+    self._mock_execute_command.assert_called_with(
+        self._adb_controller,
+        ['shell', 'uiautomator', 'dump', '/dev/stdout'], timeout=_TIMEOUT)
+
+
+class AdbControllerServerProtocolTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._server = socket.create_server(('127.0.0.1', 0))
+    self.addCleanup(self._server.close)
+    self._adb_controller = adb_controller.AdbController(
+        adb_path='my_adb',
+        device_name='awesome_device',
+        adb_server_port=self._server.getsockname()[1],
+        prompt_regex='l33t>',
+        adb_server_protocol=True,
+        default_timeout=_TIMEOUT)
+    self._mock_execute_shell_command = self.enter_context(
+        mock.patch.object(
+            self._adb_controller, '_execute_shell_command', autospec=True))
+
+  def _serve(self, output: bytes):
+    requests = []
+    def serve():
+      connection, _ = self._server.accept()
+      with connection:
+        for _ in range(2):
+          length = int(connection.recv(4), 16)
+          requests.append(connection.recv(length))
+          connection.sendall(b'OKAY')
+        connection.sendall(output)
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread, requests
+
+  def _serve_dropped(self, outputs):
+    """Serves a connection per output, resetting those given as None."""
+    def serve():
+      for output in outputs:
+        connection, _ = self._server.accept()
+        with connection:
+          for _ in range(2):
+            length = int(connection.recv(4), 16)
+            connection.recv(length)
+            connection.sendall(b'OKAY')
+          if output is not None:
+            connection.sendall(output)
+            continue
+          connection.sendall(b'Hel')
+          # Closing with a zero linger time resets the connection.
+          connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                                struct.pack('ii', 1, 0))
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+  def test_shell_command_retried_if_connection_dropped(self):
+    thread = self._serve_dropped([None, b'Hello\n'])
+    output = self._adb_controller._execute_command(
+        ['shell', 'echo', 'Hello'], timeout=_TIMEOUT)
+    thread.join(_TIMEOUT)
+    self.assertEqual(b'Hello\n', output)
+    self._mock_execute_shell_command.assert_not_called()
+
+  def test_shell_command_fails_if_connection_dropped_again(self):
+    thread = self._serve_dropped([None, None])
+    with self.assertRaises(errors.AdbControllerPexpectError):
+      self._adb_controller._execute_command(
+          ['shell', 'echo', 'Hello'], timeout=_TIMEOUT)
+    thread.join(_TIMEOUT)
+    self._mock_execute_shell_command.assert_not_called()
+
+  def test_shell_command_through_server(self):
+    thread, requests = self._serve(b'Hello\n')
+    output = self._adb_controller._execute_command(
+        ['shell', 'echo', 'Hello'], timeout=_TIMEOUT)
+    thread.join(_TIMEOUT)
+    self.assertEqual(b'Hello\n', output)
+    self.assertEqual(
+        [b'host:transport:awesome_device', b'shell:echo Hello'], requests)
+    self._mock_execute_shell_command.assert_not_called()
+
+  def test_falls_back_if_server_unreachable(self):
+    self._server.close()
+    self._mock_execute_shell_command.return_value = b'Hello\n'
+    output = self._adb_controller._execute_command(
+        ['shell', 'echo', 'Hello'], timeout=_TIMEOUT)
+    self.assertEqual(b'Hello\n', output)
+    self._mock_execute_shell_command.assert_called_once_with(
+        ['echo', 'Hello'], timeout=_TIMEOUT)
+
+  def _serve_script(self, script):
+    """Serves a connection per item of `script`, a list of the replies to
+    send after each request."""
+    requests = []
+    def serve():
+      for replies in script:
+        connection, _ = self._server.accept()
+        with connection:
+          for reply in replies:
+            length = int(connection.recv(4), 16)
+            requests.append(connection.recv(length))
+            connection.sendall(reply)
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread, requests
+
+  def test_root_waits_for_device(self):
+    transport_id = struct.pack('<Q', 7)
+    thread, requests = self._serve_script([
+        [b'OKAY' + transport_id, b'OKAYrestarting adbd as root\n'],
+        # The old transport is still there at the first poll.
+        [b'OKAY'],
+        [b'FAIL0010no such transport'],
+        [b'OKAYOKAY'],
+    ])
+    output = self._adb_controller._execute_command(['root'], timeout=_TIMEOUT)
+    thread.join(_TIMEOUT)
+    self.assertEqual(b'restarting adbd as root\n', output)
+    self.assertEqual([
+        b'host:tport:serial:awesome_device',
+        b'root:',
+        b'host:transport-id:7',
+        b'host:transport-id:7',
+        b'host-serial:awesome_device:wait-for-any-device',
+    ], requests)
+
+  def test_root_already_root(self):
+    thread, requests = self._serve_script([
+        [b'OKAY' + struct.pack('<Q', 7),
+         b'OKAYadbd is already running as root\n'],
+    ])
+    output = self._adb_controller._execute_command(['root'], timeout=_TIMEOUT)
+    thread.join(_TIMEOUT)
+    self.assertEqual(b'adbd is already running as root\n', output)
+    self.assertEqual([b'host:tport:serial:awesome_device', b'root:'], requests)
+
+  def test_errors_of_server_commands_not_hidden(self):
+    with mock.patch.object(
+        self._adb_controller._adb_client, 'root', autospec=True,
+        side_effect=NotImplementedError()):
+      with self.assertRaises(NotImplementedError):
+        self._adb_controller._execute_command(['root'], timeout=_TIMEOUT)
+
+  def test_commands_not_serialized(self):
+    # Both commands have to be running at the same time to pass the barrier.
+    barrier = threading.Barrier(2, timeout=_TIMEOUT)
+    self._mock_execute_shell_command.side_effect = lambda *_, **__: str(
+        barrier.wait()).encode()
+    self._server.close()
+    outputs = []
+    thread = threading.Thread(
+        target=lambda: outputs.append(self._adb_controller._execute_command(
+            ['shell', 'uiautomator', 'dump'], timeout=_TIMEOUT)))
+    thread.start()
+    outputs.append(self._adb_controller._execute_command(
+        ['shell', 'input', 'keyevent', 'KEYCODE_BACK'], timeout=_TIMEOUT))
+    thread.join(_TIMEOUT)
+    self.assertCountEqual([b'0', b'1'], outputs)
+
+
 class AdbControllerInitTest(absltest.TestCase):
 
   def test_deletes_problem_env_vars(self):
@@ -32,10 +32,11 @@
 
 """Coordinator handles interaction between internal components of AndroidEnv."""
 
+import concurrent.futures
 import copy
 import socket
 import time
-from typing import Any, Optional, Iterable, Union
+from typing import Any, Optional, Iterable, Union, Set
 from typing import Dict, Tuple, List, OrderedDict
 import collections
 
@@ -43,6 +44,7 @@ import collections
 import logging
 from android_env.components import action_type as action_type_lib
 from android_env.components import errors
+from android_env.components import logcat_thread
 from android_env.components import specs
 from android_env.components import task_manager as task_manager_lib
 from android_env.components.simulators import base_simulator
@@ -51,6 +53,7 @@ import numpy as np
 import lxml.etree
 import itertools
 import shlex
+import re
 
 logger = logging.getLogger("mobile_env.coordinator")
 
@@ -90,6 +93,9 @@ class Coordinator():
               , screen_check_control_value: Optional[Union[float, int]] = 1.
               , max_cached_task_managers: int = 40
               , restart_simulator_at_reset: bool = False
+              , snapshot_reset: bool = False
+              , pipeline_requests: bool = True
+              , batch_steps: bool = True
   ):
     #  method `__init__` {{{ # 
     """Handles communication between AndroidEnv and its components.
@@ -125,15 +131,30 @@ class Coordinator():
 
       max_cached_task_managers (int): the Coordinator can hold multiple
         TaskManagers so that they can be quickly switched. the default number
-        is 40. however, TaskManager also occupies resources (mainly through
-        `adb logcat`), thus, a smaller value will be adequate when resources
-        are limited. meanwhile, usually, in test time, you only need to switch
+        is 40. the cached TaskManagers share a single `adb logcat` reader, yet
+        they still occupy some resources, thus, a smaller value will be
+        adequate when resources are limited. meanwhile, usually, in test time,
+        you only need to switch
         to new tasks without going back. in such cases, you can just set this
         value to 1 to save memories.
       restart_simulator_at_reset (bool): by default, to accelerate task reset,
         simulator is not restarted during `reset`. however, some tasks may need
         a thorough restart to restore the simulator state. in such cases, set
         this flag to True to restart simulator during `reset` automatically.
+      snapshot_reset (bool): if True, the simulator state is saved as a
+        snapshot after the first successful reset of each task, and the
+        following resets of the task restore the snapshot instead of replaying
+        the reset steps. the simulator should support snapshots (e.g.,
+        EmulatorSimulator launched with `snapshot_enabled`), otherwise the
+        reset steps are always replayed.
+      pipeline_requests (bool): if True, the view hierarchy is fetched
+        concurrently with the observation rather than after it, so that a
+        step on a remote simulator costs one round trip less.
+      batch_steps (bool): if True, the actions of a step, the observation and
+        the view hierarchy are requested from the simulator at once through
+        `execute_step`, if the simulator supports it (e.g., RemoteSimulator).
+        Otherwise, or if the simulator doesn't, they are requested
+        separately.
     """
 
     self._simulator: base_simulator.BaseSimulator = simulator
@@ -149,13 +170,25 @@ class Coordinator():
     self._periodic_restart_time_min = periodic_restart_time_min
     self._force_simulator_launch = force_simulator_launch
     self._restart_simulator_at_reset: bool = restart_simulator_at_reset
+    self._snapshot_reset: bool = snapshot_reset
+    self._saved_snapshots: Set[int] = set()
 
     self._with_view_hierarchy: bool = with_view_hierarchy
+    self._last_view_hierarchy: Optional[lxml.etree.Element] = None
     self._vh_check_control_method: EventCheckControl = vh_check_control_method
     self._vh_check_control_value: Number = vh_check_control_value or 0
     self._screen_check_control_method: EventCheckControl = screen_check_control_method
     self._screen_check_control_value: Number = screen_check_control_value or 0
 
+    # the view hierarchy is fetched by a separate adb controller from the
+    # simulator, thus they can be requested at the same time
+    self._batch_steps: bool = batch_steps
+    self._request_executor: Optional[concurrent.futures.ThreadPoolExecutor] =\
+        concurrent.futures.ThreadPoolExecutor( max_workers=1
+                                             , thread_name_prefix="coordinator_request"
+                                             )\
+        if pipeline_requests else None
+
     # Logging settings.
     self._log_dict = {
         'total_steps': 0,
@@ -259,13 +292,58 @@ class Coordinator():
 
     # Reset the task.
     try:
-      self._task_manager.reset_task()
+      if self._snapshot_reset and self._load_task_snapshot():
+        self._task_manager.reset_task(run_reset_steps=False)
+      else:
+        self._task_manager.reset_task()
+        if self._snapshot_reset:
+          self._save_task_snapshot()
       self._simulator.update_device_orientation() # ZDY_COMMENT: device orientation updated only during reset
     except errors.StepCommandError:
       logger.exception('Failed to reset the task. Restarting simulator.')
       self._log_dict['restart_count_simulator_reset'] += 1
       self._should_restart = True
 
+  def _snapshot_name(self, index: int) -> str:
+    task_id: str = self._task_manager_list[index].task().id
+    return "mobile-env-{:d}-{:}".format(index, re.sub(r"[^\w.-]", "_", task_id))
+
+  def _save_task_snapshot(self):
+    #  method _save_task_snapshot {{{ # 
+    if self._task_manager_index in self._saved_snapshots:
+      return
+    if self._simulator.save_snapshot(self._snapshot_name(self._task_manager_index)):
+      self._saved_snapshots.add(self._task_manager_index)
+      logger.info("Saved snapshot for task %s", self.task_id)
+    #  }}} method _save_task_snapshot # 
+
+  def _load_task_snapshot(self) -> bool:
+    #  method _load_task_snapshot {{{ # 
+    """
+    Restores the snapshot of the current task if there is one.
+
+    Returns:
+      bool: whether the snapshot is restored
+    """
+
+    if self._task_manager_index not in self._saved_snapshots:
+      return False
+    if not self._simulator.load_snapshot(self._snapshot_name(self._task_manager_index)):
+      logger.warning("Failed to load snapshot for task %s. Replaying reset steps.", self.task_id)
+      self._saved_snapshots.discard(self._task_manager_index)
+      return False
+
+    # The set-ups of the tasks without a snapshot may be rolled back.
+    for index in list(self._cached_task_manager_index):
+      if index!=self._task_manager_index and index not in self._saved_snapshots:
+        del self._cached_task_manager_index[index]
+        self._task_manager_list[index].close()
+        self._task_manager_list[index].clear_setup_flag()
+    # The logcat connection may be broken by the restoration.
+    self._logcat_reader.restart_stream()
+    return True
+    #  }}} method _load_task_snapshot # 
+
   def _lift_all_fingers(self) -> None:
     """Performs a lift action with every finger."""
     lift_action = {
@@ -329,7 +407,7 @@ class Coordinator():
           self._simulator_start_time = time.time()
         if not hasattr(self, "_adb_controller") or self._adb_controller is None:
           self._adb_controller = self._simulator.create_adb_controller()
-        log_stream = self._simulator.get_log_stream()
+        self._restart_logcat_reader()
       except errors.AdbControllerError:
         logger.error('Error launching the simulator.')
         self._log_dict['restart_count_simulator_launch'] += 1
@@ -345,7 +423,7 @@ class Coordinator():
             adb_controller=self._adb_controller,
             #emulator_stub=self._simulator.get_emulator_stub(), # zdy
             #image_format=self._simulator.image_format, # zdy
-            log_stream=log_stream)
+            logcat_reader=self._logcat_reader)
         #if self._task_manager_index not in self._cached_task_manager_index:
         self._cached_task_manager_index[self._task_manager_index] = None
         self._cached_task_manager_index.move_to_end(self._task_manager_index)
@@ -358,6 +436,25 @@ class Coordinator():
       # Restart was successful.
       break
 
+  def _restart_logcat_reader(self):
+    #  method _restart_logcat_reader {{{ # 
+    """
+    (Re)creates the logcat reader shared by all the TaskManagers. The stream
+    is opened with the filters of all the known tasks so that it needn't be
+    restarted when the tasks are switched.
+    """
+
+    if hasattr(self, "_logcat_reader"):
+      self._logcat_reader.kill()
+    log_filters: Set[str] = set()
+    for t_mng in self._task_manager_list:
+      log_filters |= t_mng.log_filters()
+    self._logcat_reader: logcat_thread.LogcatReader =\
+        logcat_thread.LogcatReader( log_stream=self._simulator.get_log_stream()
+                                  , log_filter=log_filters
+                                  )
+    #  }}} method _restart_logcat_reader # 
+
   def add_task_manager(self, task_manager: task_manager_lib.TaskManager):
     #  method `add_task_manager` {{{ # 
     """
@@ -372,6 +469,7 @@ class Coordinator():
   def switch_task_manager(self, index: int):
     #  method `change_task_manager` {{{ # 
     self._task_manager.pause_task()
+    self._task_manager.pause_logcat()
     self._task_manager_index = index
     self._task_manager = self._task_manager_list[self._task_manager_index]
 
@@ -389,20 +487,33 @@ class Coordinator():
             adb_controller=self._adb_controller,
             #emulator_stub=self._simulator.get_emulator_stub(), # zdy
             #image_format=self._simulator.image_format, # zdy
-            log_stream=self._simulator.get_log_stream())
+            logcat_reader=self._logcat_reader)
         self._cached_task_manager_index[self._task_manager_index] = None
         self._cached_task_manager_index.move_to_end(self._task_manager_index)
       except errors.StepCommandError:
         logger.error('Failed to set up the task. Restarting simulator.')
         self._log_dict['restart_count_setup_steps'] += 1
         self._should_restart = True
+    else:
+      self._task_manager.resume_logcat()
 
     #self.reset_environment_state()
     #  }}} method `change_task_manager` # 
   #  }}} Reset Interfaces # 
 
-  def _perform_actions(self, action_list: List[Dict[str, np.ndarray]]) -> List[Optional[bytes]]:
-    #  method _perform_actions {{{ # 
+  def _plan_actions(self, action_list: List[Dict[str, np.ndarray]]) -> List[Tuple[str, Any]]:
+    #  method _plan_actions {{{ # 
+    """
+    Args:
+      action_list (List[Dict[str, np.ndarray]]): the actions of a step
+
+    Returns:
+      List[Tuple[str, Any]]: the operations on the simulator in order, each of
+        which is one of ("act", list of touch actions), ("keyevents", list of
+        key events) and ("adb", command as list of str), as the `steps` of
+        `base_simulator.BaseSimulator.execute_step`
+    """
+
     responses: Iterable[str] = filter( lambda rsp: rsp is not None and rsp != ""
                                      , map( lambda act: act.get("response", np.array("")).item()
                                           , action_list
@@ -426,25 +537,88 @@ class Coordinator():
                          , key=(lambda act: act[0])
                          )
 
-    adb_outputs: List[Optional[bytes]] = []
+    steps: List[Tuple[str, Any]] = []
     for act_t, act in actions:
       if act_t==0:
-        self._send_action_to_simulator(list(map(lambda t: t[1], act)))
+        steps.append(("act", list(map(lambda t: t[1], act))))
       elif act_t==2:
-        start: datetime = datetime.now()
         text_events: List[Dict[str, str]] = []
         for _, tkn in act:
           #self._send_action_to_taskmanager(tkn)
           text_events += self._task_manager.convert_token_to_keyevents(tkn["input_token"].item())
-        self._send_text_event_to_simulator(text_events)
-        end: datetime = datetime.now()
-        logger.info("TEXT DURATION: %.4f", (end-start).total_seconds())
+        steps.append(("keyevents", text_events))
       elif act_t==3:
         for _, cmd in act:
-          adb_outputs.append(self._send_adb_command_to_simulator(cmd))
+          steps.append(("adb", shlex.split(cmd["command"].item())))
+    return steps
+    #  }}} method _plan_actions # 
+
+  def _perform_actions(self, steps: List[Tuple[str, Any]]) -> List[Optional[bytes]]:
+    #  method _perform_actions {{{ # 
+    adb_outputs: List[Optional[bytes]] = []
+    for kind, payload in steps:
+      if kind=="act":
+        self._send_action_to_simulator(payload)
+      elif kind=="keyevents":
+        start: datetime = datetime.now()
+        self._send_text_event_to_simulator(payload)
+        end: datetime = datetime.now()
+        logger.info("TEXT DURATION: %.4f", (end-start).total_seconds())
+      elif kind=="adb":
+        adb_outputs.append(self._send_adb_command_to_simulator(payload))
     return adb_outputs
     #  }}} method _perform_actions # 
 
+  def _perform_batched_step( self
+                           , steps: List[Tuple[str, Any]]
+                           , get_vh: bool
+                           ) -> Optional[ Tuple[ Dict[str, np.ndarray]
+                                               , Optional[concurrent.futures.Future]
+                                               , List[Optional[bytes]]
+                                               ]
+                                        ]:
+    #  method _perform_batched_step {{{ # 
+    """
+    Performs the operations and fetches the observation through a single
+    `execute_step` of the simulator.
+
+    Args:
+      steps (List[Tuple[str, Any]]): the operations from `_plan_actions`
+      get_vh (bool): whether to fetch VH
+
+    Returns:
+      Optional[Tuple[Dict[str, np.ndarray], Optional[concurrent.futures.Future], List[Optional[bytes]]]]:
+        the observation, the resolved VH future for `snapshot_events` (None
+        if not `get_vh`) and the adb outputs. None if the simulator doesn't
+        batch the steps, and nothing is performed then.
+    """
+
+    wait: float = 0.
+    if self._max_steps_per_sec > 0.0:
+      wait = max(0., 1. / self._max_steps_per_sec - self._get_time_since_last_observation())
+
+    results: Optional[ Tuple[ Dict[str, np.ndarray]
+                            , Optional[bytes]
+                            , List[Optional[bytes]]
+                            ]
+                     ] = self._simulator.execute_step(steps, wait, get_vh)
+    if results is None:
+      logger.info("Simulator doesn't batch the steps. Perform them separately.")
+      return None
+    self._latest_observation_time = time.time()
+
+    observation: Dict[str, np.ndarray]
+    view_hierarchy: Optional[bytes]
+    adb_outputs: List[Optional[bytes]]
+    observation, view_hierarchy, adb_outputs = results
+
+    if not get_vh:
+      return observation, None, adb_outputs
+    prefetched_vh: concurrent.futures.Future = concurrent.futures.Future()
+    prefetched_vh.set_result(self._task_manager.parse_view_hierarchy(view_hierarchy))
+    return observation, prefetched_vh, adb_outputs
+    #  }}} method _perform_batched_step # 
+
   def execute_action( self
                     , action: Optional[ Union[ Dict[str, np.ndarray]
                                              , List[Dict[str, np.ndarray]]
@@ -491,6 +665,9 @@ class Coordinator():
             "timedelta": np.ndarray with shape () of int64
             "view_hierarchy": optional lxml.etree.Element, present if
               `self._with_view_hierarchy`
+            "view_hierarchy_unchanged": np.ndarray with shape () of bool,
+              present if `self._with_view_hierarchy`, True if the view
+              hierarchy is the same tree as the last fetched one
           }
       float: reward, Total reward collected since the last call.
       Dict[str, Any]: extras, Task extras observed since the last call.
@@ -513,23 +690,28 @@ class Coordinator():
 
     logger.debug("Executing Actions: %s", str(action))
     if isinstance(action, list):
-      adb_outputs: List[Optional[bytes]] = self._perform_actions(action)
+      action_list: List[Dict[str, np.ndarray]] = action
 
       last_action: Optional[action_type_lib.ActionType] =\
           None if len(action)==0 else action[-1]["action_type"].item()
       #get_vh: bool = len(action)<=0 or action[-1]["action_type"].item()==action_type_lib.ActionType.LIFT
 
     elif action is not None:
-      adb_outputs: List[Optional[bytes]] = self._perform_actions([action])
+      action_list: List[Dict[str, np.ndarray]] = [action]
 
       last_action: Optional[action_type_lib.ActionType] = action["action_type"].item()
       #get_vh: bool = action["action_type"].item()==action_type_lib.ActionType.LIFT
 
     else:
-      adb_outputs: List[Optional[bytes]] = []
+      action_list: List[Dict[str, np.ndarray]] = []
       last_action: Optional[action_type_lib.ActionType] = None
       #get_vh: bool = True
 
+    steps: List[Tuple[str, Any]] = self._plan_actions(action_list)
+    # the batched steps are performed together with the observation fetching
+    batched: bool = self._batch_steps and self._simulator.supports_batched_step()
+    adb_outputs: List[Optional[bytes]] = [] if batched else self._perform_actions(steps)
+
     get_vh: bool = last_action is None or last_action==action_type_lib.ActionType.LIFT
     get_vh = get_vh and self._with_view_hierarchy
 
@@ -551,14 +733,29 @@ class Coordinator():
     logger.debug("Check VH: %s, Check Screen: %s", check_vh, check_screen)
 
     # Sleep to maintain a steady interaction rate.
-    if self._max_steps_per_sec > 0.0:
+    if self._max_steps_per_sec > 0.0 and not batched:
       self._wait_for_next_frame()
     #time.sleep(1)
 
     # Read necessary transition information and return it to the agent.
+    observation: Optional[Dict[str, np.ndarray]] = None
+    prefetched_vh: Optional[concurrent.futures.Future] = None
     try:
-      self._latest_observation_time = time.time()
-      observation = self._simulator.get_observation()
+      if batched:
+        batched_results = self._perform_batched_step(steps, get_vh)
+        if batched_results is not None:
+          observation, prefetched_vh, adb_outputs = batched_results
+        else:
+          adb_outputs = self._perform_actions(steps)
+          if self._max_steps_per_sec > 0.0:
+            self._wait_for_next_frame()
+
+      if observation is None:
+        if get_vh and self._request_executor is not None:
+          prefetched_vh = self._request_executor.submit(self._task_manager.get_view_hierarchy)
+
+        self._latest_observation_time = time.time()
+        observation = self._simulator.get_observation()
 
       if check_screen:
         self._last_screen_check_time = time.time()
@@ -569,9 +766,16 @@ class Coordinator():
       view_hierarchy: Optional[lxml.etree.Element] =\
           self._task_manager.snapshot_events( observation["pixels"]
                                             , check_screen, get_vh, check_vh
+                                            , prefetched_vh=prefetched_vh
                                             )
       if self._with_view_hierarchy:
         observation["view_hierarchy"] = view_hierarchy
+        observation["view_hierarchy_unchanged"] = np.array(
+            view_hierarchy is not None\
+                and view_hierarchy is self._last_view_hierarchy,
+            dtype=np.bool_)
+        if view_hierarchy is not None:
+          self._last_view_hierarchy = view_hierarchy
       if len(adb_outputs)>0:
         observation["adb_output"] = adb_outputs
 
@@ -587,6 +791,9 @@ class Coordinator():
       return observation, reward, task_extras, instructions, episode_end, succeeds
 
     except (errors.ReadObservationError, socket.error):
+      if prefetched_vh is not None:
+        # not to disturb the restart with the pending request
+        concurrent.futures.wait([prefetched_vh])
       logger.exception('Unable to fetch observation. Restarting simulator.')
       self._log_dict['restart_count_fetch_observation'] += 1
       self._should_restart = True
@@ -640,9 +847,8 @@ class Coordinator():
       self._should_restart = True
     #  }}} method _send_text_event_to_simulator # 
 
-  def _send_adb_command_to_simulator(self, action: Dict[str, np.ndarray]) -> Optional[bytes]:
+  def _send_adb_command_to_simulator(self, command: List[str]) -> Optional[bytes]:
     #  method _send_adb_command_to_simulator {{{ # 
-    command: List[str] = shlex.split(action["command"].item())
     return self._simulator.execute_adb_command(command)
     #  }}} method _send_adb_command_to_simulator # 
 
@@ -725,8 +931,12 @@ class Coordinator():
   def close(self):
     """Cleans up the state of this Coordinator."""
 
+    if getattr(self, "_request_executor", None) is not None:
+      self._request_executor.shutdown()
     if hasattr(self, '_task_manager'):
       self._task_manager.close()
+    if hasattr(self, "_logcat_reader"):
+      self._logcat_reader.kill()
     if hasattr(self, '_simulator'):
       self._simulator.close()
     if hasattr(self, "_adb_controller"):
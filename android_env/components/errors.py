@@ -76,6 +76,10 @@ class AdbControllerScreenPinningError(AdbControllerError):
   """Raised when screen pinning failed."""
 
 
+class AdbServerRequestError(AdbControllerError):
+  """Raised when the adb server cannot be reached or refuses a request."""
+
+
 class SimulatorCrashError(Exception):
   """Raised when an AndroidSimulator crashed."""
 
@@ -288,6 +288,21 @@ class EventSource(Event[V], abc.ABC, Generic[I, V]):
             self._flag = True
             self._ever_set = True
         #  }}} method `set` # 
+    def skip(self, value: I):
+        #  method `skip` {{{ # 
+        """
+        Records an input known not to activate this event without verifying
+        it, so that `Repeatability.LAST` keeps working when the input is
+        filtered out in advance.
+
+        value - the input type
+        """
+
+        self._last_input = value
+        #  }}} method `skip` # 
+    @property
+    def repeatability(self) -> Repeatability:
+        return self._repeatability
     @abc.abstractmethod
     def _verify(self, value: I) -> Tuple[bool, Optional[V]]:
         #  abstract method `_verify` {{{ # 
@@ -30,14 +30,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""A class that launches a thread to read Android logcat outputs."""
+"""Classes that launch threads to read Android logcat outputs.
+
+`LogcatReader` owns a single `adb logcat` stream of a device, parses each line
+once and fans the messages out to the `LogcatSubscription`s registered on it,
+so that several TaskManagers can share one logcat process.  `LogcatThread` is
+the standalone variant owning a private reader.
+"""
 
 import re
 import threading
 # `typing.Pattern` has been deprecated in Python 3.9 in favor of `re.Pattern`,
 # but it is not available even in slightly older Python versions.
 # Please see https://www.python.org/dev/peps/pep-0585/
-from typing import Optional, Iterable
+from typing import Optional, Iterable, Tuple, Dict, FrozenSet
+from typing import List, Pattern
 
 #from absl import logging
 import logging
@@ -52,55 +59,144 @@ logger = logging.getLogger("mobile_env.thread.logcat")
   #regexp: Pattern[str]
   #handler_fn: Callable[[Pattern[str], Match[str]], None]
 
+# pylint: disable=g-line-too-long
+# Format is: "TIME_SEC PID TID PRIORITY TAG: MESSAGE"
+#
+# Example:
+#  '         1553110400.424  5583  5658 D NostalgicRacer: com.google.example.games.nostalgicracer.views.renderers.OpenGLRenderDriver@912fb8.onSurfaceChanged 480x320'    #
+#
+# If a log_prefix is given, then the format becomes:
+# "TIME_SEC PID TID PRIORITY TAG: LOG_PREFIX MESSAGE"
+# pylint: enable=g-line-too-long
+_LOGLINE_RE = re.compile(r"""
+  ^                                   # Beginning of the line.
+  [ ]+(?P<timestamp>[0-9]+\.[0-9]+)   # Spaces and a float.
+  [ ]+(?P<pid>[0-9]+)                 # Spaces and an int.
+  [ ]+(?P<tid>[0-9]+)                 # Spaces and an int.
+  [ ]+(?P<priority>.)                 # Spaces and any single character.
+  [ ]+(?P<tag>[^:]*):                 # Spaces and any char that's not ':'.
+  [ ](?P<message>.*)$
+""", re.VERBOSE)
 
-class LogcatThread(thread_function.ThreadFunction):
-  """Reads ADB logcat entries in a separate thread."""
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
 
-  def __init__(
-      self,
-      log_stream: log_stream_lib.LogStream,
-      #log_parsing_config: task_pb2.LogParsingConfig,
-      log_filter: Iterable[str],
-      lock: threading.Lock,
-      name: str = 'logcat'):
-    """Initializes this LogcatThread with optional filters.
 
-    Please see https://developer.android.com/studio/command-line/logcat for more
-    info on `logcat`.
+class LogFilter:
+  """Mirrors the `TAG:PRIORITY` filter expressions of `adb logcat`.
+
+  A shared logcat stream is opened with the union of the filters of all its
+  subscribers, thus each subscriber needs to re-apply its own filters to get
+  the same lines as a dedicated stream would deliver.
+  """
 
+  PRIORITIES: Dict[str, int] = { "V": 0, "D": 1, "I": 2, "W": 3
+                               , "E": 4, "F": 5, "A": 5, "S": 6
+                               }
+
+  def __init__(self, filter_specs: Iterable[str]):
+    """
     Args:
-      log_stream: Stream of logs from simulator.
-      #log_parsing_config: Determines the types of messages we want logcat to
-        #match. Contains `filters` and `log_regexps`.
-      log_filter: Log filters given as an itrable of string.
-      lock: threading.Lock
-      name: Name of the thread.
+      filter_specs (Iterable[str]): filter expressions like
+        "ActivityManager:I" or "*:S". `LogStream` silences all the unspecified
+        tags, so does this filter.
+    """
+
+    self._levels: Dict[str, int] = {}
+    self._default_level: int = LogFilter.PRIORITIES["S"]
+    for spec in filter_specs:
+      tag, _, priority = spec.rpartition(":")
+      if tag=="":
+        tag, priority = priority, "V"
+      level: int = LogFilter.PRIORITIES.get(priority.upper(), LogFilter.PRIORITIES["V"])
+      if tag=="*":
+        self._default_level = level
+      else:
+        self._levels[tag] = level
+
+  def accepts(self, tag: str, priority: str) -> bool:
+    """
+    Args:
+      tag (str): tag of the log line, without padding spaces
+      priority (str): single-character priority of the log line
+
+    Returns:
+      bool: whether the line would be printed by logcat under this filter
+    """
+
+    level: int = self._levels.get(tag, self._default_level)
+    return LogFilter.PRIORITIES.get(priority, LogFilter.PRIORITIES["F"])>=level\
+       and level<LogFilter.PRIORITIES["S"]
+
+
+def parse_logline(line: str) -> Optional[Tuple[float, str, str, str]]:
+  """Parses an `epoch`-formatted logcat line.
+
+  Args:
+    line (str): a line of logcat output
+
+  Returns:
+    Optional[Tuple[float, str, str, str]]: (timestamp, priority, tag, message)
+      or None if the line doesn't conform to the format
+  """
+
+  # ZDY_COMMENT: Actually, I wondered if all the Android comments satisfy
+  # the desired format. Maybe it is. I'd better to confirm that. e.g.,
+  # export a running log and have a check.
+  matches = _LOGLINE_RE.match(line)
+  if not matches or len(matches.groups()) != 6:
+    return None
+  return float(matches.group("timestamp")), matches.group("priority")\
+       , matches.group("tag").strip(), matches.group("message")
+
+
+class LogcatSubscription:
+  """Receives the log messages of a `LogcatReader` for a group of listeners."""
+
+  def __init__( self
+              , reader: "LogcatReader"
+              , log_filter: Iterable[str]
+              , lock: threading.Lock
+              ):
+    """
+    Args:
+      reader (LogcatReader): the reader delivering the messages
+      log_filter (Iterable[str]): log filters of this subscription given as an
+        iterable of str
+      lock (threading.Lock): lock guarding the event listeners, usually shared
+        with the owning TaskManager
     """
 
-    #self._regexps = log_parsing_config.log_regexps # zdy
-    #self._listeners = {}
+    self._reader: LogcatReader = reader
+    self._log_filter: FrozenSet[str] = frozenset(log_filter)
+    self._filter: LogFilter = LogFilter(self._log_filter)
     self._listeners = [] # zdy
     self._lock = lock
 
+    # (tag, priority) -> the listeners whose filters accept such lines and an
+    # alternation of their patterns used to reject the lines matching none of
+    # them without taking the lock; rebuilt lazily after listener updates
+    self._listener_filters: Dict[int, LogFilter] = {}
+    self._routes: Dict[ Tuple[str, str]
+                      , Tuple[ Tuple[event_listeners.LogEvent, ...]
+                             , Optional[Pattern[str]]
+                             ]
+                      ] = {}
+    self._active: bool = True
+
     self._desired_event = None
     self._thread_event = threading.Event()
 
-    #self._max_buffer_size = 100 # zdy
-    self._log_stream = log_stream
-    #self._log_stream.set_log_filters(list(log_parsing_config.filters))
-    self._log_stream.set_log_filters(list(log_filter))
-
-    self._stdout = self._log_stream.get_stream_output()
-
-    super().__init__(block_input=True, block_output=False, name=name)
-
   def add_event_listener(self, event_listener: event_listeners.LogEvent) -> None:
     """Adds `fn` to the list of handlers to call when `event` occurs."""
     #event_regexp = event_listener.regexp
     #if event_regexp not in self._listeners:
       #self._listeners[event_regexp] = []
     #self._listeners[event_regexp].append(event_listener.handler_fn)
-    self._listeners.append(event_listener) # zdy
+    with self._lock:
+      self._listeners.append(event_listener) # zdy
+      # an event without filters accepts all the lines of the subscription
+      self._listener_filters[id(event_listener)] = LogFilter(event_listener.filters or ["*:V"])
+      self._routes = {}
 
   def remove_event_listener(self, event_listener: event_listeners.LogEvent) -> None:
     """Removes `fn` from the list of handlers to call when `event` occurs."""
@@ -109,10 +205,14 @@ class LogcatThread(thread_function.ThreadFunction):
       #logging.error('Event: %r is not registered.', event_regexp)
       #return
     #self._listeners[event_regexp].remove(event_listener.handler_fn)
-    try:
-      self._listeners.remove(event_listener)
-    except ValueError:
-      logger.error('Event: %r is not registered.', event_listener.pattern)
+    with self._lock:
+      try:
+        self._listeners.remove(event_listener)
+        if event_listener not in self._listeners:
+          del self._listener_filters[id(event_listener)]
+        self._routes = {}
+      except ValueError:
+        logger.error('Event: %r is not registered.', event_listener.pattern)
 
   # ZDY_COMMENT: will response to the events happened before the invocation but
   # not being handled yet as well
@@ -131,38 +231,203 @@ class LogcatThread(thread_function.ThreadFunction):
     self._thread_event.wait(timeout=timeout_sec)
     self._thread_event.clear()
 
+  @property
+  def log_filter(self) -> FrozenSet[str]:
+    return self._log_filter
+
+  def pause(self) -> None:
+    """Stops receiving messages, e.g., when the owning task is switched off."""
+    self._active = False
+
+  def resume(self) -> None:
+    self._active = True
+
+  def is_active(self) -> bool:
+    return self._active
+
+  def accepts(self, tag: str, priority: str) -> bool:
+    return self._active and self._filter.accepts(tag, priority)
+
+  def _build_route( self
+                  , tag: str
+                  , priority: str
+                  ) -> Tuple[ Tuple[event_listeners.LogEvent, ...]
+                            , Optional[Pattern[str]]
+                            ]:
+    #  method _build_route {{{ # 
+    """
+    Collects the listeners interested in the lines with `tag` and `priority`.
+    Should be invoked with `self._lock` held.
+
+    Returns:
+      Tuple[event_listeners.LogEvent, ...]: the listeners
+      Optional[Pattern[str]]: alternation of the patterns of the listeners or
+        None if the patterns cannot be combined safely
+    """
+
+    listeners: Tuple[event_listeners.LogEvent, ...] =\
+        tuple( lstn for lstn in self._listeners
+                    if self._listener_filters[id(lstn)].accepts(tag, priority)
+             )
+    patterns: List[str] = [lstn.pattern.pattern for lstn in listeners]
+    # back references are numbered within each single pattern
+    if len(patterns)==0 or any(map(_BACKREF_RE.search, patterns)):
+      return listeners, None
+    try:
+      combined: Optional[Pattern[str]] = re.compile("|".join("(?:{:})".format(ptn) for ptn in patterns))
+    except re.error:
+      combined = None
+    return listeners, combined
+    #  }}} method _build_route # 
+
+  def dispatch(self, content: str, tag: str = "", priority: str = "V") -> None:
+    """Hands a log message over to the listeners interested in it.
+
+    Args:
+      content (str): message part of the log line
+      tag (str): tag of the log line
+      priority (str): priority of the log line
+    """
+
+    route: Optional[ Tuple[ Tuple[event_listeners.LogEvent, ...]
+                          , Optional[Pattern[str]]
+                          ]
+                   ] = self._routes.get((tag, priority))
+    if route is None:
+      with self._lock:
+        route = self._build_route(tag, priority)
+        self._routes[(tag, priority)] = route
+    listeners, combined = route
+    if len(listeners)==0:
+      return
+
+    if combined is not None and combined.search(content) is None:
+      with self._lock:
+        for evnt_lstn in listeners:
+          if evnt_lstn.repeatability==event_listeners.Repeatability.LAST:
+            evnt_lstn.skip(content)
+      return
+
+    with self._lock:
+      for evnt_lstn in listeners:
+        evnt_lstn.set(content)
+        if evnt_lstn.is_set():
+          if self._desired_event is not None and self._desired_event is evnt_lstn or\
+              self._desired_event is None:
+            self._thread_event.set()
+
   def kill(self):
-    self._log_stream.stop_stream()
+    """Detaches this subscription from the reader."""
+    self._reader.unsubscribe(self)
 
-    super().kill()
 
-  def main(self) -> None:
-    # pylint: disable=g-line-too-long
-    # Format is: "TIME_SEC PID TID PRIORITY TAG: MESSAGE"
-    #
-    # Example:
-    #  '         1553110400.424  5583  5658 D NostalgicRacer: com.google.example.games.nostalgicracer.views.renderers.OpenGLRenderDriver@912fb8.onSurfaceChanged 480x320'    #
-    #
-    # If a log_prefix is given, then the format becomes:
-    # "TIME_SEC PID TID PRIORITY TAG: LOG_PREFIX MESSAGE"
-    # pylint: enable=g-line-too-long
-
-    regexp = r"""
-      ^                                   # Beginning of the line.
-      [ ]+(?P<timestamp>[0-9]+\.[0-9]+)   # Spaces and a float.
-      [ ]+(?P<pid>[0-9]+)                 # Spaces and an int.
-      [ ]+(?P<tid>[0-9]+)                 # Spaces and an int.
-      [ ]+(?P<priority>.)                 # Spaces and any single character.
-      [ ]+(?P<tag>[^:]*):                 # Spaces and any char that's not ':'.
+class LogcatReader(thread_function.ThreadFunction):
+  """Reads the ADB logcat entries of a device in a separate thread.
+
+  Each line is parsed once and handed to all the active subscriptions whose
+  filters accept it.
+
+  `adb logcat` prints the whole log buffer of the device once started, thus
+  after the stream is restarted, the lines not newer than the last line read
+  from the former stream are dropped rather than delivered again.
+  """
+
+  def __init__(
+      self,
+      log_stream: log_stream_lib.LogStream,
+      log_filter: Iterable[str] = (),
+      name: str = 'logcat'):
+    """Initializes this LogcatReader with optional filters.
+
+    Please see https://developer.android.com/studio/command-line/logcat for more
+    info on `logcat`.
+
+    Args:
+      log_stream: Stream of logs from simulator.
+      log_filter: Log filters of the stream given as an itrable of string.
+        Should cover the filters of all the subscriptions.
+      name: Name of the thread.
     """
 
-    regexp += r"""[ ](?P<message>.*)$"""
-    logline_re = re.compile(regexp, re.VERBOSE)
+    self._subscriptions: Tuple[LogcatSubscription, ...] = ()
+    self._subscription_lock = threading.Lock()
+
+    self._log_stream = log_stream
+    self._log_filter = frozenset(log_filter)
+    self._log_stream.set_log_filters(sorted(self._log_filter))
+    self._stream_refreshed: bool = False
+    # device timestamp of the newest line read and the one before which the
+    # lines are replayed by a restarted stream
+    self._last_timestamp: Optional[float] = None
+    self._replay_threshold: Optional[float] = None
+
+    self._stdout = self._log_stream.get_stream_output()
+
+    super().__init__(block_input=True, block_output=False, name=name)
+
+  def subscribe( self
+               , log_filter: Iterable[str]
+               , lock: threading.Lock
+               ) -> LogcatSubscription:
+    """Registers a new subscription.
+
+    If `log_filter` isn't covered by the current filters of the stream, the
+    stream will be restarted with the extended filters.
+
+    Args:
+      log_filter (Iterable[str]): log filters of the subscription
+      lock (threading.Lock): lock guarding the listeners of the subscription
+
+    Returns:
+      LogcatSubscription: the new subscription
+    """
+
+    subscription = LogcatSubscription(self, log_filter, lock)
+    self.add_subscription(subscription)
+    return subscription
+
+  def add_subscription(self, subscription: LogcatSubscription) -> None:
+    with self._subscription_lock:
+      self._subscriptions = self._subscriptions + (subscription,)
+    if not subscription.log_filter<=self._log_filter:
+      self.set_log_filters(self._log_filter | subscription.log_filter)
+
+  def unsubscribe(self, subscription: LogcatSubscription) -> None:
+    with self._subscription_lock:
+      self._subscriptions = tuple( sbscrpt for sbscrpt in self._subscriptions
+                                           if sbscrpt is not subscription
+                                 )
+
+  def set_log_filters(self, log_filter: Iterable[str]) -> None:
+    """Restarts the underlying stream with new filters."""
+
+    self._log_filter = frozenset(log_filter)
+    logger.info("Restarting logcat stream with filters %s", sorted(self._log_filter))
+    self._stream_refreshed = True
+    self._replay_threshold = self._last_timestamp
+    try:
+      self._log_stream.stop_stream()
+    except AttributeError:
+      # the stream process has not been started yet
+      pass
+    self._log_stream.set_log_filters(sorted(self._log_filter))
+    self._stdout = self._log_stream.get_stream_output()
+
+  def restart_stream(self) -> None:
+    """Restarts the underlying stream, e.g., after the device is restored."""
+    self.set_log_filters(self._log_filter)
 
+  def kill(self):
+    self._log_stream.stop_stream()
+
+    super().kill()
+
+  def main(self) -> None:
+    self._stream_refreshed = False
     for line in self._stdout:
       # We never hand back control to ThreadFunction._run() so we need to
       # explicitly check for self._should_run here.
-      if not self._should_run:
+      if not self._should_run or self._stream_refreshed:
         break
 
       if not line:  # Skip empty lines.
@@ -170,33 +435,48 @@ class LogcatThread(thread_function.ThreadFunction):
 
       # We're currently only consuming `message`, but we may use the other
       # fields in the future.
-      # ZDY_COMMENT: Actually, I wondered if all the Android comments satisfy
-      # the desired format. Maybe it is. I'd better to confirm that. e.g.,
-      # export a running log and have a check.
-      matches = logline_re.match(line)
-      if not matches or len(matches.groups()) != 6:
+      parsed: Optional[Tuple[float, str, str, str]] = parse_logline(line)
+      if parsed is None:
+        continue
+      timestamp, priority, tag, content = parsed
+      if self._replay_threshold is not None and timestamp<=self._replay_threshold:
         continue
+      if self._last_timestamp is None or timestamp>self._last_timestamp:
+        self._last_timestamp = timestamp
 
-      content = matches.group('message')
-      with self._lock:
-        for evnt_lstn in self._listeners:
-          evnt_lstn.set(content)
-          if evnt_lstn.is_set():
-            if self._desired_event is not None and self._desired_event is evnt_lstn or\
-                self._desired_event is None:
-              self._thread_event.set()
-
-      #for ev, listeners in self._listeners.items():
-        #ev_matches = ev.match(content)
-        #if ev_matches:
-          ## Unblock consumers that may be waiting for events.
-          #if not self._thread_event.is_set():
-            #if self._desired_event:
-              #if self._desired_event == ev:
-                #self._thread_event.set()
-            #else:
-              #self._thread_event.set()
-#
-          ## Notify listeners.
-          #for listener in listeners:
-            #listener(ev, ev_matches)
+      for sbscrpt in self._subscriptions:
+        if sbscrpt.accepts(tag, priority):
+          sbscrpt.dispatch(content, tag, priority)
+
+
+class LogcatThread(LogcatSubscription):
+  """Reads ADB logcat entries in a separate thread through a private reader."""
+
+  def __init__(
+      self,
+      log_stream: log_stream_lib.LogStream,
+      #log_parsing_config: task_pb2.LogParsingConfig,
+      log_filter: Iterable[str],
+      lock: threading.Lock,
+      name: str = 'logcat'):
+    """Initializes this LogcatThread with optional filters.
+
+    Please see https://developer.android.com/studio/command-line/logcat for more
+    info on `logcat`.
+
+    Args:
+      log_stream: Stream of logs from simulator.
+      #log_parsing_config: Determines the types of messages we want logcat to
+        #match. Contains `filters` and `log_regexps`.
+      log_filter: Log filters given as an itrable of string.
+      lock: threading.Lock
+      name: Name of the thread.
+    """
+
+    log_filter = list(log_filter)
+    reader = LogcatReader(log_stream, log_filter, name=name)
+    super().__init__(reader, log_filter, lock)
+    reader.add_subscription(self)
+
+  def kill(self):
+    self._reader.kill()
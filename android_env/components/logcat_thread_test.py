@@ -20,6 +20,7 @@ import threading
 from typing import Match, Pattern
 
 from absl.testing import absltest
+from android_env.components import event_listeners
 from android_env.components import log_stream
 from android_env.components import logcat_thread
 from android_env.proto import task_pb2
@@ -83,6 +84,28 @@ class FakeLogStream(log_stream.LogStream):
     self.logs.kill()
 
 
+class BufferedLogStream(log_stream.LogStream):
+  """Replays the whole log buffer every time the stream is started, as adb."""
+
+  def __init__(self):
+    super().__init__()
+    self.buffer = []
+    self.logs = FakeStream()
+
+  def log(self, line):
+    self.buffer.append(line)
+    self.logs.send_value(line)
+
+  def _get_stream_output(self):
+    self.logs = FakeStream()
+    for line in self.buffer:
+      self.logs.send_value(line)
+    return self.logs
+
+  def stop_stream(self):
+    self.logs.kill()
+
+
 class LogcatThreadTest(absltest.TestCase):
 
   def setUp(self):
@@ -146,5 +169,134 @@ class LogcatThreadTest(absltest.TestCase):
     self.assertFalse(some_state)
 
 
+class LogFilterTest(absltest.TestCase):
+
+  def test_accepts(self):
+    log_filter = logcat_thread.LogFilter(['AndroidRLTask:I', 'Other:W'])
+    self.assertTrue(log_filter.accepts('AndroidRLTask', 'I'))
+    self.assertTrue(log_filter.accepts('AndroidRLTask', 'E'))
+    self.assertFalse(log_filter.accepts('AndroidRLTask', 'D'))
+    self.assertFalse(log_filter.accepts('Other', 'I'))
+    self.assertFalse(log_filter.accepts('Unknown', 'F'))
+
+  def test_wildcard(self):
+    log_filter = logcat_thread.LogFilter(['*:D', 'Noisy:S'])
+    self.assertTrue(log_filter.accepts('Unknown', 'D'))
+    self.assertFalse(log_filter.accepts('Unknown', 'V'))
+    self.assertFalse(log_filter.accepts('Noisy', 'F'))
+
+
+class LogcatReaderTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.fake_log_stream = FakeLogStream()
+
+  def tearDown(self):
+    self.fake_log_stream.stop_stream()
+    super().tearDown()
+
+  def test_fan_out(self):
+    reader = logcat_thread.LogcatReader(
+        log_stream=self.fake_log_stream, log_filter=['Tag:D', 'Tag:E'])
+    lock = threading.Lock()
+    subscription1 = reader.subscribe(['Tag:D'], lock)
+    subscription2 = reader.subscribe(['Tag:E'], lock)
+    event1 = event_listeners.LogEvent(['Tag:D'], 'Hello world')
+    event2 = event_listeners.LogEvent(['Tag:E'], 'Hello world')
+    subscription1.add_event_listener(event1)
+    subscription2.add_event_listener(event2)
+
+    self.fake_log_stream.logs.send_value(make_stdout('Hello world'))
+    subscription1.wait(event=event1, timeout_sec=1.0)
+    event1.snapshot()
+    event2.snapshot()
+    self.assertTrue(event1.is_set())
+    # The D line is filtered out for the second subscription.
+    self.assertFalse(event2.is_set())
+
+  def test_paused_subscription(self):
+    reader = logcat_thread.LogcatReader(
+        log_stream=self.fake_log_stream, log_filter=['Tag:D'])
+    lock = threading.Lock()
+    subscription1 = reader.subscribe(['Tag:D'], lock)
+    subscription2 = reader.subscribe(['Tag:D'], lock)
+    event1 = event_listeners.LogEvent(['Tag:D'], 'Hello world')
+    event2 = event_listeners.LogEvent(['Tag:D'], 'Hello world')
+    subscription1.add_event_listener(event1)
+    subscription2.add_event_listener(event2)
+    subscription2.pause()
+
+    self.fake_log_stream.logs.send_value(make_stdout('Hello world'))
+    subscription1.wait(event=event1, timeout_sec=1.0)
+    event1.snapshot()
+    event2.snapshot()
+    self.assertTrue(event1.is_set())
+    self.assertFalse(event2.is_set())
+
+  def test_route_by_listener_filters(self):
+    reader = logcat_thread.LogcatReader(
+        log_stream=self.fake_log_stream, log_filter=['Tag:D', 'Other:D'])
+    subscription = reader.subscribe(['Tag:D', 'Other:D'], threading.Lock())
+    tag_event = event_listeners.LogEvent(['Tag:D'], 'Hello (\\w+)')
+    other_event = event_listeners.LogEvent(['Other:D'], 'Hello (\\w+)')
+    any_event = event_listeners.LogEvent([], 'world')
+    for evt in [tag_event, other_event, any_event]:
+      subscription.add_event_listener(evt)
+
+    subscription.dispatch('Hello world', 'Tag', 'D')
+    for evt in [tag_event, other_event, any_event]:
+      evt.snapshot()
+    self.assertTrue(tag_event.is_set())
+    self.assertEqual([('world',)], tag_event.get())
+    self.assertFalse(other_event.is_set())
+    self.assertTrue(any_event.is_set())
+
+  def test_repeatability_last_with_prefilter(self):
+    reader = logcat_thread.LogcatReader(
+        log_stream=self.fake_log_stream, log_filter=['Tag:D'])
+    subscription = reader.subscribe(['Tag:D'], threading.Lock())
+    event = event_listeners.LogEvent(
+        ['Tag:D'], 'Hello',
+        repeatability=event_listeners.Repeatability.LAST)
+    subscription.add_event_listener(event)
+
+    subscription.dispatch('Hello', 'Tag', 'D')
+    subscription.dispatch('Bye', 'Tag', 'D')
+    subscription.dispatch('Hello', 'Tag', 'D')
+    event.snapshot()
+    self.assertLen(event.get(), 2)
+
+  def test_extend_filters(self):
+    reader = logcat_thread.LogcatReader(
+        log_stream=self.fake_log_stream, log_filter=['Tag:D'])
+    reader.subscribe(['Tag:D'], threading.Lock())
+    self.assertEqual(['Tag:D', '*:S'], self.fake_log_stream._filters)
+    reader.subscribe(['Other:I'], threading.Lock())
+    self.assertEqual(['Other:I', 'Tag:D', '*:S'], self.fake_log_stream._filters)
+
+  def test_restart_does_not_replay(self):
+    log_stream = BufferedLogStream()
+    reader = logcat_thread.LogcatReader(
+        log_stream=log_stream, log_filter=['Tag:D'])
+    self.addCleanup(reader.kill)
+    subscription = reader.subscribe(['Tag:D'], threading.Lock())
+    event = event_listeners.LogEvent(
+        ['Tag:D'], 'Hello (\\w+)',
+        repeatability=event_listeners.Repeatability.UNLIMITED)
+    subscription.add_event_listener(event)
+
+    log_stream.log('    1553110400.424  5583  5658 D Tag: Hello old')
+    subscription.wait(event=event, timeout_sec=1.0)
+    event.snapshot()
+    self.assertEqual([('old',)], event.get())
+
+    reader.restart_stream()
+    log_stream.log('    1553110401.000  5583  5658 D Tag: Hello new')
+    subscription.wait(event=event, timeout_sec=1.0)
+    event.snapshot()
+    self.assertEqual([('new',)], event.get())
+
+
 if __name__ == '__main__':
   absltest.main()
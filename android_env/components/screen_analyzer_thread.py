@@ -18,6 +18,8 @@ Created by Danyang Zhang @X-Lance.
 
 from android_env.components import thread_function
 import enum
+import functools
+import os
 
 #from android_env.proto import emulator_controller_pb2
 #from android_env.proto import emulator_controller_pb2_grpc
@@ -32,11 +34,34 @@ import traceback
 
 logger = logging.getLogger("mobile_env.thread.screen_analyzer")
 
-from typing import Callable
-from typing import List, Tuple
+from typing import Callable, Optional, Any
+from typing import List, Tuple, Dict
 from android_env.components import event_listeners
 import threading
 
+@functools.lru_cache(maxsize=256)
+def _read_icon_target(path: str, mtime_ns: int) -> torch.Tensor:
+    #  function `_read_icon_target` {{{ # 
+    image_tensor = tvio.read_image(path, tvio.ImageReadMode.RGB)
+    return image_tensor.to(dtype=torch.float32)/255.
+    #  }}} function `_read_icon_target` # 
+
+def load_icon_target(path: str) -> torch.Tensor:
+    #  function `load_icon_target` {{{ # 
+    """
+    Loads the target image of an icon match event. The decoded images are
+    cached by path and modification time so that they are shared by the
+    analyzer threads across the episodes. The returned tensor is shared and
+    shouldn't be modified in place.
+
+    path - str
+
+    return tensor of float32 with shape (3, height, width)
+    """
+
+    return _read_icon_target(path, os.stat(path).st_mtime_ns)
+    #  }}} function `load_icon_target` # 
+
 # mainly taken from `DumpsysThread`
 class ScreenAnalyzerThread(thread_function.ThreadFunction):
     #  class `ScreenAnalyzerThread` {{{ # 
@@ -63,7 +88,10 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
             #check_frequency,
             #max_failed_current_activity,
             lock: threading.Lock,
-            block_input: bool, block_output: bool, name: str = "screen_analyzer"):
+            block_input: bool, block_output: bool, name: str = "screen_analyzer",
+            skip_unchanged_regions: bool = True,
+            text_prefetcher: Optional[Callable[[torch.Tensor, List[torch.Tensor]],
+                None]] = None):
         #  method `__init__` {{{ # 
         """
         text_detector - callable accepting
@@ -107,6 +135,15 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
         block_input - bool
         block_output - bool
         name - str
+
+        skip_unchanged_regions - bool, if the models should be skipped for the
+          event regions whose pixels are unchanged since the last check. the
+          last results will be emitted again to such events.
+        text_prefetcher - callable accepting
+          + tensor of float32 with shape (3, height, width)
+          + list of tensor of float32 with shape (1, 4)
+          or None. if given, it is invoked with the regions of both
+          `text_detector` and `text_recognizer` before them on each screen.
         """
 
         self._text_detector: Callable[[torch.Tensor, List[torch.Tensor]],
@@ -119,6 +156,8 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
                 List[str]] = icon_recognizer
         self._icon_matcher: Callable[[torch.Tensor, List[torch.Tensor], torch.Tensor],
                 List[List[bool]]] = icon_matcher
+        self._text_prefetcher: Optional[Callable[[torch.Tensor, List[torch.Tensor]],
+                None]] = text_prefetcher
 
         #self._emulator_stub = emulator_stub
         #self._image_format = image_format
@@ -129,9 +168,15 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
         self._icon_detect_event_listeners: List[event_listeners.Event] = []
         self._icon_match_event_listeners: List[event_listeners.Event] = []
         self._icon_detect_match_event_listeners: List[event_listeners.Event] = []
+        self._icon_match_targets: List[torch.Tensor] = []
+        self._icon_detect_match_targets: List[torch.Tensor] = []
 
         self._lock: threading.Lock = lock
 
+        self._skip_unchanged_regions: bool = skip_unchanged_regions
+        self._last_screen: Optional[torch.Tensor] = None
+        self._last_results: Dict[int, Any] = {} # id of listener -> results
+
         #self._main_loop_counter = 0
         #self._check_frequency = check_frequency
         #self._max_failed_activity_extraction = max_failed_current_activity
@@ -171,8 +216,10 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
         for lstn in event_listeners:
             if lstn.needs_detection:
                 self._icon_detect_match_event_listeners.append(lstn)
+                self._icon_detect_match_targets.append(load_icon_target(lstn.path))
             else:
                 self._icon_match_event_listeners.append(lstn)
+                self._icon_match_targets.append(load_icon_target(lstn.path))
     #  }}} Methods to Add Event Listeners # 
 
     #def get_screenshot(self):
@@ -190,6 +237,65 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
         #return torch.tensor(image, dtype=torch.float32)
         ##  }}} method `get_screenshot` # 
 
+    #  Methods to Skip Unchanged Regions {{{ # 
+    def _region_changed(self, screen: torch.Tensor, bbox: torch.Tensor) -> bool:
+        """
+        screen - tensor of float32 with shape (3, height, width)
+        bbox - tensor of float32 with shape (1, 4)
+
+        return - bool
+        """
+
+        if self._last_screen is None\
+                or self._last_screen.shape!=screen.shape:
+            return True
+
+        _, height, width = screen.shape
+        x0, y0, x1, y1 = bbox[0].tolist()
+        x0 = min(max(int(np.floor(x0)), 0), width)
+        y0 = min(max(int(np.floor(y0)), 0), height)
+        x1 = min(max(int(np.ceil(x1)), 0), width)
+        y1 = min(max(int(np.ceil(y1)), 0), height)
+        return not torch.equal( self._last_screen[:, y0:y1, x0:x1]
+                              , screen[:, y0:y1, x0:x1]
+                              )
+
+    def _select_changed(self, screen: torch.Tensor,
+            listeners: List[event_listeners.Event],
+            bboxes: List[torch.Tensor]) -> List[int]:
+        """
+        Selects the listeners to be analyzed by the models again. The cached
+        results of the selected listeners are discarded.
+
+        screen - tensor of float32 with shape (3, height, width)
+        listeners - list of event_listeners.Event with length nb_bboxes
+        bboxes - list of tensor of float32 with shape (1, 4) with length
+          nb_bboxes
+
+        return - list of int as the indices of the selected listeners
+        """
+
+        indices = [ i for i, (lstn, bbx) in enumerate(zip(listeners, bboxes))\
+                        if not self._skip_unchanged_regions\
+                            or id(lstn) not in self._last_results\
+                            or self._region_changed(screen, bbx)
+                  ]
+        for i in indices:
+            self._last_results.pop(id(listeners[i]), None)
+        return indices
+
+    def _update_results(self, listeners: List[event_listeners.Event],
+            indices: List[int], results: List[Any]):
+        """
+        listeners - list of event_listeners.Event
+        indices - list of int with length nb_results
+        results - list with length nb_results
+        """
+
+        for i, rslt in zip(indices, results):
+            self._last_results[id(listeners[i])] = rslt
+    #  }}} Methods to Skip Unchanged Regions # 
+
     #  Methods to Match Registered Events {{{ # 
     @torch.no_grad()
     def match_text_events(self, screen):
@@ -200,46 +306,64 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
 
         _, height, width = screen.shape
 
-        # first, for detection
-        bboxes = []
+        detect_bboxes = []
         for lstn in self._text_detect_event_listeners:
             x0, y0, x1, y1 = lstn.region
-            bboxes.append(torch.tensor(
+            detect_bboxes.append(torch.tensor(
                 [
                     x0*width,
                     y0*height,
                     x1*width,
                     y1*height
                 ])[None, :])
-        if len(bboxes)>0:
-            #logging.debug("Invoking Detector")
-            results = self._text_detector(screen, bboxes)
-            #logging.debug("Invoked Detector")
+        detect_indices = self._select_changed(screen,
+                self._text_detect_event_listeners, detect_bboxes)
+
+        recog_bboxes = []
+        for lstn in self._text_recog_event_listeners:
+            x0, y0, x1, y1 = lstn.region
+            recog_bboxes.append(torch.tensor(
+                [
+                    x0*width,
+                    y0*height,
+                    x1*width,
+                    y1*height
+                ])[None, :])
+        recog_indices = self._select_changed(screen,
+                self._text_recog_event_listeners, recog_bboxes)
+
+        if self._text_prefetcher is not None\
+                and len(detect_indices)+len(recog_indices)>0:
+            self._text_prefetcher(screen,
+                    [detect_bboxes[i] for i in detect_indices]
+                  + [recog_bboxes[i] for i in recog_indices])
+
+        # first, for detection
+        if len(detect_bboxes)>0:
+            if len(detect_indices)>0:
+                #logging.debug("Invoking Detector")
+                results = self._text_detector(screen, [detect_bboxes[i] for i in detect_indices])
+                #logging.debug("Invoked Detector")
+                self._update_results(self._text_detect_event_listeners,
+                        detect_indices, results)
             with self._lock:
-                for lstn, rslts in zip(self._text_detect_event_listeners, results):
-                    for cddt in rslts:
+                for lstn in self._text_detect_event_listeners:
+                    for cddt in self._last_results[id(lstn)]:
                         lstn.set(cddt)
                         if lstn.is_set():
                             break
 
         # then, for pure recognize
         try:
-            bboxes = []
-            for lstn in self._text_recog_event_listeners:
-                x0, y0, x1, y1 = lstn.region
-                bboxes.append(torch.tensor(
-                    [
-                        x0*width,
-                        y0*height,
-                        x1*width,
-                        y1*height
-                    ])[None, :])
-            if len(bboxes)>0:
-                results = self._text_recognizer(screen, bboxes)
+            if len(recog_bboxes)>0:
+                if len(recog_indices)>0:
+                    results = self._text_recognizer(screen, [recog_bboxes[i] for i in recog_indices])
+                    self._update_results(self._text_recog_event_listeners,
+                            recog_indices, results)
                 with self._lock:
-                    for lstn, rslt in zip(self._text_recog_event_listeners, results):
+                    for lstn in self._text_recog_event_listeners:
                         #logging.info("ZDY_DEBUG: {:}".format(type(rslt)))
-                        lstn.set(rslt)
+                        lstn.set(self._last_results[id(lstn)])
         except Exception as e:
             logger.error("Error occurred during text recognition!")
             logger.error(str(e))
@@ -268,10 +392,15 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
                         y1*height
                     ])[None, :])
             if len(bboxes)>0:
-                _, results = self._icon_detector(screen, bboxes)
+                indices = self._select_changed(screen,
+                        self._icon_detect_event_listeners, bboxes)
+                if len(indices)>0:
+                    _, results = self._icon_detector(screen, [bboxes[i] for i in indices])
+                    self._update_results(self._icon_detect_event_listeners,
+                            indices, results)
                 with self._lock:
-                    for lstn, rslts in zip(self._icon_detect_event_listeners, results):
-                        for cddt in rslts:
+                    for lstn in self._icon_detect_event_listeners:
+                        for cddt in self._last_results[id(lstn)]:
                             lstn.set(cddt)
                             if lstn.is_set():
                                 #logging.info("Icon Event Set!")
@@ -293,10 +422,15 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
                         y1*height
                     ])[None, :])
             if len(bboxes)>0:
-                results = self._icon_recognizer(screen, bboxes)
+                indices = self._select_changed(screen,
+                        self._icon_recog_event_listeners, bboxes)
+                if len(indices)>0:
+                    results = self._icon_recognizer(screen, [bboxes[i] for i in indices])
+                    self._update_results(self._icon_recog_event_listeners,
+                            indices, results)
                 with self._lock:
-                    for lstn, rslt in zip(self._icon_recog_event_listeners, results):
-                        lstn.set(rslt)
+                    for lstn in self._icon_recog_event_listeners:
+                        lstn.set(self._last_results[id(lstn)])
         except Exception as e:
             logger.error("Error occurred during icon recognition!")
             logger.error(str(e))
@@ -313,7 +447,7 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
 
         # first, for detection
         bboxes = []
-        target_images = []
+        target_images = self._icon_detect_match_targets
         for lstn in self._icon_detect_match_event_listeners:
             x0, y0, x1, y1 = lstn.region
             bboxes.append(torch.tensor(
@@ -323,27 +457,30 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
                     x1*width,
                     y1*height
                 ])[None, :])
-
-            image_tensor = tvio.read_image(lstn.path, tvio.ImageReadMode.RGB)
-            image_tensor = image_tensor.to(dtype=torch.float32)/255.
-            target_images.append(image_tensor)
         if len(bboxes)>0:
-            candidate_bboxes, _ = self._icon_detector(screen, bboxes)
-            base_bboxes = torch.cat(bboxes)[:, None, :]
-            candidate_bboxes[:, :, 0] += base_bboxes[:, :, 0]
-            candidate_bboxes[:, :, 2] += base_bboxes[:, :, 0]
-            candidate_bboxes[:, :, 1] += base_bboxes[:, :, 1]
-            candidate_bboxes[:, :, 3] += base_bboxes[:, :, 1]
-            results = self._icon_matcher(screen, target_images, candidate_bboxes)
+            indices = self._select_changed(screen,
+                    self._icon_detect_match_event_listeners, bboxes)
+            if len(indices)>0:
+                bboxes = [bboxes[i] for i in indices]
+                target_images = [target_images[i] for i in indices]
+                candidate_bboxes, _ = self._icon_detector(screen, bboxes)
+                base_bboxes = torch.cat(bboxes)[:, None, :]
+                candidate_bboxes[:, :, 0] += base_bboxes[:, :, 0]
+                candidate_bboxes[:, :, 2] += base_bboxes[:, :, 0]
+                candidate_bboxes[:, :, 1] += base_bboxes[:, :, 1]
+                candidate_bboxes[:, :, 3] += base_bboxes[:, :, 1]
+                results = self._icon_matcher(screen, target_images, candidate_bboxes)
+                self._update_results(self._icon_detect_match_event_listeners,
+                        indices, results)
 
             with self._lock:
-                for lstn, rslts in zip(self._icon_detect_match_event_listeners, results):
-                    if any(rslts):
+                for lstn in self._icon_detect_match_event_listeners:
+                    if any(self._last_results[id(lstn)]):
                         lstn.set(True)
 
         # then, for pure recognize
         bboxes = []
-        target_images = []
+        target_images = self._icon_match_targets
         for lstn in self._icon_match_event_listeners:
             x0, y0, x1, y1 = lstn.region
             bboxes.append(torch.tensor(
@@ -353,16 +490,18 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
                     x1*width,
                     y1*height
                 ])[None, :])
-
-            image_tensor = tvio.read_image(lstn.path, tvio.ImageReadMode.RGB)
-            image_tensor = image_tensor.to(dtype=torch.float32)/255.
-            target_images.append(image_tensor)
         if len(bboxes)>0:
-            bboxes = torch.cat(bboxes)[:, None, :]
-            results = self._icon_matcher(screen, target_images, bboxes)
+            indices = self._select_changed(screen,
+                    self._icon_match_event_listeners, bboxes)
+            if len(indices)>0:
+                target_images = [target_images[i] for i in indices]
+                bboxes = torch.cat([bboxes[i] for i in indices])[:, None, :]
+                results = self._icon_matcher(screen, target_images, bboxes)
+                self._update_results(self._icon_match_event_listeners,
+                        indices, results)
             with self._lock:
-                for lstn, rslt in zip(self._icon_recog_event_listeners, results):
-                    lstn.set(rslt[0])
+                for lstn in self._icon_match_event_listeners:
+                    lstn.set(self._last_results[id(lstn)][0])
         #  }}} method `match_icon_match_events` # 
     #  }}} Methods to Match Registered Events # 
 
@@ -396,9 +535,13 @@ class ScreenAnalyzerThread(thread_function.ThreadFunction):
             self.match_text_events(screen)
             self.match_icon_events(screen)
             self.match_icon_match_events(screen)
+            self._last_screen = screen
 
             self._write_value(ScreenAnalyzerThread.Signal.OK)
         except:
+            # the cached results may be inconsistent with `_last_screen` now
+            self._last_screen = None
+            self._last_results.clear()
             self._write_value(ScreenAnalyzerThread.Signal.CHECK_ERROR)
         #  }}} method `main` # 
     #  }}} class `ScreenAnalyzerThread` # 
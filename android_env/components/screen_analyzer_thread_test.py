@@ -0,0 +1,156 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.components.screen_analyzer_thread."""
+
+import os
+import tempfile
+import threading
+
+from absl.testing import absltest
+from android_env.components import event_listeners
+from android_env.components import screen_analyzer_thread
+from android_env.components.tools import naive_functions
+import mock
+import numpy as np
+from PIL import Image
+import torch
+
+
+def _write_icon(path: str, value: int):
+  Image.fromarray(np.full((4, 4, 3), value, dtype=np.uint8)).save(path)
+
+
+class ScreenAnalyzerThreadTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._text_recognizer = mock.Mock(
+        side_effect=lambda screen, bboxes: ['text'] * len(bboxes))
+    tempdir = tempfile.TemporaryDirectory()
+    self.addCleanup(tempdir.cleanup)
+    self._tempdir = tempdir.name
+    self._icon_matcher = mock.Mock(side_effect=naive_functions.icon_matcher)
+    self._analyzer = screen_analyzer_thread.ScreenAnalyzerThread(
+        naive_functions.text_detector, self._text_recognizer,
+        naive_functions.icon_detector, naive_functions.icon_recognizer,
+        self._icon_matcher,
+        lock=threading.Lock(),
+        block_input=True, block_output=True)
+
+  def tearDown(self):
+    self._analyzer.kill()
+    super().tearDown()
+
+  def test_icon_targets_loaded_once(self):
+    icon_path = os.path.join(self._tempdir, 'icon.png')
+    _write_icon(icon_path, 255)
+    event = event_listeners.IconMatchEvent(icon_path, [0., 0., .5, .5])
+
+    with mock.patch.object(screen_analyzer_thread.tvio, 'read_image',
+                           wraps=screen_analyzer_thread.tvio.read_image) as read_image:
+      self._analyzer.add_icon_match_event_listeners(event)
+      screen = torch.zeros((3, 8, 8))
+      for _ in range(3):
+        self._analyzer.match_icon_match_events(screen)
+      # The listener of another analyzer shares the decoded image.
+      screen_analyzer_thread.load_icon_target(icon_path)
+      self.assertEqual(1, read_image.call_count)
+
+      # A new modification time invalidates the cached image.
+      os.utime(icon_path, ns=(0, os.stat(icon_path).st_mtime_ns + 10**9))
+      screen_analyzer_thread.load_icon_target(icon_path)
+      self.assertEqual(2, read_image.call_count)
+
+    targets = self._icon_matcher.call_args[0][1]
+    self.assertLen(targets, 1)
+    self.assertEqual((3, 4, 4), tuple(targets[0].shape))
+    self.assertAlmostEqual(1., targets[0].max().item())
+
+  def test_modified_icon_reloaded(self):
+    icon_path = os.path.join(self._tempdir, 'icon.png')
+    _write_icon(icon_path, 255)
+    first = screen_analyzer_thread.load_icon_target(icon_path)
+    self.assertIs(first, screen_analyzer_thread.load_icon_target(icon_path))
+
+    _write_icon(icon_path, 0)
+    os.utime(icon_path, ns=(0, os.stat(icon_path).st_mtime_ns + 10**9))
+    second = screen_analyzer_thread.load_icon_target(icon_path)
+    self.assertAlmostEqual(0., second.max().item())
+
+  def _check_screen(self, screen: np.ndarray):
+    self._analyzer.write(
+        screen_analyzer_thread.ScreenAnalyzerThread.Signal.CHECK_SCREEN)
+    self._analyzer.write(screen)
+    self.assertEqual(screen_analyzer_thread.ScreenAnalyzerThread.Signal.OK,
+                     self._analyzer.read())
+
+  def test_unchanged_regions_skipped(self):
+    top = mock.Mock(region=[0., 0., 1., .5], needs_detection=False)
+    bottom = mock.Mock(region=[0., .5, 1., 1.], needs_detection=False)
+    self._analyzer.add_text_event_listeners(top, bottom)
+
+    screen = np.zeros((3, 8, 8), dtype=np.uint8)
+    self._check_screen(screen)
+    self.assertEqual(1, self._text_recognizer.call_count)
+    self.assertLen(self._text_recognizer.call_args[0][1], 2)
+
+    # An identical frame re-emits the last results without the model.
+    self._check_screen(screen.copy())
+    self.assertEqual(1, self._text_recognizer.call_count)
+    self.assertEqual(2, top.set.call_count)
+    bottom.set.assert_called_with('text')
+
+    # Only the changed region is analyzed again.
+    screen = screen.copy()
+    screen[:, 6, 6] = 255
+    self._check_screen(screen)
+    self.assertEqual(2, self._text_recognizer.call_count)
+    bboxes = self._text_recognizer.call_args[0][1]
+    self.assertLen(bboxes, 1)
+    self.assertEqual([0., 4., 8., 8.], bboxes[0][0].tolist())
+    self.assertEqual(3, top.set.call_count)
+    self.assertEqual(3, bottom.set.call_count)
+
+  def test_text_regions_prefetched_together(self):
+    prefetcher = mock.Mock()
+    analyzer = screen_analyzer_thread.ScreenAnalyzerThread(
+        naive_functions.text_detector, self._text_recognizer,
+        naive_functions.icon_detector, naive_functions.icon_recognizer,
+        self._icon_matcher,
+        lock=threading.Lock(),
+        block_input=True, block_output=True,
+        text_prefetcher=prefetcher)
+    self._analyzer.kill()
+    detect = mock.Mock(region=[0., 0., 1., .5], needs_detection=True)
+    recog = mock.Mock(region=[0., .5, 1., 1.], needs_detection=False)
+    analyzer.add_text_event_listeners(detect, recog)
+
+    self._analyzer = analyzer
+    screen = np.zeros((3, 8, 8), dtype=np.uint8)
+    self._check_screen(screen)
+    prefetcher.assert_called_once()
+    self.assertEqual([[0., 0., 8., 4.], [0., 4., 8., 8.]],
+                     [bbox[0].tolist() for bbox in prefetcher.call_args[0][1]])
+
+    # Nothing is prefetched for the unchanged regions.
+    self._check_screen(screen.copy())
+    prefetcher.assert_called_once()
+
+
+if __name__ == '__main__':
+  absltest.main()
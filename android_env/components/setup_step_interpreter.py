@@ -55,13 +55,13 @@ class SetupStepInterpreter():
 
   def __init__(self,
                adb_controller: adb_control.AdbController,
-               logcat: logcat_thread.LogcatThread):
+               logcat: logcat_thread.LogcatSubscription):
     """Initializes this interpreter.
 
     Args:
       adb_controller: An object to communicate with Android via ADB.
-      logcat: A LogcatThread instance connected to the same Android simulator
-        as AdbController.
+      logcat: A LogcatThread instance or a subscription to a LogcatReader
+        connected to the same Android simulator as AdbController.
     """
     self._adb_controller = adb_controller
     self._logcat_thread = logcat
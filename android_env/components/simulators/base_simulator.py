@@ -33,7 +33,7 @@
 """A base class for talking to different types of Android simulators."""
 
 import abc
-from typing import Optional, Union
+from typing import Any, Optional, Union
 from typing import List, Dict, Tuple
 
 #from absl import logging
@@ -142,6 +142,74 @@ class BaseSimulator(metaclass=abc.ABCMeta):
     except:
       return None
 
+  def dump_view_hierarchy(self,
+                          timeout: Optional[float] = None) -> Optional[bytes]:
+    """Returns the raw view hierarchy dump or None if it fails."""
+    return self._adb_controller.dump_view_hierarchy(timeout=timeout)
+
+  def supports_batched_step(self) -> bool:
+    """Returns whether `execute_step` can be called on this simulator."""
+    return False
+
+  def execute_step(
+      self,
+      steps: List[Tuple[str, Any]],
+      wait: float = 0.,
+      dump_view_hierarchy: bool = False
+  ) -> Optional[
+      Tuple[Dict[str, np.ndarray], Optional[bytes], List[Optional[bytes]]]]:
+    """Performs the actions of a step and fetches the results at once.
+
+    Simulators with costly round trips (e.g., a remote one) can implement this
+    together with `supports_batched_step` to save the separate calls of
+    `send_action`, `send_key_event`, `execute_adb_command` and
+    `get_observation`. It is called only if `supports_batched_step` returns
+    True.
+
+    Args:
+      steps: The operations to perform in order, each of which is one of
+        ("act", list of actions as `send_action`),
+        ("keyevents", list of key events as `send_key_event`) and
+        ("adb", command as `execute_adb_command`).
+      wait: Seconds to wait after the operations before the observation.
+      dump_view_hierarchy: Whether to dump the view hierarchy after the
+        observation.
+
+    Returns:
+      The observation as `get_observation`, the raw view hierarchy dump (None
+      if not requested or failed) and the outputs of the adb commands. None if
+      the simulator turns out not to batch the operations (e.g., an old remote
+      daemon), in which case nothing is performed, `supports_batched_step`
+      returns False from then on and the caller should perform them
+      separately.
+    """
+    raise NotImplementedError()
+
+  def save_snapshot(self, name: str) -> bool:
+    """Saves the current state of the simulator as a snapshot.
+
+    Args:
+      name: Name of the snapshot.
+
+    Returns:
+      True if the snapshot is saved, False if it fails or the simulator doesn't
+      support snapshots.
+    """
+    del name
+    return False
+
+  def load_snapshot(self, name: str) -> bool:
+    """Restores the simulator to a snapshot saved by `save_snapshot`.
+
+    Args:
+      name: Name of the snapshot.
+
+    Returns:
+      True if the snapshot is restored.
+    """
+    del name
+    return False
+
   @abc.abstractmethod
   def _get_observation(self) -> Optional[List[np.ndarray]]:
     """Implementation of the Android observation.
@@ -263,8 +331,20 @@ class BaseSimulator(metaclass=abc.ABCMeta):
     orientation.
     """
     pixels, timestamp = self._get_observation()
+    return self._assemble_observation(pixels, timestamp)
+
+  def _assemble_observation(self, pixels: np.ndarray,
+                            timestamp: np.int64) -> Dict[str, np.ndarray]:
+    """Assembles the raw screenshot and timestamp as `get_observation`.
+
+    The screenshot is handed on without copying as a read-only view, as it is
+    shared by the wrappers, recorders and event listeners. Copy it explicitly
+    to modify it.
+    """
     timestamp_delta = timestamp - self._last_obs_timestamp
     self._last_obs_timestamp = timestamp
+    pixels = pixels.view()
+    pixels.flags.writeable = False
     return {
         'pixels': pixels,
         'timedelta': timestamp_delta,
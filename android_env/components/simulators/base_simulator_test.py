@@ -96,6 +96,8 @@ class BaseSimulatorTest(absltest.TestCase):
     # Even though the FakeSimulator returns a 640x480x3 image, BaseSimulator
     # should add an extra layer for the last action.
     np.testing.assert_equal(observation['pixels'].shape, [640, 480, 3])
+    # The screenshot is shared without copying, thus it is read-only.
+    self.assertFalse(observation['pixels'].flags.writeable)
     # Because there was only a single step, the timestamp delta should be just
     # the timestamp returned by FakeSimulator.
     self.assertEqual(observation['timedelta'], 123456)
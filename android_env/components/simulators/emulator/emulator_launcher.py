@@ -72,7 +72,8 @@ class EmulatorLauncher():
       startup_wait_time_sec: int = 300,
       writable_system: bool = False,
       proxy_address: Optional[str] = None,
-      proxy_port: Optional[str] = None):
+      proxy_port: Optional[str] = None,
+      snapshot_enabled: bool = False):
     """Installs required files locally and launches the emulator.
 
     Args:
@@ -93,6 +94,10 @@ class EmulatorLauncher():
       writable_system: Whether to run with a writable /system partition.
       proxy_address: The address for the HTTP proxy.
       proxy_port: The port for the HTTP proxy.
+      snapshot_enabled: Whether to allow saving and loading snapshots at run
+        time. Snapshots cannot be saved by a read-only emulator, thus the AVD
+        cannot be shared by several emulator instances in this mode. The
+        quick-boot snapshot is still neither loaded nor saved.
     """
     self._local_tmp_dir: str = local_tmp_dir
     self._adb_port: Optional[int] = adb_port
@@ -110,6 +115,7 @@ class EmulatorLauncher():
     self._grpc_port: int = grpc_port
     self._proxy_address: Optional[str] = proxy_address
     self._proxy_port: Optional[str] = proxy_port
+    self._snapshot_enabled: bool = snapshot_enabled
 
     self._emulator = None
     self._emulator_output = None
@@ -150,10 +156,11 @@ class EmulatorLauncher():
     ports = ['-ports', '%s,%s' % (self._emulator_console_port, self._adb_port)]
     proxy = ["-http-proxy", "http://{:}:{:}".format(self._proxy_address, self._proxy_port)]\
             if self._proxy_address and self._proxy_port else []
+    snapshot = ['-no-snapshot-load', '-no-snapshot-save'] if self._snapshot_enabled\
+          else ['-no-snapshot', '-read-only']
     command = [
         self._emulator_path,
-        '-no-snapshot',
-        '-read-only',
+    ] + snapshot + [
         '-gpu', self._gpu_mode,
         '-no-audio',
         '-verbose',
@@ -33,6 +33,7 @@
 """A class that manages an Android Emulator."""
 
 import functools
+import itertools
 import tempfile
 from typing import Any, Optional, Union
 from typing import Dict, List
@@ -174,22 +175,43 @@ class EmulatorSimulator(base_simulator.BaseSimulator):
     )
 
   def send_action(self, action: Union[Dict[str, np.ndarray], List[Dict[str, np.ndarray]]]) -> None:
-    """Sends touch events to the emulator."""
+    """Sends touch events to the emulator.
+
+    A list of actions is played as a gesture: the i-th action is injected
+    `i*gap_sec` after the first one, no matter how long the former RPCs take.
+    An action identical to the previous one just holds the touch, thus no RPC
+    is sent for it, yet the trailing ones still hold it till their time before
+    returning, e.g., for a long press lifted by the next action.
+    """
     assert self._emulator_stub, 'Emulator stub has not been initialized yet.'
 
     if not isinstance(action, list):
       action: List[Dict[str, np.ndarray]] = [action]
 
+    start_time: float = time.monotonic()
+    last_event: Optional[emulator_controller_pb2.TouchEvent] = None
+    last_index: int = 0
     for i, act in enumerate(action):
-      if i>0:
-        time.sleep(self._gap_sec)
       touches = []
-      for i, finger_action in enumerate(self._split_action(act)):
+      for j, finger_action in enumerate(self._split_action(act)):
         x, y, down = self._prepare_action(finger_action)
         touches.append(emulator_controller_pb2.Touch(
-            x=x, y=y, pressure=int(down), identifier=i))
-      self._emulator_stub.sendTouch(
-          emulator_controller_pb2.TouchEvent(touches=touches))
+            x=x, y=y, pressure=int(down), identifier=j))
+      event = emulator_controller_pb2.TouchEvent(touches=touches)
+      if event==last_event:
+        continue
+
+      delay: float = start_time + i*self._gap_sec - time.monotonic()
+      if delay>0.:
+        time.sleep(delay)
+      self._emulator_stub.sendTouch(event)
+      last_event = event
+      last_index = i
+
+    if last_index<len(action)-1:
+      delay: float = start_time + (len(action)-1)*self._gap_sec - time.monotonic()
+      if delay>0.:
+        time.sleep(delay)
 
   def send_key_event(self, keyevents: List[Dict[str, str]]):
     #  method send_key_event {{{ # 
@@ -202,24 +224,58 @@ class EmulatorSimulator(base_simulator.BaseSimulator):
           }
     """
 
-    for evt in keyevents:
-      if evt["type"]=="keycode":
-        self._adb_controller.input_key(evt["value"])
-      elif evt["type"]=="text":
-        original_clipboard: emulator_controller_pb2.ClipData = self._emulator_stub.getClipboard(empty_pb2.Empty())
-        self._emulator_stub.setClipboard( emulator_controller_pb2.ClipData(
-                                           text=evt["value"]
-                                         )
-                                        )
-        self._adb_controller.input_key("KEYCODE_PASTE")
+    # Consecutive key codes are pressed through one `input keyevent` and
+    # consecutive texts are pasted at once. The clipboard is saved before the
+    # first paste and restored after the last one.
+    key_codes: List[str] = []
+    original_clipboard: Optional[emulator_controller_pb2.ClipData] = None
+    try:
+      for evt_type, evts in itertools.groupby(keyevents, key=lambda evt: evt["type"]):
+        if evt_type=="keycode":
+          key_codes += (evt["value"] for evt in evts)
+        elif evt_type=="text":
+          self._adb_controller.input_keys(key_codes)
+          if original_clipboard is None:
+            original_clipboard = self._emulator_stub.getClipboard(empty_pb2.Empty())
+          self._emulator_stub.setClipboard( emulator_controller_pb2.ClipData(
+                                             text="".join(evt["value"] for evt in evts)
+                                           )
+                                          )
+          key_codes = ["KEYCODE_PASTE"]
+      self._adb_controller.input_keys(key_codes)
+    finally:
+      if original_clipboard is not None:
         self._emulator_stub.setClipboard(original_clipboard)
     #  }}} method send_key_event # 
 
+  def save_snapshot(self, name: str) -> bool:
+    return self._adb_controller.save_snapshot(name)
+
+  def load_snapshot(self, name: str) -> bool:
+    return self._adb_controller.load_snapshot(name)
+
   def _get_observation(self) -> Optional[List[np.ndarray]]:
     """Fetches the latest observation from the emulator."""
     assert self._emulator_stub, 'Emulator stub has not been initialized yet.'
     assert self._image_format, 'ImageFormat has not been initialized yet.'
     image_proto = self._emulator_stub.getScreenshot(self._image_format)
+    return self.observation_from_image(image_proto)
+
+  def stream_screenshots(self):
+    """Opens a gRPC stream of the screenshots pushed by the emulator.
+
+    The emulator pushes a new screenshot whenever the screen changes. The
+    returned stream yields `emulator_controller_pb2.Image` and can be stopped
+    by its `cancel()` method.
+    """
+    assert self._emulator_stub, 'Emulator stub has not been initialized yet.'
+    assert self._image_format, 'ImageFormat has not been initialized yet.'
+    return self._emulator_stub.streamScreenshot(self._image_format)
+
+  @staticmethod
+  def observation_from_image(
+      image_proto: emulator_controller_pb2.Image) -> List[np.ndarray]:
+    """Converts a screenshot proto to [image, timestamp]."""
     h, w = image_proto.format.height, image_proto.format.width
     image = np.frombuffer(image_proto.image, dtype='uint8', count=h * w * 3)
     image.shape = (h, w, 3)
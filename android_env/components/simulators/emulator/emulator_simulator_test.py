@@ -207,6 +207,106 @@ class EmulatorSimulatorTest(absltest.TestCase):
     #     y-coordinate: 0
     #     down: False  # It's a lift command.
 
+  @mock.patch.object(emulator_simulator.time, 'monotonic', return_value=0.)
+  @mock.patch.object(emulator_simulator.time, 'sleep', autospec=True)
+  def test_send_gesture(self, mock_sleep, unused_mock_monotonic):
+    tmp_dir = absltest.get_default_test_tmpdir()
+    simulator = emulator_simulator.EmulatorSimulator(
+        num_fingers=1,
+        tmp_dir=tmp_dir,
+        emulator_launcher_args={'grpc_port': 1234},
+        adb_controller_args={
+            'adb_path': '/my/adb',
+            'adb_server_port': 5037,
+            'prompt_regex': 'awesome>',
+        },
+        gap_sec=0.1)
+    self._adb_controller.get_screen_dimensions.return_value = (1000, 1000)
+    simulator.launch()
+
+    touch = {'action_type': np.array(action_type.ActionType.TOUCH),
+             'touch_position': np.array([0.5, 0.5])}
+    lift = {'action_type': np.array(action_type.ActionType.LIFT),
+            'touch_position': np.array([0.5, 0.5])}
+    simulator.send_action([touch] * 3 + [lift])
+
+    # The held touch is sent once and the lift is timed by the frame index.
+    simulator._emulator_stub.sendTouch.assert_has_calls([
+        mock.call(emulator_controller_pb2.TouchEvent(touches=[
+            emulator_controller_pb2.Touch(
+                x=500, y=500, pressure=1, identifier=0)])),
+        mock.call(emulator_controller_pb2.TouchEvent(touches=[
+            emulator_controller_pb2.Touch(
+                x=500, y=500, pressure=0, identifier=0)])),
+    ])
+    self.assertEqual(2, simulator._emulator_stub.sendTouch.call_count)
+    mock_sleep.assert_called_once_with(mock.ANY)
+    self.assertAlmostEqual(0.3, mock_sleep.call_args[0][0])
+
+  @mock.patch.object(emulator_simulator.time, 'monotonic', return_value=0.)
+  @mock.patch.object(emulator_simulator.time, 'sleep', autospec=True)
+  def test_send_gesture_with_trailing_hold(self, mock_sleep,
+                                           unused_mock_monotonic):
+    tmp_dir = absltest.get_default_test_tmpdir()
+    simulator = emulator_simulator.EmulatorSimulator(
+        num_fingers=1,
+        tmp_dir=tmp_dir,
+        emulator_launcher_args={'grpc_port': 1234},
+        adb_controller_args={
+            'adb_path': '/my/adb',
+            'adb_server_port': 5037,
+            'prompt_regex': 'awesome>',
+        },
+        gap_sec=0.1)
+    self._adb_controller.get_screen_dimensions.return_value = (1000, 1000)
+    simulator.launch()
+
+    touch = {'action_type': np.array(action_type.ActionType.TOUCH),
+             'touch_position': np.array([0.5, 0.5])}
+    simulator.send_action([touch] * 3)
+
+    # The touch is sent once and held till the time of the last frame.
+    simulator._emulator_stub.sendTouch.assert_called_once_with(
+        emulator_controller_pb2.TouchEvent(touches=[
+            emulator_controller_pb2.Touch(
+                x=500, y=500, pressure=1, identifier=0)]))
+    mock_sleep.assert_called_once_with(mock.ANY)
+    self.assertAlmostEqual(0.2, mock_sleep.call_args[0][0])
+
+  def test_send_key_event_batched(self):
+    tmp_dir = absltest.get_default_test_tmpdir()
+    simulator = emulator_simulator.EmulatorSimulator(
+        num_fingers=1,
+        tmp_dir=tmp_dir,
+        emulator_launcher_args={'grpc_port': 1234},
+        adb_controller_args={
+            'adb_path': '/my/adb',
+            'adb_server_port': 5037,
+            'prompt_regex': 'awesome>',
+        })
+    self._adb_controller.get_screen_dimensions.return_value = (1000, 1000)
+    simulator.launch()
+    original_clipboard = emulator_controller_pb2.ClipData(text='original')
+    simulator._emulator_stub.getClipboard.return_value = original_clipboard
+
+    simulator.send_key_event([
+        {'type': 'keycode', 'value': 'KEYCODE_DEL'},
+        {'type': 'text', 'value': 'Hello'},
+        {'type': 'text', 'value': ' world'},
+        {'type': 'keycode', 'value': 'KEYCODE_ENTER'},
+    ])
+
+    # The texts are pasted at once and the key codes around are batched.
+    self._adb_controller.input_keys.assert_has_calls([
+        mock.call(['KEYCODE_DEL']),
+        mock.call(['KEYCODE_PASTE', 'KEYCODE_ENTER']),
+    ])
+    simulator._emulator_stub.getClipboard.assert_called_once()
+    simulator._emulator_stub.setClipboard.assert_has_calls([
+        mock.call(emulator_controller_pb2.ClipData(text='Hello world')),
+        mock.call(original_clipboard),
+    ])
+
   def test_multitouch_action(self):
     tmp_dir = absltest.get_default_test_tmpdir()
     simulator = emulator_simulator.EmulatorSimulator(
@@ -14,27 +14,34 @@
 
 # Created by Danyang Zhang @X-Lance.
 
-from flask import Flask, request, session
+from flask import Flask, request, session, Response
 import flask_compress
 import threading
+import concurrent.futures
 
 import secrets
+import itertools
 import yaml
 import os.path
 import numpy as np
 import base64
 from PIL import Image
 import io
+import json
 
 import logging
 import datetime
+import atexit
+import time
 import sys
 
 from android_env.components.simulators import EmulatorSimulator
 from android_env.components.adb_controller import AdbController
 from android_env.components.adb_log_stream import AdbLogStream
+from android_env.components.simulators.remote import remote_base
+from android_env.components.simulators.remote.simulator_pool import SimulatorPool
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from typing import Any, Optional, Union, Iterator
 
 app = Flask(__name__)
@@ -81,8 +88,63 @@ with open("android-envd.conf.yaml") as f:
 #   "sid": int
 # }
 
-manager: List[Dict[str, Any]] = []
+# sid -> session dict; the entry is deleted once the session is closed
+manager: Dict[int, Dict[str, Any]] = {}
+sid_counter: Iterator[int] = itertools.count()
 glock = threading.Lock()
+# runs the view hierarchy dumps of `step`
+step_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="step")
+
+def _create_simulator() -> EmulatorSimulator:
+    #  function _create_simulator {{{ # 
+    adb_controller_args = { "adb_path": os.path.expanduser(config.get("adb_path", "~/Android/Sdk/platform-tools/adb"))
+                          , "adb_server_port": 5037
+                          , "prompt_regex": r"\w*:\/ [$#]"
+                          }
+    emulator_launcher_args = { "avd_name": config["avd_name"]
+                             , "android_avd_home": os.path.expanduser(config.get("android_avd_home", "~/.android/avd"))
+                             , "android_sdk_root": os.path.expanduser(config.get("android_sdk_root", "~/Android/Sdk"))
+                             , "emulator_path": os.path.expanduser(config.get("emulator_path", "~/Android/Sdk/emulator/emulator"))
+                             , "run_headless": config.get("run_headless", False)
+                             , "gpu_mode": "swiftshader_indirect"
+                             , "writable_system": False
+                             }
+    adb_root = False
+    frida_server: Optional[str] = None
+    gap_sec: float = config.get("gap_sec", 0.05)
+
+    if "mitm_config" in config\
+            and config["mitm_config"] is not None\
+            and len(config["mitm_config"])>0:
+        mitm_config: Dict[str, str] = config["mitm_config"]
+
+        emulator_launcher_args["writable_system"] = True
+        emulator_launcher_args["proxy_address"] = mitm_config.get("address", "127.0.0.1")
+        emulator_launcher_args["proxy_port"] = mitm_config.get("port", "8080")
+
+        if mitm_config["method"]=="frida":
+            adb_root = True
+            frida_server = mitm_config.get("frida-server", "/data/local/tmp/frida-server")
+            adb_controller_args["frida"] = mitm_config.get("frida", "frida")
+            adb_controller_args["frida_script"] = mitm_config.get("frida-script", "frida-script.js")
+
+    return EmulatorSimulator( adb_controller_args=adb_controller_args
+                            , emulator_launcher_args=emulator_launcher_args
+                            , adb_root=adb_root
+                            , frida_server=frida_server
+                            , gap_sec=gap_sec
+                            )
+    #  }}} function _create_simulator # 
+
+# pool of the pre-launched simulators, enabled by `pool_size` in the config
+pool: Optional[SimulatorPool] = SimulatorPool( _create_simulator
+                                             , config["pool_size"]
+                                             , health_check_interval=config.get("pool_health_check_interval", 60.)
+                                             )\
+                                if config.get("pool_size", 0)>0\
+                              else None
+if pool is not None:
+    atexit.register(pool.close)
 
 @app.route("/init", methods=["POST"])
 def init() -> str:
@@ -90,51 +152,22 @@ def init() -> str:
     if not session.get("is_launched", False):
         session["is_launched"] = True
 
-        adb_controller_args = { "adb_path": os.path.expanduser(config.get("adb_path", "~/Android/Sdk/platform-tools/adb"))
-                              , "adb_server_port": 5037
-                              , "prompt_regex": r"\w*:\/ [$#]"
-                              }
-        emulator_launcher_args = { "avd_name": config["avd_name"]
-                                 , "android_avd_home": os.path.expanduser(config.get("android_avd_home", "~/.android/avd"))
-                                 , "android_sdk_root": os.path.expanduser(config.get("android_sdk_root", "~/Android/Sdk"))
-                                 , "emulator_path": os.path.expanduser(config.get("emulator_path", "~/Android/Sdk/emulator/emulator"))
-                                 , "run_headless": config.get("run_headless", False)
-                                 , "gpu_mode": "swiftshader_indirect"
-                                 , "writable_system": False
-                                 }
-        adb_root = False
-        frida_server: Optional[str] = None
-        gap_sec: float = config.get("gap_sec", 0.05)
-
-        if "mitm_config" in config\
-                and config["mitm_config"] is not None\
-                and len(config["mitm_config"])>0:
-            mitm_config: Dict[str, str] = config["mitm_config"]
-
-            emulator_launcher_args["writable_system"] = True
-            emulator_launcher_args["proxy_address"] = mitm_config.get("address", "127.0.0.1")
-            emulator_launcher_args["proxy_port"] = mitm_config.get("port", "8080")
-
-            if mitm_config["method"]=="frida":
-                adb_root = True
-                frida_server = mitm_config.get("frida-server", "/data/local/tmp/frida-server")
-                adb_controller_args["frida"] = mitm_config.get("frida", "frida")
-                adb_controller_args["frida_script"] = mitm_config.get("frida-script", "frida-script.js")
-
-        simulator = EmulatorSimulator( adb_controller_args=adb_controller_args
-                                     , emulator_launcher_args=emulator_launcher_args
-                                     , adb_root=adb_root
-                                     , frida_server=frida_server
-                                     , gap_sec=gap_sec
-                                     )
+        # lease a launched simulator from the pool if possible, otherwise
+        # boot a new one
+        simulator: Optional[EmulatorSimulator] = pool.lease() if pool is not None else None
+        prelaunched: bool = simulator is not None
+        if simulator is None:
+            simulator = _create_simulator()
 
         with glock:
-            session["sid"] = len(manager)
-            manager.append({})
+            session["sid"] = next(sid_counter)
+            manager[session["sid"]] = {}
         sid: int = session["sid"]
         manager[sid]["lock"] = threading.Lock()
         with manager[sid]["lock"]:
             manager[sid]["simulator"] = simulator
+            manager[sid]["prelaunched"] = prelaunched
+            manager[sid]["actions"] = remote_base.ActionLog()
     return "OK"
     #  }}} function init # 
 
@@ -143,7 +176,11 @@ def launch() -> str:
     #  function launch {{{ # 
     sid: int = session["sid"]
     with manager[sid]["lock"]:
-        manager[sid]["simulator"].launch()
+        if manager[sid].get("prelaunched", False):
+            # the leased simulator has been launched by the pool
+            manager[sid]["prelaunched"] = False
+        else:
+            manager[sid]["simulator"].launch()
     return "OK"
     #  }}} function launch # 
 
@@ -161,11 +198,19 @@ def close() -> str:
     #  function close {{{ # 
     sid: int = session["sid"]
     with manager[sid]["lock"]:
-        manager[sid]["simulator"].close()
         if "adb_controller" in manager[sid]:
             for adb_ctrl in manager[sid]["adb_controller"]:
                 adb_ctrl.close()
+            del manager[sid]["adb_controller"]
+        if pool is not None and pool.owns(manager[sid]["simulator"]):
+            # the simulator will be restarted and leased again
+            pool.release(manager[sid]["simulator"])
+        else:
+            manager[sid]["simulator"].close()
         session["is_launched"] = False
+        # a stale sid must not drive the simulator leased to another session
+        with glock:
+            del manager[sid]
     return "OK"
     #  }}} function close # 
 
@@ -227,12 +272,9 @@ def set_log_filters() -> str:
     return "OK"
     #  }}} function set_log_filters # 
 
-@app.route("/act", methods=["POST"])
-def action() -> str:
-    #  function action {{{ # 
-    args: List[Dict[str, Union[int, List[float], str]]] =\
-            request.json
-
+def _parse_actions(args: List[Dict[str, Union[int, List[float], str]]])\
+        -> List[Dict[str, np.ndarray]]:
+    #  function _parse_actions {{{ # 
     action_dicts: List[Dict[str, np.ndarray]] = []
     for arg in args:
         action_dict: Dict[str, np.ndarray] = {}
@@ -244,10 +286,19 @@ def action() -> str:
         if "response" in arg:
             action_dict["response"] = np.array(arg["response"], dtype=np.object_)
         action_dicts.append(action_dict)
+    return action_dicts
+    #  }}} function _parse_actions # 
+
+@app.route("/act", methods=["POST"])
+def action() -> str:
+    #  function action {{{ # 
+    args: List[Dict[str, Union[int, List[float], str]]] =\
+            request.json
 
     sid: int = session["sid"]
     with manager[sid]["lock"]:
-        manager[sid]["simulator"].send_action(action_dicts)
+        manager[sid]["simulator"].send_action(_parse_actions(args))
+        manager[sid]["actions"].record()
     return "OK"
     #  }}} function action # 
 
@@ -259,61 +310,332 @@ def keyevents() -> str:
     sid: int = session["sid"]
     with manager[sid]["lock"]:
         manager[sid]["simulator"].send_key_event(args)
+        manager[sid]["actions"].record()
     return "OK"
     #  }}} function keyevents # 
 
-@app.route("/observ", methods=["POST"])
-def observation() -> Dict[str, Union[str, List[int], int]]:
-    #  function observation {{{ # 
+def _encode_observation( observation: np.ndarray
+                       , timestamp: np.int64
+                       , args: Dict[str, Any]
+                       , delta_state: Optional[Dict[str, Any]] = None
+                       ) -> Tuple[bytes, str, List[int], List[int], int]:
+    #  function _encode_observation {{{ # 
     """
-    Returns:
-        Dict[str, Union[str, List[int], int]]: dict like
+    Args:
+        observation (np.ndarray): array of uint8 with shape (H, W, 3)
+        timestamp (np.int64): the timestamp
+        args (Dict[str, Any]): dict like
           {
-            "img": str as the base64 of image bytes
-            "size": [int, int] as [width, height] of image
-            "time": int as the timestamp
+            "resize_to": [int, int] as [width, height]
+            "compression": str, "jpeg" | "png" | "none" | "delta", default to
+              jpeg
           }
-    """
-    args: Dict[str, List[int]] = request.json
+        delta_state (Optional[Dict[str, Any]]): the reference frame held by
+          the client for the "delta" compression, dict like
+          {
+            "frame": np.ndarray
+            "time": int
+          }
+          which will be updated to the encoded frame. a key frame is encoded
+          if it is empty or None.
 
-    sid: int = session["sid"]
-    with manager[sid]["lock"]:
-        observation: np.ndarray
-        timestamp: np.int64
-        observation, timestamp = manager[sid]["simulator"]._get_observation()
+    Returns:
+        bytes: the image bytes
+        str: the compression actually used
+        List[int]: [width, height] of image
+        List[int]: [width, height] of the raw screen
+        int: the timestamp
+    """
 
     raw_width: int
     raw_height: int
     raw_height, raw_width, _ = observation.shape
 
-    observation: Image.Image = Image.fromarray(observation)
-
-    if "resize_to" in args:
-        observation = observation.resize(args["resize_to"])
-    width: int
-    height: int
-    width, height = observation.size
+    compression: str = args.get("compression", "jpeg")
+    if compression not in remote_base.OBSERVATION_COMPRESSIONS:
+        compression = "jpeg"
 
-    if args.get("compression", "jpeg") == "jpeg":
-        with io.BytesIO() as bfr:
-            observation.save(bfr, "jpeg")
-            observation: bytes = bfr.getvalue()
-    elif args.get("compression", "jpeg") == "png":
-        with io.BytesIO() as bfr:
-            observation.save(bfr, "png")
-            observation: bytes = bfr.getvalue()
-    elif args.get("compression", "jpeg") == "none":
+    if compression in {"none", "delta"} and "resize_to" not in args:
+        # no need to route through PIL
+        observation = np.ascontiguousarray(observation, dtype=np.uint8)
+        width, height = raw_width, raw_height
+    else:
+        observation: Image.Image = Image.fromarray(observation)
+
+        if "resize_to" in args:
+            observation = observation.resize(args["resize_to"])
+        width: int
+        height: int
+        width, height = observation.size
+
+    if compression=="delta":
+        observation: np.ndarray = np.asarray(observation, dtype=np.uint8)
+        delta_state = delta_state if delta_state is not None else {}
+        encoded: bytes = remote_base.delta_encode( observation
+                                                 , delta_state.get("frame")
+                                                 , delta_state.get("time", -1)
+                                                 )
+        delta_state["frame"] = observation
+        delta_state["time"] = timestamp.item()
+        observation: bytes = encoded
+    elif compression=="none":
         observation: bytes = observation.tobytes()
     else:
         with io.BytesIO() as bfr:
-            observation.save(bfr, "jpeg")
+            observation.save(bfr, compression)
             observation: bytes = bfr.getvalue()
 
+    return observation, compression, [width, height], [raw_width, raw_height], timestamp.item()
+    #  }}} function _encode_observation # 
+
+def _fetch_observation(args: Dict[str, Any])\
+        -> Tuple[bytes, str, List[int], List[int], int]:
+    #  function _fetch_observation {{{ # 
+    """
+    Args:
+        args (Dict[str, Any]): the same as `_encode_observation`, and
+          "delta_base": optional int as the timestamp of the reference frame
+          held by the client for the "delta" compression
+
+    Returns:
+        the same as `_encode_observation`
+    """
+
+    sid: int = session["sid"]
+    with manager[sid]["lock"]:
+        observation: np.ndarray
+        timestamp: np.int64
+        observation, timestamp = manager[sid]["simulator"]._get_observation()
+
+        # the last frame sent to the client
+        delta_state: Dict[str, Any] = manager[sid].setdefault("delta_state", {})
+        if args.get("delta_base")!=delta_state.get("time"):
+            delta_state.clear()
+        return _encode_observation(observation, timestamp, args, delta_state)
+    #  }}} function _fetch_observation # 
+
+def _pack_observation( compression: str
+                     , size: List[int]
+                     , raw_size: List[int]
+                     , timestamp: int
+                     ) -> bytes:
+    #  function _pack_observation {{{ # 
+    return remote_base.OBSERVATION_HEADER.pack( remote_base.OBSERVATION_COMPRESSIONS.index(compression)
+                                              , *size, *raw_size
+                                              , timestamp
+                                              )
+    #  }}} function _pack_observation # 
+
+@app.route("/observ", methods=["POST"])
+def observation() -> Dict[str, Union[str, List[int], int]]:
+    #  function observation {{{ # 
+    """
+    Returns:
+        Dict[str, Union[str, List[int], int]]: dict like
+          {
+            "img": str as the base64 of image bytes
+            "size": [int, int] as [width, height] of image
+            "raw_size": [int, int] as [width, height] of the raw screen
+            "time": int as the timestamp
+          }
+    """
+
+    args: Dict[str, Any] = request.json
+    if args.get("compression")=="delta":
+        # delta frames are only supported by the binary endpoints
+        args = dict(args, compression="jpeg")
+    observation, _, size, raw_size, timestamp = _fetch_observation(args)
     observation: str = base64.b64encode(observation).decode()
 
     return { "img": observation
-           , "size": [width, height]
-           , "raw_size": [raw_width, raw_height]
-           , "time": timestamp.item()
+           , "size": size
+           , "raw_size": raw_size
+           , "time": timestamp
            }
     #  }}} function observation # 
+
+@app.route("/observ_bin", methods=["POST"])
+def binary_observation() -> Response:
+    #  function binary_observation {{{ # 
+    """
+    Returns:
+        Response: application/octet-stream of
+          `remote_base.OBSERVATION_HEADER` followed by the image bytes
+    """
+
+    observation, compression, size, raw_size, timestamp = _fetch_observation(request.json)
+    header: bytes = _pack_observation(compression, size, raw_size, timestamp)
+    return Response( [header, observation]
+                   , mimetype="application/octet-stream"
+                   , headers={"Content-Length": str(len(header)+len(observation))}
+                   )
+    #  }}} function binary_observation #
+
+@app.route("/observ_stream", methods=["POST"])
+def observation_stream() -> Response:
+    #  function observation_stream {{{ # 
+    """
+    Pushes the screen through the emulator's `streamScreenshot` as long as
+    the connection is kept. The emulator pushes a frame on every screen
+    change, and at most one frame (the latest) is forwarded per `interval`.
+
+    Args in the json body:
+        the same as `observ`, and
+        "interval": float as the minimum interval between two frames in
+          seconds, default to 0.
+
+    Returns:
+        Response: chunked application/octet-stream of frames, each of which
+          is `remote_base.STREAM_FRAME_PREFIX` of the frame length and the
+          number of the actions performed before the frame was generated,
+          followed
+          by `remote_base.OBSERVATION_HEADER` and the image bytes
+    """
+
+    args: Dict[str, Any] = request.json
+    interval: float = args.get("interval", 0.)
+
+    sid: int = session["sid"]
+    # the stream ends once the session is closed
+    entry: Dict[str, Any] = manager[sid]
+    actions: remote_base.ActionLog = entry["actions"]
+    screenshots = entry["simulator"].stream_screenshots()
+
+    # the latest screenshot is kept by the receiving thread and fetched by
+    # the response generator at the requested rate
+    latest: List[Any] = [None]
+    condition = threading.Condition()
+    # the frames are delivered in order, thus each delta frame refers to the
+    # last one in this stream
+    delta_state: Dict[str, Any] = {}
+
+    def _receive():
+        try:
+            for image_proto in screenshots:
+                with condition:
+                    latest[0] = ( image_proto
+                                , actions.nb_actions_before(image_proto.timestampUs)
+                                )
+                    condition.notify()
+        except Exception as e:
+            logger.info("Screenshot stream of session %d ends: %s", sid, str(e))
+        finally:
+            with condition:
+                latest[0] = StopIteration
+                condition.notify()
+    threading.Thread(target=_receive, daemon=True).start()
+
+    def _generate() -> Iterator[bytes]:
+        try:
+            last_time: float = 0.
+            while manager.get(sid) is entry:
+                # no frame arriving in the heartbeat interval means that the
+                # last frame is up to date after the actions performed before
+                # the interval
+                nb_actions: int = actions.nb_actions
+                with condition:
+                    condition.wait_for( lambda: latest[0] is not None
+                                      , timeout=remote_base.FRAME_HEARTBEAT_INTERVAL
+                                      )
+                    received = latest[0]
+                    latest[0] = None
+                if received is None:
+                    yield remote_base.STREAM_FRAME_PREFIX.pack(0, nb_actions)
+                    continue
+                if received is StopIteration:
+                    return
+                image_proto, nb_actions = received
+
+                observation, timestamp = EmulatorSimulator.observation_from_image(image_proto)
+                frame: Tuple[bytes, str, List[int], List[int], int] =\
+                        _encode_observation(observation, timestamp, args, delta_state)
+                header: bytes = _pack_observation(*frame[1:])
+                yield remote_base.STREAM_FRAME_PREFIX.pack(len(header)+len(frame[0]), nb_actions)
+                yield header
+                yield frame[0]
+
+                elapsed: float = time.time() - last_time
+                if elapsed<interval:
+                    time.sleep(interval-elapsed)
+                last_time = time.time()
+        finally:
+            screenshots.cancel()
+
+    return Response(_generate(), mimetype="application/octet-stream")
+    #  }}} function observation_stream # 
+
+@app.route("/step", methods=["POST"])
+def step() -> Response:
+    #  function step {{{ # 
+    """
+    Performs the actions of a step and returns the adb outputs, the view
+    hierarchy and the observation in one response.
+
+    Args in the json body:
+        the same as `observ_bin`, and
+        "steps": list of [str, Any], each of which is one of
+          ["act", list of dicts as `act`],
+          ["keyevents", list of dicts as `keyevents`] and
+          ["adb", list of str as the adb command]
+        "wait": float as the seconds to wait after the actions, default to 0.
+        "vh": bool, whether to dump the view hierarchy, default to False
+        "observ": bool, whether to return the observation, default to True
+
+    Returns:
+        Response: application/octet-stream of `remote_base.FRAME_LENGTH` of
+          the length of a json dict like
+            {
+              "adb_outputs": list of str or None as base64 of outputs
+              "vh": str or None as base64 of the view hierarchy dump
+            }
+          followed by the json and then the same as `observ_bin` if
+          "observ"
+    """
+
+    args: Dict[str, Any] = request.json
+
+    sid: int = session["sid"]
+    simulator: EmulatorSimulator = manager[sid]["simulator"]
+    adb_outputs: List[Optional[str]] = []
+    with manager[sid]["lock"]:
+        for kind, payload in args["steps"]:
+            if kind=="act":
+                simulator.send_action(_parse_actions(payload))
+            elif kind=="keyevents":
+                simulator.send_key_event(payload)
+            elif kind=="adb":
+                output: Optional[bytes] = simulator.execute_adb_command(payload)
+                adb_outputs.append( base64.b64encode(output).decode()\
+                                        if isinstance(output, bytes) else output
+                                  )
+        manager[sid]["actions"].record()
+    wait: float = args.get("wait", 0.)
+    if wait>0.:
+        time.sleep(wait)
+
+    # the view hierarchy is dumped through adb concurrently with the
+    # screenshot from the emulator
+    view_hierarchy: Optional[concurrent.futures.Future] =\
+            step_executor.submit(simulator.dump_view_hierarchy)\
+            if args.get("vh", False) else None
+    if args.get("observ", True):
+        observation, compression, size, raw_size, timestamp = _fetch_observation(args)
+        observation: List[bytes] = [ _pack_observation(compression, size, raw_size, timestamp)
+                                   , observation
+                                   ]
+    else:
+        observation: List[bytes] = []
+
+    view_hierarchy: Optional[bytes] = None if view_hierarchy is None\
+                                        else view_hierarchy.result()
+    results: bytes = json.dumps( { "adb_outputs": adb_outputs
+                                 , "vh": None if view_hierarchy is None\
+                                        else base64.b64encode(view_hierarchy).decode()
+                                 }
+                               ).encode()
+    chunks: List[bytes] = [remote_base.FRAME_LENGTH.pack(len(results)), results] + observation
+    return Response( chunks
+                   , mimetype="application/octet-stream"
+                   , headers={"Content-Length": str(sum(map(len, chunks)))}
+                   )
+    #  }}} function step # 
@@ -16,14 +16,214 @@
 
 import abc
 import requests
+import struct
+import threading
+import time
+import zlib
+import collections
+import numpy as np
 from typing import Optional, Any, Union
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Deque
 
 #from absl import logging
 import logging
 
 logger = logging.getLogger("mobile_env.simulator.remote_base")
 
+# header of the binary observation (`observ_bin`), in little endian:
+#   compression (uint8): index into `OBSERVATION_COMPRESSIONS`
+#   width, height (uint16): size of the transferred image
+#   raw_width, raw_height (uint16): size of the original screen
+#   time (int64): the timestamp
+# the image bytes follow the header immediately
+OBSERVATION_HEADER = struct.Struct("<BHHHHq")
+OBSERVATION_COMPRESSIONS: Tuple[str, ...] = ("none", "jpeg", "png", "delta")
+# length (uint32, little endian) of a frame excluding the length itself
+FRAME_LENGTH = struct.Struct("<I")
+# each frame of the pushed screen stream (`observ_stream`) is prefixed with its
+# length as `FRAME_LENGTH` and the number (uint32, little endian) of the
+# actions (`act`, `keyevents` and `step` requests) performed in the session
+# before the frame was generated (see `ActionLog`). a zero length is sent as
+# the heartbeat if the
+# screen doesn't change for `FRAME_HEARTBEAT_INTERVAL` seconds, stating that
+# the last frame is still up to date after the given number of actions.
+STREAM_FRAME_PREFIX = struct.Struct("<II")
+FRAME_HEARTBEAT_INTERVAL = 1.
+# the response of the batched step (`step`) is `FRAME_LENGTH` of a json dict
+# of the step results, followed by the json and then optionally the same as
+# `observ_bin`.
+
+# the "delta" compression transfers only the tiles changed since a reference
+# frame the client holds. the image bytes are `DELTA_REFERENCE` of the
+# timestamp of the reference frame (-1 for none, i.e., a key frame) followed
+# by the zlib-compressed bit mask of the changed tiles (in row-major order)
+# and the raw RGB pixels of the changed tiles.
+DELTA_TILE_SIZE = 32
+DELTA_REFERENCE = struct.Struct("<q")
+
+def _pad_to_tiles(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    #  function _pad_to_tiles {{{ # 
+    """
+    Args:
+        image (np.ndarray): array of uint8 with shape (H, W, 3)
+
+    Returns:
+        np.ndarray: the padded copy of `image` with shape (H', W', 3)
+        np.ndarray: view of the padded copy with shape (H'/T, W'/T, T, T, 3);
+          T is `DELTA_TILE_SIZE`
+    """
+
+    height, width, nb_channels = image.shape
+    padded: np.ndarray = np.pad( image
+                               , ( (0, -height%DELTA_TILE_SIZE)
+                                 , (0, -width%DELTA_TILE_SIZE)
+                                 , (0, 0)
+                                 )
+                               )
+    tiles: np.ndarray = padded.reshape(( padded.shape[0]//DELTA_TILE_SIZE, DELTA_TILE_SIZE
+                                       , padded.shape[1]//DELTA_TILE_SIZE, DELTA_TILE_SIZE
+                                       , nb_channels
+                                       )
+                                      ).swapaxes(1, 2)
+    return padded, tiles
+    #  }}} function _pad_to_tiles # 
+
+def delta_encode( image: np.ndarray
+                , reference: Optional[np.ndarray]
+                , reference_time: int
+                ) -> bytes:
+    #  function delta_encode {{{ # 
+    """
+    Args:
+        image (np.ndarray): array of uint8 with shape (H, W, 3)
+        reference (Optional[np.ndarray]): the frame the client holds, array of
+          uint8 with shape (H, W, 3). None or a frame of other shape leads to
+          a key frame.
+        reference_time (int): timestamp of `reference`
+
+    Returns:
+        bytes: the encoded image bytes
+    """
+
+    if reference is None or reference.shape!=image.shape:
+        reference = np.zeros_like(image)
+        reference_time = -1
+
+    _, image_tiles = _pad_to_tiles(image)
+    _, reference_tiles = _pad_to_tiles(reference)
+    mask: np.ndarray = np.any(image_tiles!=reference_tiles, axis=(2, 3, 4))
+
+    return DELTA_REFERENCE.pack(reference_time)\
+         + zlib.compress( np.packbits(mask).tobytes() + image_tiles[mask].tobytes()
+                        , 1
+                        )
+    #  }}} function delta_encode # 
+
+def delta_decode( payload: Union[bytes, np.ndarray]
+                , width: int
+                , height: int
+                , reference: Optional[Tuple[np.ndarray, int]]
+                ) -> np.ndarray:
+    #  function delta_decode {{{ # 
+    """
+    Args:
+        payload (Union[bytes, np.ndarray]): the encoded image bytes
+        width (int): width of the image
+        height (int): height of the image
+        reference (Optional[Tuple[np.ndarray, int]]): the frame held by the
+          client and its timestamp
+
+    Returns:
+        np.ndarray: array of uint8 with shape (H, W, 3)
+
+    Raises:
+        ValueError: if the payload isn't encoded against `reference`
+    """
+
+    reference_time: int
+    reference_time, = DELTA_REFERENCE.unpack_from(payload)
+    if reference_time==-1:
+        image: np.ndarray = np.zeros((height, width, 3), dtype=np.uint8)
+    elif reference is not None\
+            and reference[1]==reference_time\
+            and reference[0].shape==(height, width, 3):
+        image: np.ndarray = reference[0]
+    else:
+        raise ValueError("Delta frame against an unknown reference {:d}".format(reference_time))
+
+    padded: np.ndarray
+    tiles: np.ndarray
+    padded, tiles = _pad_to_tiles(image)
+    data: bytes = zlib.decompress(memoryview(payload)[DELTA_REFERENCE.size:])
+
+    nb_mask_bytes: int = (tiles.shape[0]*tiles.shape[1]+7)//8
+    mask: np.ndarray = np.unpackbits( np.frombuffer(data, dtype=np.uint8, count=nb_mask_bytes)
+                                    , count=tiles.shape[0]*tiles.shape[1]
+                                    ).reshape(tiles.shape[:2]).astype(np.bool_)
+    tiles[mask] = np.frombuffer(data, dtype=np.uint8, offset=nb_mask_bytes)\
+                    .reshape((-1,) + tiles.shape[2:])
+    return np.ascontiguousarray(padded[:height, :width])
+    #  }}} function delta_decode # 
+
+class ActionLog:
+    #  class ActionLog {{{ # 
+    """
+    Records when the actions of a session finish, so that a screen frame is
+    tagged by the actions performed before the emulator generated it rather
+    than before it arrives, as a frame captured before an action may arrive
+    after it.
+    """
+
+    def __init__(self, history: int = 16):
+        #  method __init__ {{{ # 
+        """
+        Args:
+            history (int): the number of the latest actions whose times are
+              kept. the earlier actions are counted as before any frame, as
+              only whether a frame is after the latest actions matters.
+        """
+
+        self._lock: threading.Lock = threading.Lock()
+        self._nb_actions: int = 0
+        # unix timestamps in microseconds, the same as `timestampUs` of the
+        # emulator's screenshots
+        self._times: Deque[int] = collections.deque(maxlen=history)
+        #  }}} method __init__ # 
+
+    @property
+    def nb_actions(self) -> int:
+        return self._nb_actions
+
+    def record(self):
+        #  method record {{{ # 
+        """
+        Records an action finished just now.
+        """
+
+        with self._lock:
+            self._nb_actions += 1
+            self._times.append(int(time.time()*1e6))
+        #  }}} method record # 
+
+    def nb_actions_before(self, timestamp: int) -> int:
+        #  method nb_actions_before {{{ # 
+        """
+        Args:
+            timestamp (int): unix timestamp in microseconds when the frame
+              was generated. 0 if unknown, and then all the actions recorded
+              till now are counted.
+
+        Returns:
+            int: the number of the actions finished before `timestamp`
+        """
+
+        with self._lock:
+            if timestamp<=0:
+                return self._nb_actions
+            return self._nb_actions - sum(tm>timestamp for tm in self._times)
+        #  }}} method nb_actions_before # 
+    #  }}} class ActionLog # 
+
 class RemoteBase(abc.ABC):
     _session: requests.Session
     _timeout: float
@@ -55,11 +255,13 @@ class RemoteBase(abc.ABC):
             logger.debug( "Remote Simulator Response Error %d: %d"
                          , i, response.status_code
                          )
-        raise ResponseError("Remote Simulator Response Error: {:d}"\
+        raise ResponseError( "Remote Simulator Response Error: {:d}"\
                                 .format(response.status_code)
+                           , response.status_code
                            )
         #  }}} method _get_response # 
 
 class ResponseError(Exception):
-    def __init__(self, description: str):
+    def __init__(self, description: str, status_code: Optional[int] = None):
         super(ResponseError, self).__init__(description)
+        self.status_code: Optional[int] = status_code
@@ -0,0 +1,133 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.components.simulators.remote.remote_base."""
+
+from absl.testing import absltest
+from android_env.components.simulators.remote import remote_base
+import mock
+import numpy as np
+
+
+def _round_trip(image, reference=None):
+  """Encodes `image` against `reference` (image, time) and decodes it."""
+  encoded = remote_base.delta_encode(
+      image, None if reference is None else reference[0],
+      -1 if reference is None else reference[1])
+  height, width, _ = image.shape
+  return encoded, remote_base.delta_decode(encoded, width, height, reference)
+
+
+class DeltaCodecTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._rng = np.random.default_rng(0)
+
+  def _image(self, height, width):
+    return self._rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+  def test_key_frame(self):
+    image = self._image(64, 96)
+    encoded, decoded = _round_trip(image)
+    self.assertEqual(
+        -1, remote_base.DELTA_REFERENCE.unpack_from(encoded)[0])
+    np.testing.assert_array_equal(image, decoded)
+
+  def test_unchanged_frame(self):
+    image = self._image(64, 96)
+    key_frame, _ = _round_trip(image)
+    encoded, decoded = _round_trip(image.copy(), (image, 7))
+    self.assertEqual(7, remote_base.DELTA_REFERENCE.unpack_from(encoded)[0])
+    self.assertLess(len(encoded), len(key_frame) // 100)
+    np.testing.assert_array_equal(image, decoded)
+
+  def test_changed_tiles(self):
+    reference = self._image(64, 96)
+    image = reference.copy()
+    image[40, 70] = 0
+    image[3, 5] = 255
+    reference_copy = reference.copy()
+    _, decoded = _round_trip(image, (reference, 7))
+    np.testing.assert_array_equal(image, decoded)
+    # The reference frame held by the client isn't modified.
+    np.testing.assert_array_equal(reference_copy, reference)
+
+  def test_partial_tiles(self):
+    # Neither side is a multiple of the tile size.
+    reference = self._image(45, 70)
+    image = reference.copy()
+    image[44, 69] += 1
+    image[:10, 64:] = 0
+    _, decoded = _round_trip(reference)
+    np.testing.assert_array_equal(reference, decoded)
+    _, decoded = _round_trip(image, (reference, 7))
+    self.assertEqual((45, 70, 3), decoded.shape)
+    np.testing.assert_array_equal(image, decoded)
+
+  def test_changed_orientation(self):
+    reference = self._image(64, 96)
+    image = self._image(96, 64)
+    encoded, decoded = _round_trip(image, (reference, 7))
+    # A frame of another shape is encoded as a key frame.
+    self.assertEqual(
+        -1, remote_base.DELTA_REFERENCE.unpack_from(encoded)[0])
+    np.testing.assert_array_equal(image, decoded)
+
+  def test_unknown_reference(self):
+    reference = self._image(64, 96)
+    encoded = remote_base.delta_encode(reference.copy(), reference, 7)
+    with self.assertRaises(ValueError):
+      remote_base.delta_decode(encoded, 96, 64, None)
+    with self.assertRaises(ValueError):
+      remote_base.delta_decode(encoded, 96, 64, (reference, 8))
+
+
+class ActionLogTest(absltest.TestCase):
+
+  @mock.patch.object(remote_base.time, 'time', autospec=True)
+  def test_frames_tagged_by_generation_time(self, mock_time):
+    actions = remote_base.ActionLog()
+    self.assertEqual(0, actions.nb_actions_before(1_000_000))
+    mock_time.return_value = 1.
+    actions.record()
+    mock_time.return_value = 2.
+    actions.record()
+
+    self.assertEqual(2, actions.nb_actions)
+    # A frame captured before the second action yet arriving after it.
+    self.assertEqual(1, actions.nb_actions_before(1_500_000))
+    self.assertEqual(0, actions.nb_actions_before(999_999))
+    self.assertEqual(2, actions.nb_actions_before(2_000_000))
+    # Frames without timestamps count all the actions.
+    self.assertEqual(2, actions.nb_actions_before(0))
+
+  @mock.patch.object(remote_base.time, 'time', autospec=True)
+  def test_frames_older_than_history(self, mock_time):
+    actions = remote_base.ActionLog(history=2)
+    for i in range(1, 4):
+      mock_time.return_value = float(i)
+      actions.record()
+    # The forgotten first action is counted as before any frame, which is
+    # still behind the latest actions.
+    self.assertEqual(1, actions.nb_actions_before(500_000))
+    self.assertEqual(1, actions.nb_actions_before(1_500_000))
+    self.assertEqual(2, actions.nb_actions_before(2_500_000))
+
+
+if __name__ == '__main__':
+  absltest.main()
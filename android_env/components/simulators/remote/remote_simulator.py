@@ -29,6 +29,8 @@ import numpy as np
 import base64
 from PIL import Image
 import io
+import json
+import threading
 
 #from absl import logging
 import logging
@@ -101,6 +103,35 @@ class RemoteSimulator( base_simulator.BaseSimulator
             "raw_size": [int, int] # W, H
             "time": int
           }
+      + observ_bin
+        + sends the same as observ, and {
+            "compression": "delta" is allowed additionally
+            "delta_base": int, optional timestamp of the last received frame
+          }
+        + receives application/octet-stream of
+          `remote_base.OBSERVATION_HEADER` and the image bytes
+      + observ_stream
+        + sends the same as observ, and {
+            "interval": float
+          }
+        + receives chunked application/octet-stream of frames, each of
+          which is `remote_base.STREAM_FRAME_PREFIX` followed by the same as
+          observ_bin
+      + step
+        + sends the same as observ_bin, and {
+            "steps": list of ["act", list as act]
+                           | ["keyevents", list as keyevents]
+                           | ["adb", list of str]
+            "wait": float
+            "vh": bool
+            "observ": bool
+          }
+        + receives application/octet-stream of `remote_base.FRAME_LENGTH`
+          followed by json {
+            "adb_outputs": list of base64 or none
+            "vh": base64 or none
+          }
+          and then the same as observ_bin if "observ"
     """
 
     def __init__( self
@@ -111,6 +142,9 @@ class RemoteSimulator( base_simulator.BaseSimulator
                 , retry: int = 3
                 , resize_for_transfer: Optional[Tuple[int, int]] = None
                 , compression: str = "jpeg"
+                , binary_observation: bool = True
+                , push_observation: bool = False
+                , push_interval: float = 0.
                 , **kwargs
                 ):
         #  method __init__ {{{ # 
@@ -124,8 +158,22 @@ class RemoteSimulator( base_simulator.BaseSimulator
             retry (int): retry times
             resize_for_transfer (Optional[Tuple[int, int]]): if the screen
               should be resized for transferring as (W, H)
-            compression (str): jpeg | png | none, used for image data
-              transferring
+            compression (str): jpeg | png | none | delta, used for image data
+              transferring. delta transfers only the changed tiles losslessly
+              and requires the binary observation.
+            binary_observation (bool): if the observation should be
+              transferred as raw binary rather than base64 in JSON. falls
+              back to JSON if the daemon doesn't provide `observ_bin` (404 or
+              405).
+            push_observation (bool): if the daemon should push the screen
+              continuously so that the latest pushed frame can be returned
+              without a request, rather than pulling a frame at each step.
+              only the frames arriving after the last action are returned.
+              if the action doesn't change the screen, the last frame is
+              confirmed by the heartbeat of the stream, which takes up to
+              2*`remote_base.FRAME_HEARTBEAT_INTERVAL` seconds.
+            push_interval (float): minimum interval between two pushed frames
+              in seconds
         """
 
         super(RemoteSimulator, self).__init__(**kwargs)
@@ -141,6 +189,22 @@ class RemoteSimulator( base_simulator.BaseSimulator
 
         self._resize_for_transfer: Optional[Tuple[int, int]] = resize_for_transfer
         self._compression: str = compression
+        self._binary_observation: bool = binary_observation
+        self._delta_reference: Optional[Tuple[np.ndarray, int]] = None
+
+        self._push_observation: bool = push_observation
+        self._push_interval: float = push_interval
+        self._push_thread: Optional[threading.Thread] = None
+        self._push_stopped: threading.Event = threading.Event()
+        self._push_condition: threading.Condition = threading.Condition()
+        self._latest_observation: Optional[List[np.ndarray]] = None
+        # the number of actions performed by this client and the one before
+        # the latest pushed frame
+        self._nb_actions: int = 0
+        self._latest_nb_actions: int = 0
+
+        # turned off if the daemon doesn't provide `step`
+        self._batched_step: bool = True
 
         self._session: requests.Session = requests.Session()
         self._adb_device_name: str = "remote-device"
@@ -151,11 +215,13 @@ class RemoteSimulator( base_simulator.BaseSimulator
 
     #  Setup and Clear Methods {{{ # 
     def _restart_impl(self):
+        self._stop_pushed_observations()
         self._get_response("restart", timeout=self._launch_timeout)
     def _launch_impl(self):
         #self._session = requests.Session()
         self._get_response("launch", timeout=self._launch_timeout)
     def close(self):
+        self._stop_pushed_observations()
         try:
             self._get_response("close", timeout=self._launch_timeout)
         except:
@@ -198,26 +264,13 @@ class RemoteSimulator( base_simulator.BaseSimulator
 
     def send_action(self, action: Union[Dict[str, np.ndarray], List[Dict[str, np.ndarray]]]):
         #  method send_action {{{ # 
-        if not isinstance(action, list):
-          action: List[Dict[str, np.ndarray]] = [action]
-        action_dicts: List[Dict[str, Any]] = []
-
-        for act in action:
-            action_dict: Dict[str, Any] = {}
-            action_dict["action_type"] = act["action_type"].tolist()
-            if "touch_position" in act:
-                action_dict["touch_position"] = act["touch_position"].tolist()
-            if "input_token" in act:
-                action_dict["input_token"] = act["input_token"].tolist()
-            if "response" in act:
-                action_dict["response"] = act["response"].tolist()
-            action_dicts.append(action_dict)
-
-        self._get_response("act", action_dicts)
+        self._get_response("act", _serialize_actions(action))
+        self._nb_actions += 1
         #  }}} method send_action # 
     def send_key_event(self, keyevents: List[Dict[str, str]]):
         #  method send_key_event {{{ # 
         self._get_response("keyevents", keyevents)
+        self._nb_actions += 1
         #  }}} method send_key_event # 
     def _get_observation(self) -> Optional[List[np.ndarray]]:
         #  method _get_observation {{{ # 
@@ -231,6 +284,25 @@ class RemoteSimulator( base_simulator.BaseSimulator
         if self._resize_for_transfer is not None:
             arguments["resize_to"] = self._resize_for_transfer
 
+        if self._push_observation:
+            observation: Optional[List[np.ndarray]] = self._get_pushed_observation()
+            if observation is not None:
+                return observation
+            logger.warning("No pushed observation arrives in time. Pull one.")
+
+        if self._binary_observation:
+            try:
+                try:
+                    return self._get_binary_observation(arguments)
+                except ValueError:
+                    logger.warning("Delta frame mismatches the last frame. Request a key frame.")
+                    return self._get_binary_observation(arguments)
+            except remote_base.ResponseError as e:
+                if e.status_code not in {404, 405}:
+                    raise
+                logger.warning("Binary observation is not supported by the daemon. Fall back to JSON.")
+                self._binary_observation = False
+
         response: requests.Response = self._get_response("observ", arguments)
         response: Dict[str, Any] = response.json()
 
@@ -260,8 +332,295 @@ class RemoteSimulator( base_simulator.BaseSimulator
 
         return [image, np.int64(response["time"])]
         #  }}} method _get_observation # 
+
+    def _get_binary_observation(self, arguments: Dict[str, Any]) -> List[np.ndarray]:
+        #  method _get_binary_observation {{{ # 
+        """
+        Args:
+            arguments (Dict[str, Any]): arguments for `observ_bin`
+
+        Returns:
+            np.ndarray: ndarray with shape (H, W, 3) of uint8 as the screenshot
+            np.int64: the timestamp
+        """
+
+        if self._delta_reference is not None:
+            arguments = dict(arguments, delta_base=self._delta_reference[1])
+        response: requests.Response = self._get_response("observ_bin", arguments, stream=True)
+        with response:
+            # the frame is read into the array directly
+            frame: np.ndarray = np.empty( (int(response.headers["Content-Length"]),)
+                                        , dtype=np.uint8
+                                        )
+            _read_exactly(response, frame.nbytes, memoryview(frame))
+
+        try:
+            observation: List[np.ndarray]
+            observation, self._delta_reference = _decode_frame(frame, self._delta_reference)
+        except ValueError:
+            # request a key frame at the next time
+            self._delta_reference = None
+            raise
+        return observation
+        #  }}} method _get_binary_observation # 
+
+    def supports_batched_step(self) -> bool:
+        return self._batched_step
+
+    def execute_step( self
+                    , steps: List[Tuple[str, Any]]
+                    , wait: float = 0.
+                    , dump_view_hierarchy: bool = False
+                    ) -> Optional[ Tuple[ Dict[str, np.ndarray]
+                                        , Optional[bytes]
+                                        , List[Optional[bytes]]
+                                        ]
+                                 ]:
+        #  method execute_step {{{ # 
+        """
+        Performs the whole step through a single `step` request. See
+        `base_simulator.BaseSimulator.execute_step`.
+        """
+
+        arguments: Dict[str, Any] = { "compression": self._compression
+                                    , "steps": [ [ kind
+                                                 , _serialize_actions(payload) if kind=="act"\
+                                                                              else payload
+                                                 ]
+                                                 for kind, payload in steps
+                                               ]
+                                    , "wait": wait
+                                    , "vh": dump_view_hierarchy
+                                    # the pushed frames are used if available
+                                    , "observ": not self._push_observation
+                                    }
+        if self._resize_for_transfer is not None:
+            arguments["resize_to"] = self._resize_for_transfer
+        if arguments["observ"] and self._delta_reference is not None:
+            arguments["delta_base"] = self._delta_reference[1]
+
+        try:
+            response: requests.Response = self._get_response("step", arguments, stream=True)
+        except remote_base.ResponseError as e:
+            if e.status_code not in {404, 405}:
+                raise
+            logger.warning("Batched step is not supported by the daemon. Perform the actions separately.")
+            self._batched_step = False
+            return None
+        self._nb_actions += 1
+        with response:
+            frame: np.ndarray = np.empty( (int(response.headers["Content-Length"]),)
+                                        , dtype=np.uint8
+                                        )
+            _read_exactly(response, frame.nbytes, memoryview(frame))
+
+        length: int
+        length, = remote_base.FRAME_LENGTH.unpack_from(frame)
+        offset: int = remote_base.FRAME_LENGTH.size + length
+        results: Dict[str, Any] = json.loads(frame[remote_base.FRAME_LENGTH.size:offset].tobytes())
+        adb_outputs: List[Optional[bytes]] = [ base64.b64decode(opt.encode()) if isinstance(opt, str) else opt
+                                               for opt in results["adb_outputs"]
+                                             ]
+        view_hierarchy: Optional[bytes] = None if results["vh"] is None\
+                                            else base64.b64decode(results["vh"].encode())
+
+        if offset==frame.nbytes:
+            observation: List[np.ndarray] = self._get_observation()
+        else:
+            try:
+                observation, self._delta_reference = _decode_frame(frame[offset:], self._delta_reference)
+            except ValueError:
+                logger.warning("Delta frame mismatches the last frame. Request a key frame.")
+                self._delta_reference = None
+                observation: List[np.ndarray] = self._get_observation()
+
+        return self._assemble_observation(*observation), view_hierarchy, adb_outputs
+        #  }}} method execute_step # 
+
+    #  Pushed Observation {{{ # 
+    def _get_pushed_observation(self) -> Optional[List[np.ndarray]]:
+        #  method _get_pushed_observation {{{ # 
+        """
+        Returns:
+            Optional[List[np.ndarray]]: the latest pushed [screenshot,
+              timestamp] or None if no frame up to date after the last action
+              arrives within the timeout
+        """
+
+        if self._push_thread is None or not self._push_thread.is_alive():
+            self._push_stopped.clear()
+            self._push_thread = threading.Thread( target=self._receive_pushed_observations
+                                                , daemon=True
+                                                )
+            self._push_thread.start()
+
+        with self._push_condition:
+            if not self._push_condition.wait_for( lambda: self._latest_observation is not None\
+                                                     and self._latest_nb_actions>=self._nb_actions
+                                                , timeout=self._timeout
+                                                ):
+                return None
+            return self._latest_observation
+        #  }}} method _get_pushed_observation # 
+
+    def _receive_pushed_observations(self):
+        #  method _receive_pushed_observations {{{ # 
+        arguments: Dict[str, Any] = { "compression": self._compression
+                                    , "interval": self._push_interval
+                                    }
+        if self._resize_for_transfer is not None:
+            arguments["resize_to"] = self._resize_for_transfer
+
+        while not self._push_stopped.is_set():
+            try:
+                response: requests.Response = self._get_response( "observ_stream", arguments
+                                                                , stream=True
+                                                                , timeout=self._timeout
+                                                                )
+                delta_reference: Optional[Tuple[np.ndarray, int]] = None
+                with response:
+                    prefix_buffer: memoryview = memoryview(bytearray(remote_base.STREAM_FRAME_PREFIX.size))
+                    while not self._push_stopped.is_set():
+                        _read_exactly(response, remote_base.STREAM_FRAME_PREFIX.size, prefix_buffer)
+                        length: int
+                        nb_actions: int
+                        length, nb_actions = remote_base.STREAM_FRAME_PREFIX.unpack(prefix_buffer)
+                        if length==0: # heartbeat
+                            with self._push_condition:
+                                if self._latest_observation is not None:
+                                    self._latest_nb_actions = nb_actions
+                                    self._push_condition.notify_all()
+                            continue
+                        frame: np.ndarray = np.empty((length,), dtype=np.uint8)
+                        _read_exactly(response, length, memoryview(frame))
+                        observation: List[np.ndarray]
+                        observation, delta_reference = _decode_frame(frame, delta_reference)
+                        with self._push_condition:
+                            self._latest_observation = observation
+                            self._latest_nb_actions = nb_actions
+                            self._push_condition.notify_all()
+            except Exception:
+                if self._push_stopped.is_set():
+                    break
+                logger.exception("Pushed Observation Stream Broken. Reconnect.")
+                self._push_stopped.wait(1.)
+        #  }}} method _receive_pushed_observations # 
+
+    def _stop_pushed_observations(self):
+        #  method _stop_pushed_observations {{{ # 
+        # the receiving thread will notice it on the next frame or heartbeat
+        self._push_stopped.set()
+        if self._push_thread is not None:
+            self._push_thread.join(self._timeout)
+            self._push_thread = None
+        with self._push_condition:
+            self._latest_observation = None
+        #  }}} method _stop_pushed_observations # 
+    #  }}} Pushed Observation # 
     #  }}} class RemoteSimulator # 
 
+def _serialize_actions(action: Union[Dict[str, np.ndarray], List[Dict[str, np.ndarray]]])\
+        -> List[Dict[str, Any]]:
+    #  function _serialize_actions {{{ # 
+    if not isinstance(action, list):
+      action: List[Dict[str, np.ndarray]] = [action]
+    action_dicts: List[Dict[str, Any]] = []
+
+    for act in action:
+        action_dict: Dict[str, Any] = {}
+        action_dict["action_type"] = act["action_type"].tolist()
+        if "touch_position" in act:
+            action_dict["touch_position"] = act["touch_position"].tolist()
+        if "input_token" in act:
+            action_dict["input_token"] = act["input_token"].tolist()
+        if "response" in act:
+            action_dict["response"] = act["response"].tolist()
+        action_dicts.append(action_dict)
+    return action_dicts
+    #  }}} function _serialize_actions # 
+
+def _read_exactly( response: requests.Response
+                 , size: int
+                 , buffer: memoryview
+                 ) -> memoryview:
+    #  function _read_exactly {{{ # 
+    """
+    Reads exactly `size` bytes from the streamed response into `buffer`.
+
+    Args:
+        response (requests.Response): the streamed response
+        size (int): number of bytes to read
+        buffer (memoryview): the buffer to read into
+
+    Returns:
+        memoryview: `buffer`
+    """
+
+    buffer = buffer.cast("B")
+    nb_read = 0
+    while nb_read<size:
+        nb_chunk: int = response.raw.readinto(buffer[nb_read:size])
+        if nb_chunk==0:
+            raise remote_base.ResponseError("Remote Simulator Response Truncated")
+        nb_read += nb_chunk
+    return buffer
+    #  }}} function _read_exactly # 
+
+def _decode_frame( frame: np.ndarray
+                 , reference: Optional[Tuple[np.ndarray, int]] = None
+                 ) -> Tuple[List[np.ndarray], Tuple[np.ndarray, int]]:
+    #  function _decode_frame {{{ # 
+    """
+    Args:
+        frame (np.ndarray): array of uint8 with shape (N,) as
+          `remote_base.OBSERVATION_HEADER` followed by the image bytes
+        reference (Optional[Tuple[np.ndarray, int]]): the last transferred
+          image and its timestamp, used to decode a delta frame
+
+    Returns:
+        List[np.ndarray]: list like
+          [
+            np.ndarray: ndarray with shape (H, W, 3) of uint8 as the
+              screenshot
+            np.int64: the timestamp
+          ]
+        Tuple[np.ndarray, int]: the transferred image and its timestamp as
+          the reference of the next delta frame
+
+    Raises:
+        ValueError: if a delta frame doesn't match `reference`
+    """
+
+    compression: int
+    width: int
+    height: int
+    raw_width: int
+    raw_height: int
+    timestamp: int
+    compression, width, height, raw_width, raw_height, timestamp =\
+            remote_base.OBSERVATION_HEADER.unpack_from(frame)
+    payload: np.ndarray = frame[remote_base.OBSERVATION_HEADER.size:]
+
+    compression: str = remote_base.OBSERVATION_COMPRESSIONS[compression]
+    if compression=="none":
+        image: np.ndarray = payload.reshape((height, width, 3))
+    elif compression=="delta":
+        image: np.ndarray = remote_base.delta_decode(payload, width, height, reference)
+    else:
+        image: np.ndarray = np.asarray( Image.open( io.BytesIO(payload)
+                                                  , formats=["jpeg", "png"]
+                                                  )
+                                      , dtype=np.uint8
+                                      )
+    reference = (image, timestamp)
+
+    if (width, height)!=(raw_width, raw_height):
+        image = np.asarray( Image.fromarray(image).resize((raw_width, raw_height))
+                          , dtype=np.uint8
+                          )
+    return [image, np.int64(timestamp)], reference
+    #  }}} function _decode_frame # 
+
 if __name__ == "__main__":
     import time
     #from typing import Iterator
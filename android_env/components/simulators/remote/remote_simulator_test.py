@@ -0,0 +1,351 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.components.simulators.remote.remote_simulator."""
+
+import base64
+import io
+import json
+import threading
+
+from absl.testing import absltest
+from android_env.components.simulators.remote import remote_base
+from android_env.components.simulators.remote import remote_simulator
+import mock
+import numpy as np
+import requests
+
+
+def _response(content=b'', status_code=200):
+  response = requests.Response()
+  response.status_code = status_code
+  response.raw = io.BytesIO(content)
+  response.headers['Content-Length'] = str(len(content))
+  return response
+
+
+def _json_response(body):
+  return _response(json.dumps(body).encode())
+
+
+def _frame(image, timestamp, raw_size=None):
+  height, width, _ = image.shape
+  raw_width, raw_height = raw_size or (width, height)
+  return remote_base.OBSERVATION_HEADER.pack(
+      remote_base.OBSERVATION_COMPRESSIONS.index('none'),
+      width, height, raw_width, raw_height, timestamp) + image.tobytes()
+
+
+class FakeSession():
+  """Answers the requests of RemoteSimulator with the given handlers."""
+
+  def __init__(self, handlers):
+    self.handlers = dict(handlers)
+    self.handlers.setdefault('init', lambda args: _response(b'OK'))
+    self.handlers.setdefault(
+        'create_adbc',
+        lambda args: _json_response({'name': 'emulator-5554', 'id': 0}))
+    self.requests = []
+
+  def request(self, method, url, json=None, timeout=None, stream=False):
+    del method, timeout, stream
+    action = url.rsplit('/', 1)[-1]
+    self.requests.append((action, json))
+    if action not in self.handlers:
+      return _response(status_code=404)
+    return self.handlers[action](json)
+
+  def close(self):
+    pass
+
+
+class ChunkedReader(io.BytesIO):
+  """Returns at most 3 bytes per read, as a socket may do."""
+
+  def readinto(self, buffer):
+    return super().readinto(memoryview(buffer)[:3])
+
+
+class StreamReader():
+  """Blocks the reads until the test feeds the data, as a pushed stream."""
+
+  def __init__(self):
+    self._buffer = bytearray()
+    self._closed = False
+    self._condition = threading.Condition()
+
+  def feed(self, data):
+    with self._condition:
+      self._buffer += data
+      self._condition.notify_all()
+
+  def readinto(self, buffer):
+    with self._condition:
+      self._condition.wait_for(lambda: self._buffer or self._closed)
+      size = min(len(buffer), len(self._buffer))
+      memoryview(buffer)[:size] = self._buffer[:size]
+      del self._buffer[:size]
+      return size
+
+  def close(self):
+    with self._condition:
+      self._closed = True
+      self._condition.notify_all()
+
+
+def _simulator(session, **kwargs):
+  with mock.patch.object(remote_simulator.requests, 'Session',
+                         return_value=session):
+    return remote_simulator.RemoteSimulator(
+        '127.0.0.1', 5000, compression='none', **kwargs)
+
+
+class FramingTest(absltest.TestCase):
+
+  def test_read_exactly(self):
+    response = _response()
+    response.raw = ChunkedReader(bytes(range(10)))
+    buffer = bytearray(8)
+    remote_simulator._read_exactly(response, 8, memoryview(buffer))
+    self.assertEqual(bytes(range(8)), bytes(buffer))
+
+  def test_read_exactly_truncated(self):
+    response = _response(b'\x01\x02')
+    with self.assertRaises(remote_base.ResponseError):
+      remote_simulator._read_exactly(response, 4, memoryview(bytearray(4)))
+
+  def test_decode_frame(self):
+    image = np.arange(4 * 6 * 3, dtype=np.uint8).reshape((4, 6, 3))
+    frame = np.frombuffer(_frame(image, 42), dtype=np.uint8)
+    (decoded, timestamp), reference = remote_simulator._decode_frame(frame)
+    np.testing.assert_array_equal(image, decoded)
+    self.assertEqual(42, timestamp)
+    self.assertIs(decoded, reference[0])
+    self.assertEqual(42, reference[1])
+
+  def test_decode_resized_frame(self):
+    image = np.full((4, 6, 3), 7, dtype=np.uint8)
+    frame = np.frombuffer(_frame(image, 42, raw_size=(12, 8)), dtype=np.uint8)
+    (decoded, _), reference = remote_simulator._decode_frame(frame)
+    self.assertEqual((8, 12, 3), decoded.shape)
+    np.testing.assert_array_equal(7, decoded)
+    # Delta frames refer to the transferred image rather than the resized one.
+    self.assertEqual((4, 6, 3), reference[0].shape)
+
+
+class BinaryObservationTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._image = np.arange(4 * 6 * 3, dtype=np.uint8).reshape((4, 6, 3))
+
+  def _json_observation(self, args):
+    del args
+    return _json_response({
+        'img': base64.b64encode(self._image.tobytes()).decode(),
+        'size': [6, 4],
+        'raw_size': [6, 4],
+        'time': 7,
+    })
+
+  def test_binary_observation(self):
+    session = FakeSession(
+        {'observ_bin': lambda args: _response(_frame(self._image, 42))})
+    image, timestamp = _simulator(session)._get_observation()
+    np.testing.assert_array_equal(self._image, image)
+    self.assertEqual(42, timestamp)
+
+  def test_fall_back_to_json_if_unsupported(self):
+    session = FakeSession({'observ': self._json_observation})
+    simulator = _simulator(session)
+    for _ in range(2):
+      image, timestamp = simulator._get_observation()
+      np.testing.assert_array_equal(self._image, image)
+      self.assertEqual(7, timestamp)
+    # The binary endpoint isn't tried again after the fallback.
+    self.assertEqual(
+        ['observ_bin'] * simulator._retry + ['observ', 'observ'],
+        [action for action, _ in session.requests
+         if action.startswith('observ')])
+
+  def test_no_fallback_on_server_error(self):
+    session = FakeSession({
+        'observ_bin': lambda args: _response(status_code=500),
+        'observ': self._json_observation,
+    })
+    simulator = _simulator(session)
+    with self.assertRaises(remote_base.ResponseError):
+      simulator._get_observation()
+
+    # The binary observation is used again once the error is gone.
+    session.handlers['observ_bin'] = (
+        lambda args: _response(_frame(self._image, 42)))
+    _, timestamp = simulator._get_observation()
+    self.assertEqual(42, timestamp)
+    self.assertNotIn('observ', [action for action, _ in session.requests])
+
+
+class ExecuteStepTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._image = np.arange(4 * 6 * 3, dtype=np.uint8).reshape((4, 6, 3))
+    self._action = {
+        'action_type': np.array(1),
+        'touch_position': np.array([.5, .25]),
+    }
+
+  def _step_response(self, results, frame=b''):
+    results = json.dumps(results).encode()
+    return _response(
+        remote_base.FRAME_LENGTH.pack(len(results)) + results + frame)
+
+  def test_batched_step(self):
+    session = FakeSession({
+        'step': lambda args: self._step_response({
+            'adb_outputs': [base64.b64encode(b'output').decode(), None],
+            'vh': base64.b64encode(b'<hierarchy />').decode(),
+        }, _frame(self._image, 42)),
+    })
+    simulator = _simulator(session)
+    observation, view_hierarchy, adb_outputs = simulator.execute_step(
+        [('act', self._action), ('keyevents', [{'type': 'text', 'value': 'a'}]),
+         ('adb', ['shell', 'echo']), ('adb', ['shell', 'false'])],
+        wait=.5, dump_view_hierarchy=True)
+
+    np.testing.assert_array_equal(self._image, observation['pixels'])
+    self.assertEqual(b'<hierarchy />', view_hierarchy)
+    self.assertEqual([b'output', None], adb_outputs)
+    self.assertEqual(1, simulator._nb_actions)
+    action, args = session.requests[-1]
+    self.assertEqual('step', action)
+    self.assertEqual([
+        ['act', [{'action_type': 1, 'touch_position': [.5, .25]}]],
+        ['keyevents', [{'type': 'text', 'value': 'a'}]],
+        ['adb', ['shell', 'echo']],
+        ['adb', ['shell', 'false']],
+    ], args['steps'])
+    self.assertEqual(.5, args['wait'])
+    self.assertTrue(args['vh'])
+    self.assertTrue(args['observ'])
+
+  def test_batched_step_without_frame(self):
+    session = FakeSession({
+        'step': lambda args: self._step_response(
+            {'adb_outputs': [], 'vh': None}),
+        'observ_bin': lambda args: _response(_frame(self._image, 42)),
+    })
+    observation, view_hierarchy, adb_outputs = _simulator(
+        session).execute_step([('act', self._action)])
+    np.testing.assert_array_equal(self._image, observation['pixels'])
+    self.assertIsNone(view_hierarchy)
+    self.assertEqual([], adb_outputs)
+    self.assertEqual(['step', 'observ_bin'],
+                     [action for action, _ in session.requests[2:]])
+
+  def test_fall_back_if_unsupported(self):
+    session = FakeSession({})
+    simulator = _simulator(session)
+    self.assertTrue(simulator.supports_batched_step())
+    self.assertIsNone(simulator.execute_step([('act', self._action)]))
+    # The caller performs the actions separately from then on.
+    self.assertFalse(simulator.supports_batched_step())
+    self.assertEqual(
+        ['step'] * simulator._retry,
+        [action for action, _ in session.requests if action == 'step'])
+    self.assertEqual(0, simulator._nb_actions)
+
+  def test_no_fallback_on_server_error(self):
+    session = FakeSession({'step': lambda args: _response(status_code=500)})
+    simulator = _simulator(session)
+    with self.assertRaises(remote_base.ResponseError):
+      simulator.execute_step([('act', self._action)])
+    self.assertTrue(simulator.supports_batched_step())
+
+
+class PushedObservationTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._stream = StreamReader()
+    self.addCleanup(self._stream.close)
+
+    def _observ_stream(args):
+      del args
+      response = _response()
+      response.raw = self._stream
+      return response
+
+    session = FakeSession({
+        'observ_stream': _observ_stream,
+        'act': lambda args: _response(b'OK'),
+    })
+    self._simulator = _simulator(session, push_observation=True, timeout=10.)
+    self._action = {
+        'action_type': np.array(1),
+        'touch_position': np.array([.5, .5]),
+    }
+
+  def tearDown(self):
+    self._simulator._push_stopped.set()
+    self._stream.close()
+    self._simulator._stop_pushed_observations()
+    super().tearDown()
+
+  def _push(self, value, nb_actions):
+    frame = _frame(np.full((2, 2, 3), value, dtype=np.uint8), value)
+    self._stream.feed(
+        remote_base.STREAM_FRAME_PREFIX.pack(len(frame), nb_actions) + frame)
+
+  def _observe_later(self):
+    observation = []
+    thread = threading.Thread(
+        target=lambda: observation.append(self._simulator._get_observation()))
+    thread.start()
+    self.addCleanup(thread.join)
+    return thread, observation
+
+  def test_frame_after_action(self):
+    self._push(1, 0)
+    _, timestamp = self._simulator._get_observation()
+    self.assertEqual(1, timestamp)
+
+    self._simulator.send_action(self._action)
+    thread, observation = self._observe_later()
+    # The frame pushed before the action is not returned.
+    thread.join(.2)
+    self.assertTrue(thread.is_alive())
+    self._push(2, 1)
+    thread.join(5.)
+    self.assertEqual(2, observation[0][1])
+
+  def test_heartbeat_confirms_last_frame(self):
+    self._push(1, 0)
+    self._simulator._get_observation()
+
+    self._simulator.send_action(self._action)
+    thread, observation = self._observe_later()
+    thread.join(.2)
+    self.assertTrue(thread.is_alive())
+    # The screen didn't change after the action.
+    self._stream.feed(remote_base.STREAM_FRAME_PREFIX.pack(0, 1))
+    thread.join(5.)
+    self.assertEqual(1, observation[0][1])
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,208 @@
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+from android_env.components.simulators import base_simulator
+
+import threading
+import collections
+
+from typing import Callable, Optional
+from typing import Deque, Set
+
+#from absl import logging
+import logging
+
+logger = logging.getLogger("mobile_env.simulator.pool")
+
+class SimulatorPool:
+    #  class SimulatorPool {{{ # 
+    """
+    Keeps a number of launched simulators so that a new session can lease a
+    warm one rather than waiting for a cold boot. A released simulator is
+    restarted in background before it is leased again. The idle simulators
+    are checked periodically and the broken ones are replaced.
+    """
+
+    def __init__( self
+                , create_simulator: Callable[[], base_simulator.BaseSimulator]
+                , size: int
+                , health_check_interval: float = 60.
+                , retry_interval: float = 10.
+                ):
+        #  method __init__ {{{ # 
+        """
+        Args:
+            create_simulator (Callable[[], base_simulator.BaseSimulator]):
+              function to create a new (unlaunched) simulator
+            size (int): number of simulators kept by the pool
+            health_check_interval (float): interval in seconds to check the
+              idle simulators
+            retry_interval (float): interval in seconds to wait before
+              replacing a simulator failing to launch
+        """
+
+        self._create_simulator: Callable[[], base_simulator.BaseSimulator] = create_simulator
+        self._size: int = size
+        self._health_check_interval: float = health_check_interval
+        self._retry_interval: float = retry_interval
+
+        self._lock: threading.Lock = threading.Lock()
+        self._idle: Deque[base_simulator.BaseSimulator] = collections.deque()
+        self._leased: Set[int] = set() # ids of the leased simulators
+        self._stopped: threading.Event = threading.Event()
+
+        for _ in range(self._size):
+            self._spawn()
+        self._health_checker: threading.Thread = threading.Thread( target=self._check_idle
+                                                                 , daemon=True
+                                                                 )
+        self._health_checker.start()
+        #  }}} method __init__ # 
+
+    def lease(self) -> Optional[base_simulator.BaseSimulator]:
+        #  method lease {{{ # 
+        """
+        Returns:
+            Optional[base_simulator.BaseSimulator]: a launched simulator or
+              None if no simulator is idle at present
+        """
+
+        while True:
+            with self._lock:
+                if len(self._idle)==0:
+                    logger.info("No idle simulator in the pool.")
+                    return None
+                simulator: base_simulator.BaseSimulator = self._idle.popleft()
+                self._leased.add(id(simulator))
+
+            if _is_healthy(simulator):
+                logger.info("Leased a simulator, %d left idle.", len(self._idle))
+                return simulator
+            self._discard(simulator)
+        #  }}} method lease # 
+
+    def owns(self, simulator: base_simulator.BaseSimulator) -> bool:
+        with self._lock:
+            return id(simulator) in self._leased
+
+    def release(self, simulator: base_simulator.BaseSimulator):
+        #  method release {{{ # 
+        """
+        Returns a leased simulator. It will be restarted in background and
+        then be ready for the next lease.
+
+        Args:
+            simulator (base_simulator.BaseSimulator): the leased simulator
+        """
+
+        def _recycle():
+            try:
+                simulator.restart()
+            except Exception:
+                logger.exception("Failed to restart the released simulator.")
+            if self._stopped.is_set() or not _is_healthy(simulator):
+                self._discard(simulator)
+                return
+            with self._lock:
+                self._leased.discard(id(simulator))
+                self._idle.append(simulator)
+            logger.info("Recycled a simulator.")
+        threading.Thread(target=_recycle, daemon=True).start()
+        #  }}} method release # 
+
+    def close(self):
+        #  method close {{{ # 
+        self._stopped.set()
+        with self._lock:
+            idle_simulators = list(self._idle)
+            self._idle.clear()
+        for smlt in idle_simulators:
+            _close(smlt)
+        #  }}} method close # 
+
+    def _spawn(self):
+        #  method _spawn {{{ # 
+        def _launch():
+            while not self._stopped.is_set():
+                simulator: Optional[base_simulator.BaseSimulator] = None
+                try:
+                    simulator = self._create_simulator()
+                    simulator.launch()
+                    if _is_healthy(simulator):
+                        break
+                except Exception:
+                    logger.exception("Failed to launch a simulator for the pool.")
+                if simulator is not None:
+                    _close(simulator)
+                self._stopped.wait(self._retry_interval)
+            else:
+                return
+
+            if self._stopped.is_set():
+                _close(simulator)
+                return
+            with self._lock:
+                self._idle.append(simulator)
+            logger.info("Launched a simulator for the pool.")
+        threading.Thread(target=_launch, daemon=True).start()
+        #  }}} method _spawn # 
+
+    def _discard(self, simulator: base_simulator.BaseSimulator):
+        #  method _discard {{{ # 
+        logger.warning("Discard a broken simulator from the pool.")
+        with self._lock:
+            self._leased.discard(id(simulator))
+        _close(simulator)
+        if not self._stopped.is_set():
+            self._spawn()
+        #  }}} method _discard # 
+
+    def _check_idle(self):
+        #  method _check_idle {{{ # 
+        while not self._stopped.wait(self._health_check_interval):
+            with self._lock:
+                idle_simulators = list(self._idle)
+            for smlt in idle_simulators:
+                with self._lock:
+                    # skip the simulators leased during checking
+                    if smlt not in self._idle:
+                        continue
+                    self._idle.remove(smlt)
+                if _is_healthy(smlt):
+                    with self._lock:
+                        self._idle.append(smlt)
+                else:
+                    self._discard(smlt)
+        #  }}} method _check_idle # 
+    #  }}} class SimulatorPool # 
+
+def _is_healthy(simulator: base_simulator.BaseSimulator) -> bool:
+    #  function _is_healthy {{{ # 
+    try:
+        simulator.get_observation()
+        return True
+    except Exception:
+        logger.exception("Simulator health check failed.")
+        return False
+    #  }}} function _is_healthy # 
+
+def _close(simulator: base_simulator.BaseSimulator):
+    #  function _close {{{ # 
+    try:
+        simulator.close()
+    except Exception:
+        logger.exception("Failed to close the simulator.")
+    #  }}} function _close # 
@@ -0,0 +1,150 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.components.simulators.remote.simulator_pool."""
+
+import threading
+import time
+
+from absl.testing import absltest
+from android_env.components.simulators.remote import simulator_pool
+
+
+class FakeSimulator():
+  """Records the calls of the pool and fails the health check on demand."""
+
+  def __init__(self, launched: threading.Event):
+    self._launched = launched
+    self.healthy = True
+    self.nb_restarts = 0
+    self.closed = False
+
+  def launch(self):
+    self._launched.wait()
+
+  def restart(self):
+    self.nb_restarts += 1
+
+  def get_observation(self):
+    if not self.healthy:
+      raise RuntimeError('Broken simulator.')
+    return {}
+
+  def close(self):
+    self.closed = True
+
+
+def _wait_until(condition, timeout=5.):
+  deadline = time.monotonic() + timeout
+  while not condition():
+    if time.monotonic() > deadline:
+      raise AssertionError('Condition not met in time.')
+    time.sleep(.01)
+
+
+class SimulatorPoolTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._launched = threading.Event()
+    self._launched.set()
+    self.addCleanup(self._launched.set)
+    self._simulators = []
+
+  def _create_pool(self, size, **kwargs):
+    def _create_simulator():
+      simulator = FakeSimulator(self._launched)
+      self._simulators.append(simulator)
+      return simulator
+    pool = simulator_pool.SimulatorPool(
+        _create_simulator, size, retry_interval=.01, **kwargs)
+    self.addCleanup(pool.close)
+    return pool
+
+  def _nb_idle(self, pool):
+    with pool._lock:
+      return len(pool._idle)
+
+  def test_lease_when_nothing_idle(self):
+    self._launched.clear()
+    pool = self._create_pool(1)
+    # The only simulator is still booting.
+    self.assertIsNone(pool.lease())
+
+    self._launched.set()
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    simulator = pool.lease()
+    self.assertIs(self._simulators[0], simulator)
+    self.assertTrue(pool.owns(simulator))
+    self.assertIsNone(pool.lease())
+
+  def test_unhealthy_simulator_discarded_and_respawned(self):
+    pool = self._create_pool(1)
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    broken = self._simulators[0]
+    broken.healthy = False
+    # Hold the replacement in booting.
+    self._launched.clear()
+
+    self.assertIsNone(pool.lease())
+    self.assertTrue(broken.closed)
+    self.assertFalse(pool.owns(broken))
+
+    _wait_until(lambda: len(self._simulators) == 2)
+    self.assertIsNone(pool.lease())
+    self._launched.set()
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    simulator = pool.lease()
+    self.assertIsNot(broken, simulator)
+    self.assertIs(self._simulators[1], simulator)
+
+  def test_idle_simulator_checked(self):
+    pool = self._create_pool(1, health_check_interval=.01)
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    self._simulators[0].healthy = False
+
+    _wait_until(lambda: len(self._simulators) == 2 and self._nb_idle(pool) == 1)
+    self.assertTrue(self._simulators[0].closed)
+    self.assertIs(self._simulators[1], pool.lease())
+
+  def test_release_then_lease(self):
+    pool = self._create_pool(1)
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    simulator = pool.lease()
+
+    pool.release(simulator)
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    self.assertEqual(1, simulator.nb_restarts)
+    self.assertFalse(pool.owns(simulator))
+    self.assertIs(simulator, pool.lease())
+    self.assertTrue(pool.owns(simulator))
+    self.assertLen(self._simulators, 1)
+
+  def test_broken_released_simulator_replaced(self):
+    pool = self._create_pool(1)
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    simulator = pool.lease()
+    simulator.healthy = False
+
+    pool.release(simulator)
+    _wait_until(lambda: self._nb_idle(pool) == 1)
+    self.assertTrue(simulator.closed)
+    self.assertIs(self._simulators[1], pool.lease())
+
+
+if __name__ == '__main__':
+  absltest.main()
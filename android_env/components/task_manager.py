@@ -33,6 +33,7 @@
 """TaskManager handles all events and information related to the task."""
 
 import ast
+import concurrent.futures
 import copy
 import datetime
 import json
@@ -98,6 +99,7 @@ class TaskManager():
               , get_sbert: Callable[[], SentenceTransformer] = functools.partial( SentenceTransformer
                                                                                 , "all-MiniLM-L12-v2"
                                                                                 )
+              , skip_unchanged_screen_regions: bool = True
               ):
     #  method `__init__` {{{ # 
     """Controls task-relevant events and information.
@@ -126,6 +128,9 @@ class TaskManager():
 
       get_sbert (Callable[[], SentenceTransformer]): function to get a sentence
         transformer instance
+
+      skip_unchanged_screen_regions (bool): if the screen models should be
+        skipped for the event regions unchanged since the last screen check
     """
     self._task: task_pb2.Task = task
 
@@ -161,6 +166,7 @@ class TaskManager():
     }
 
     self._get_sbert: Callable[[], SentenceTransformer] = get_sbert
+    self._skip_unchanged_screen_regions: bool = skip_unchanged_screen_regions
 
     # zdy
     #  Event Infrastructures {{{ # 
@@ -551,6 +557,12 @@ class TaskManager():
     """
 
     return self._vocabulary
+  def log_filters(self) -> Set[str]:
+    """
+    return set of str as the logcat filters required by the log events
+    """
+
+    return self._log_filters
   #  }}} Properties # 
 
   def increment_steps(self):
@@ -607,9 +619,19 @@ class TaskManager():
                  adb_controller: adb_control.AdbController,
                  #emulator_stub: emulator_controller_pb2_grpc.EmulatorControllerStub, # zdy
                  #image_format: emulator_controller_pb2.ImageFormat, # zdy
-                 log_stream: log_stream_lib.LogStream,
+                 log_stream: Optional[log_stream_lib.LogStream] = None,
+                 logcat_reader: Optional[logcat_thread.LogcatReader] = None,
                  ) -> None:
-    """Starts the given task along with all relevant processes."""
+    """Starts the given task along with all relevant processes.
+
+    Args:
+      adb_controller (adb_control.AdbController): controller of the device
+      log_stream (Optional[log_stream_lib.LogStream]): log stream for a
+        dedicated logcat thread of this task
+      logcat_reader (Optional[logcat_thread.LogcatReader]): shared logcat
+        reader of the device. if provided, this task subscribes to it rather
+        than launches a dedicated logcat process from `log_stream`.
+    """
 
     logger.info("#Text Events: {:d}".format(len(self._text_events)))
     logger.info("#Icon Events: {:d}".format(len(self._icon_events)))
@@ -621,17 +643,24 @@ class TaskManager():
     self._adb_controller: adb_control.AdbController = adb_controller
     #self._emulator_stub = emulator_stub
     #self._image_format = image_format
-    self._start_logcat_thread(log_stream=log_stream)
+    self._start_logcat_thread(log_stream=log_stream, logcat_reader=logcat_reader)
     self._start_setup_step_interpreter()
     self._setup_step_interpreter.interpret(self._task.setup_steps)
 
     self._setup_flag = True
 
-  def reset_task(self) -> None:
-    """Resets a task at the end of an RL episode."""
+  def reset_task(self, run_reset_steps: bool = True) -> None:
+    """Resets a task at the end of an RL episode.
+
+    Args:
+      run_reset_steps (bool): whether to perform the reset steps of the task.
+        can be skipped if the device has been restored by other means, e.g.,
+        an emulator snapshot.
+    """
 
     self.pause_task()
-    self._setup_step_interpreter.interpret(self._task.reset_steps)
+    if run_reset_steps:
+      self._setup_step_interpreter.interpret(self._task.reset_steps)
     self._resume_task()
     self._reset_counters()
 
@@ -651,6 +680,14 @@ class TaskManager():
     self._start_vh_analyzer_thread()
     logger.debug("## Started vh analyzer ##")
 
+  def pause_logcat(self) -> None:
+    """Stops delivering log messages to this task, e.g., when it is switched off."""
+    if hasattr(self, "_logcat_thread"):
+      self._logcat_thread.pause()
+  def resume_logcat(self) -> None:
+    if hasattr(self, "_logcat_thread"):
+      self._logcat_thread.resume()
+
   def setup_flag(self) -> bool:
     return self._setup_flag
   def clear_setup_flag(self):
@@ -698,8 +735,7 @@ class TaskManager():
                                              )
                                        ):
       if n_prtb:
-        for ch in gr:
-          self._adb_controller.input_key(TaskManager.non_pritable_char_mapping[ch])
+        self._adb_controller.input_keys([TaskManager.non_pritable_char_mapping[ch] for ch in gr])
       else:
         self._adb_controller.input_text( "\""\
                                        + "".join(gr)\
@@ -931,6 +967,7 @@ class TaskManager():
                      , check_screen: bool = False
                      , get_vh: bool = False
                      , check_vh: bool = False
+                     , prefetched_vh: Optional[concurrent.futures.Future] = None
                      ) -> Optional[lxml.etree.Element]:
     #  method `snapshot_events` {{{ # 
     """
@@ -940,6 +977,9 @@ class TaskManager():
       check_screen (bool): whether to invoke the screen analyzer
       get_vh (bool): whether to get VH in the main thread
       check_vh (bool): whether to invoke vh analyzer
+      prefetched_vh (Optional[concurrent.futures.Future]): the VH fetch
+        already submitted through `get_view_hierarchy` by the caller. it will
+        be waited for rather than fetching VH again if `get_vh`.
 
     Returns:
       Optional[lxml.etree.Element]: if should `get_vh`, returns the VH tree
@@ -950,9 +990,12 @@ class TaskManager():
                              , check=check_screen
                              )
 
-    view_hierarchy: Optional[lxml.etree.Element] = self._adb_controller.get_view_hierarchy()\
-                                                if get_vh\
-                                              else None
+    if not get_vh:
+      view_hierarchy: Optional[lxml.etree.Element] = None
+    elif prefetched_vh is not None:
+      view_hierarchy: Optional[lxml.etree.Element] = prefetched_vh.result()
+    else:
+      view_hierarchy: Optional[lxml.etree.Element] = self.get_view_hierarchy()
     if get_vh and view_hierarchy is None:
       logger.warning("Fetched View Hierarchy Observation FAILED!")
     self._run_vh_analyzer(view_hierarchy, screen.shape[:2], check_vh)
@@ -984,6 +1027,23 @@ class TaskManager():
     return view_hierarchy
     #  }}} method `snapshot_events` # 
 
+  def get_view_hierarchy(self) -> Optional[lxml.etree.Element]:
+    """
+    Fetches VH through the adb controller of the TaskManager. Safe to be
+    invoked concurrently with the simulator requests.
+    """
+
+    return self._adb_controller.get_view_hierarchy()
+
+  def parse_view_hierarchy(self, view_hierarchy_dump: Optional[bytes])\
+      -> Optional[lxml.etree.Element]:
+    """
+    Parses a raw VH dump fetched elsewhere (e.g., along with a batched step)
+    the same way as `get_view_hierarchy`.
+    """
+
+    return self._adb_controller.parse_view_hierarchy(view_hierarchy_dump)
+
   def clear_events(self):
     #  method `clear_events` {{{ # 
     #with self._lock:
@@ -1107,11 +1167,18 @@ class TaskManager():
         adb_controller=self._adb_controller,
         logcat=self._logcat_thread)
 
-  def _start_logcat_thread(self, log_stream: log_stream_lib.LogStream):
-    self._logcat_thread = logcat_thread.LogcatThread(
-        log_stream=log_stream,
-        log_filter=self._log_filters,
-        lock=self._lock)
+  def _start_logcat_thread( self
+                          , log_stream: Optional[log_stream_lib.LogStream] = None
+                          , logcat_reader: Optional[logcat_thread.LogcatReader] = None
+                          ):
+    if logcat_reader is not None:
+      self._logcat_thread: logcat_thread.LogcatSubscription =\
+          logcat_reader.subscribe(self._log_filters, lock=self._lock)
+    else:
+      self._logcat_thread: logcat_thread.LogcatSubscription = logcat_thread.LogcatThread(
+          log_stream=log_stream,
+          log_filter=self._log_filters,
+          lock=self._lock)
 
     for event_listener in self._log_events: # zdy
       self._logcat_thread.add_event_listener(event_listener)
@@ -1150,7 +1217,9 @@ class TaskManager():
           icon_detector, icon_recognizer, icon_matcher,
           #self._emulator_stub, self._image_format,
           lock=self._lock,
-          block_input=True, block_output=True)
+          block_input=True, block_output=True,
+          skip_unchanged_regions=self._skip_unchanged_screen_regions,
+          text_prefetcher=getattr(self._text_model, "text_prefetcher", None))
     self._screen_analyzer_thread.add_text_event_listeners(*self._text_events)
     self._screen_analyzer_thread.add_icon_event_listeners(*self._icon_events)
     self._screen_analyzer_thread.add_icon_match_event_listeners(*self._icon_match_events)
@@ -20,8 +20,9 @@ import easyocr
 from android_env.components.tools.types import TextModel
 
 from typing import Union, Optional
-from typing import List, Tuple
+from typing import List, Tuple, Dict
 import threading
+import weakref
 
 import torch
 import numpy as np
@@ -57,6 +58,75 @@ def in_bbox(bbox0: torch.Tensor, bbox1: torch.Tensor) -> torch.Tensor:
                             , right_side.logical_and(down_side)
                             )
 
+Region = Tuple[int, int, int, int] # (x0, y0, x1, y1)
+
+def to_region( bbox: List[float]
+             , width: int
+             , height: int
+             ) -> Optional[Region]:
+    """
+    Converts `bbox` into an integral region clipped by the screen.
+
+    Args:
+        bbox - list of float like [x0, y0, x1, y1]
+        width - int
+        height - int
+
+    Returns:
+        tuple like (x0, y0, x1, y1) of int or None if the region is empty
+    """
+
+    x0, y0, x1, y1 = bbox
+    rgn = ( min(max(int(np.floor(x0)), 0), width)
+          , min(max(int(np.floor(y0)), 0), height)
+          , min(max(int(np.ceil(x1)), 0), width)
+          , min(max(int(np.ceil(y1)), 0), height)
+          )
+    if rgn[2]<=rgn[0] or rgn[3]<=rgn[1]:
+        return None
+    return rgn
+
+def _overlaps(rgn0: Region, rgn1: Region) -> bool:
+    return rgn0[0]<rgn1[2] and rgn1[0]<rgn0[2]\
+       and rgn0[1]<rgn1[3] and rgn1[1]<rgn0[3]
+
+def _contains(rgn0: Region, rgn1: Region) -> bool:
+    """
+    Test if `rgn1` is contained in `rgn0`.
+    """
+
+    return rgn0[0]<=rgn1[0] and rgn0[1]<=rgn1[1]\
+       and rgn1[2]<=rgn0[2] and rgn1[3]<=rgn0[3]
+
+def merge_regions(regions: List[Region]) -> List[Region]:
+    """
+    Merges the overlapping regions.
+
+    Args:
+        regions - list of tuple like (x0, y0, x1, y1) of int
+
+    Returns:
+        list of tuple like (x0, y0, x1, y1) of int; no two of the returned
+          regions overlap
+    """
+
+    merged_regions: List[Region] = []
+    for rgn in regions:
+        # merge with the existing regions until no overlapping one remains
+        merged = True
+        while merged:
+            merged = False
+            for i, ext in enumerate(merged_regions):
+                if _overlaps(rgn, ext):
+                    rgn = ( min(rgn[0], ext[0]), min(rgn[1], ext[1])
+                          , max(rgn[2], ext[2]), max(rgn[3], ext[3])
+                          )
+                    del merged_regions[i]
+                    merged = True
+                    break
+        merged_regions.append(rgn)
+    return merged_regions
+
 class EasyOCRWrapper(TextModel):
     def __init__( self
                 , lang_list: List[str] = ["en"]
@@ -64,6 +134,7 @@ class EasyOCRWrapper(TextModel):
                 , model_storage_directory: Optional[str] = None
                 , download_enabled: bool = True
                 , reader: Optional[easyocr.Reader] = None
+                , crop_regions: bool = False
                 ):
         #  method __init__ {{{ # 
         """
@@ -83,6 +154,12 @@ class EasyOCRWrapper(TextModel):
 
             reader (Optional[easyocr.Reader]): an easyocr reader instance. if
               `reader` is provided, the other parameters will be omitted.
+
+            crop_regions (bool): if only the regions of the text events should
+              be recognized rather than the whole screen. the overlapping
+              regions of the detection and the recognition events are merged
+              before cropping. note that a text crossing the region border may
+              be recognized partially in this mode.
         """
 
         self._reader: easyocr.Reader = reader\
@@ -91,6 +168,20 @@ class EasyOCRWrapper(TextModel):
                                                      , download_enabled=download_enabled
                                                      )
         self._lock: threading.Lock = threading.Lock()
+
+        self._crop_regions: bool = crop_regions
+
+        # the OCR results of the last screen are kept so that the detector and
+        # the recognizer invoked on the same frame share one `readtext` pass.
+        # the screen itself is only weakly referenced to identify the frame.
+        self._cached_screen: Optional[weakref.ref] = None
+        self._cached_results: Dict[ Region
+                                  , List[ Tuple[ List[List[float]]
+                                               , str
+                                               , float
+                                               ]
+                                        ]
+                                  ] = {}
         #  }}} method __init__ # 
 
     def _convert_screen(self, screen: torch.Tensor) -> np.ndarray:
@@ -109,6 +200,123 @@ class EasyOCRWrapper(TextModel):
         screen = screen[..., [2, 1, 0]] # convert RGB to BGR
         return screen
 
+    def _readtext( self
+                 , screen: torch.Tensor
+                 , bboxes: List[torch.Tensor]
+                 ) -> List[ Tuple[ List[List[float]]
+                                 , str
+                                 , float
+                                 ]
+                          ]:
+        #  method _readtext {{{ # 
+        """
+        Runs OCR on the screen. The whole screen is recognized by default. If
+        `crop_regions` is enabled, only the merged regions of `bboxes` are
+        cropped and recognized. The results are cached by the identity of the
+        screen frame and the recognized region, thus the repeated invocations
+        on the same frame will be answered without running the model again.
+
+        A queried region not covered by a recognized one is merged with the
+        recognized regions it overlaps and the merged region is recognized
+        again. Invoke `text_prefetcher` with all the regions of a frame first
+        to have them merged and recognized once.
+
+        Args:
+            screen: torch.Tensor of float32 with shape (3, height, width)
+            bboxes: list with length nb_bboxes of torch.Tensor of float32 with
+              shape (1, 4)
+
+        Returns:
+            list of tuple like
+              (
+                List[List[float]]: [x1, y1], [x2, y1], [x2, y2], [x1, y2] in
+                  the screen coordinates
+                str: the recognized text
+                float: the confidence
+              )
+        """
+
+        with self._lock:
+            if self._cached_screen is None or self._cached_screen() is not screen:
+                self._cached_screen = weakref.ref(screen)
+                self._cached_results = {}
+                logger.debug("Screen Size (H, W): %s", tuple(screen.shape[1:]))
+
+            _, height, width = screen.shape
+            queried: List[Region] = [(0, 0, width, height)]
+            if self._crop_regions:
+                queried = list( filter( None
+                                      , map( lambda bb: to_region(bb, width, height)
+                                           , torch.cat(bboxes).tolist()
+                                           )
+                                      )
+                              )
+
+            uncovered: List[Region] = [ rgn for rgn in queried
+                                            if not any( _contains(ext, rgn)
+                                                        for ext in self._cached_results
+                                                      )
+                                      ]
+            if len(uncovered)>0:
+                # the recognized regions are kept disjoint, thus the overlapped
+                # ones are absorbed into the new regions
+                regions: List[Region] = merge_regions(uncovered)
+                absorbed: List[Region] = []
+                while True:
+                    overlapped: List[Region] = [ ext for ext in self._cached_results
+                                                     if ext not in absorbed\
+                                                    and any(_overlaps(ext, rgn) for rgn in regions)
+                                               ]
+                    if len(overlapped)==0:
+                        break
+                    absorbed += overlapped
+                    regions = merge_regions(regions + overlapped)
+                for ext in absorbed:
+                    logger.debug("Region %s is absorbed and recognized again.", str(ext))
+                    del self._cached_results[ext]
+
+                image: np.ndarray = self._convert_screen(screen) # (H, W, 3)
+                for rgn in regions:
+                    x0, y0, x1, y1 = rgn
+                    logger.debug("Model Starts OCR on %s.", str(rgn))
+                    rgn_results = self._reader.readtext(image[y0:y1, x0:x1])
+                    logger.debug("Model Ends OCR.")
+                    if x0!=0 or y0!=0:
+                        rgn_results = [ ([[pt[0]+x0, pt[1]+y0] for pt in bb], t, c)
+                                        for bb, t, c in rgn_results
+                                      ]
+                    self._cached_results[rgn] = rgn_results
+
+            results = []
+            used_regions: List[Region] = []
+            for rgn in queried:
+                ext: Region = next( ext for ext in self._cached_results
+                                        if _contains(ext, rgn)
+                                  )
+                if ext not in used_regions:
+                    used_regions.append(ext)
+                    results += self._cached_results[ext]
+        return results
+        #  }}} method _readtext # 
+
+    def text_prefetcher( self
+                       , screen: torch.Tensor
+                       , bboxes: List[torch.Tensor]
+                       ):
+        #  method text_prefetcher {{{ # 
+        """
+        Recognizes all the regions to be queried on `screen` at once, so that
+        the regions of the detector and the recognizer are merged together
+        and no pixel is recognized twice.
+
+        Args:
+            screen: torch.Tensor of float32 with shape (3, height, width)
+            bboxes: list with length nb_bboxes of torch.Tensor of float32 with shape (1, 4)
+        """
+
+        self._readtext(screen, bboxes)
+        #  }}} method text_prefetcher # 
+
     def text_detector( self
                      , screen: torch.Tensor
                      , bboxes: List[torch.Tensor]
@@ -126,16 +334,11 @@ class EasyOCRWrapper(TextModel):
         try:
             logger.debug("EasyOCR Starts.")
 
-            screen = self._convert_screen(screen) # (H, W, 3)
-            logger.debug("Screen Size (H, W): %s", screen.shape[:2])
-            with self._lock:
-                logger.debug("Model Starts OCR.")
-                results: List[ Tuple[ List[List[float]] # [x1, y1], [x2, y1], [x2, y2], [x1, y2]
-                                    , str
-                                    , float
-                                    ]
-                             ] = self._reader.readtext(screen) # get all results
-                logger.debug("Model Ends OCR.")
+            results: List[ Tuple[ List[List[float]] # [x1, y1], [x2, y1], [x2, y2], [x1, y2]
+                                , str
+                                , float
+                                ]
+                         ] = self._readtext(screen, bboxes)
 
             logger.debug("Screen begins")
             for bbox, t, _ in results:
@@ -155,7 +358,7 @@ class EasyOCRWrapper(TextModel):
                                               )
                                          )
                                     )
-                                ) # (M, 4); M is the number of results
+                                ).reshape(-1, 4) # (M, 4); M is the number of results
             region_mask = in_bbox(result_bboxes, target_bboxes) # (N, M)
 
             result_texts = list( map( lambda rst: rst[1]
@@ -189,9 +392,7 @@ class EasyOCRWrapper(TextModel):
             list with length nb_bboxes of str
         """
 
-        screen = self._convert_screen(screen) # (H, W, 3)
-        with self._lock:
-            results = self._reader.readtext(screen)
+        results = self._readtext(screen, bboxes)
 
         # check the bboxes
         target_bboxes = torch.cat(bboxes) # (N, 4); N is nb_bboxes
@@ -202,7 +403,7 @@ class EasyOCRWrapper(TextModel):
                                           )
                                      )
                                 )
-                            ) # (M, 4); M is the number of results
+                            ).reshape(-1, 4) # (M, 4); M is the number of results
         region_mask = in_bbox(result_bboxes, target_bboxes) # (N, M)
 
         result_texts = list( map( lambda rst: rst[1]
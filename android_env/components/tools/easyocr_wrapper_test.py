@@ -0,0 +1,114 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.components.tools.easyocr_wrapper."""
+
+from absl.testing import absltest
+import mock
+import numpy as np
+import torch
+
+try:
+  from android_env.components.tools import easyocr_wrapper
+except ImportError:
+  # EasyOCR is an optional dependency (the `easyocr` extra).
+  easyocr_wrapper = None
+
+
+def _ocr_result(x0, y0, x1, y1, text):
+  return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, .9
+
+
+@absltest.skipIf(easyocr_wrapper is None, 'easyocr is not installed')
+class EasyOCRWrapperTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._reader = mock.Mock()
+    self._reader.readtext.return_value = [
+        _ocr_result(1, 1, 5, 3, 'Hello'),
+        _ocr_result(10, 10, 14, 12, 'World'),
+    ]
+    self._bboxes = [
+        torch.tensor([[0., 0., 8., 8.]]),
+        torch.tensor([[8., 8., 16., 16.]]),
+        torch.tensor([[0., 0., 16., 16.]]),
+    ]
+
+  def test_one_pass_per_frame(self):
+    model = easyocr_wrapper.EasyOCRWrapper(reader=self._reader)
+    screen = torch.zeros((3, 16, 16))
+    screen[0] = 1.
+
+    self.assertEqual([['Hello'], ['World'], ['Hello', 'World']],
+                     model.text_detector(screen, self._bboxes))
+    self.assertEqual(['Hello', 'World', 'Hello World'],
+                     model.text_recognizer(screen, self._bboxes))
+    self.assertEqual(1, self._reader.readtext.call_count)
+    image = self._reader.readtext.call_args[0][0]
+    self.assertEqual((16, 16, 3), image.shape)
+    self.assertEqual(np.uint8, image.dtype)
+    # The RGB screen is handed over in BGR.
+    np.testing.assert_array_equal([0, 0, 255], image[0, 0])
+
+    # A new frame is recognized again.
+    model.text_recognizer(screen.clone(), self._bboxes)
+    self.assertEqual(2, self._reader.readtext.call_count)
+
+  def test_crop_regions_recognized_once(self):
+    self._reader.readtext.side_effect = lambda image: [
+        _ocr_result(1, 1, 3, 3, 'x%d' % image.shape[1])]
+    model = easyocr_wrapper.EasyOCRWrapper(
+        reader=self._reader, crop_regions=True)
+    screen = torch.zeros((3, 16, 16))
+    detect_bboxes = [torch.tensor([[0., 0., 8., 8.]]),
+                     torch.tensor([[12., 12., 16., 16.]])]
+    recog_bboxes = [torch.tensor([[4., 4., 12., 10.]])]
+
+    model.text_prefetcher(screen, detect_bboxes + recog_bboxes)
+    self.assertEqual([['x12'], ['x4']],
+                     model.text_detector(screen, detect_bboxes))
+    self.assertEqual([''], model.text_recognizer(screen, recog_bboxes))
+    # The overlapping regions of both queries are cropped together.
+    crops = [call[0][0].shape for call in self._reader.readtext.call_args_list]
+    self.assertCountEqual([(10, 12, 3), (4, 4, 3)], crops)
+
+    results = model._readtext(screen, detect_bboxes)
+    self.assertCountEqual([[[1, 1], [3, 1], [3, 3], [1, 3]],
+                           [[13, 13], [15, 13], [15, 15], [13, 15]]],
+                          [bbox for bbox, _, _ in results])
+
+  def test_crop_regions_without_prefetch(self):
+    self._reader.readtext.side_effect = lambda image: [
+        _ocr_result(5, 5, 7, 7, 'x%d' % image.shape[1])]
+    model = easyocr_wrapper.EasyOCRWrapper(
+        reader=self._reader, crop_regions=True)
+    screen = torch.zeros((3, 16, 16))
+
+    self.assertEqual([['x8']], model.text_detector(
+        screen, [torch.tensor([[0., 0., 8., 8.]])]))
+    # The recognized region overlapped is absorbed into the new one, thus no
+    # text is returned twice.
+    self.assertEqual(['x12'], model.text_recognizer(
+        screen, [torch.tensor([[0., 0., 12., 12.]])]))
+    self.assertEqual([['x12']], model.text_detector(
+        screen, [torch.tensor([[0., 0., 8., 8.]])]))
+    self.assertEqual(2, self._reader.readtext.call_count)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -49,6 +49,22 @@ class TextModel(abc.ABC):
         """
 
         return ["" for _ in bboxes]
+    def text_prefetcher( self
+                       , screen: torch.Tensor
+                       , bboxes: List[torch.Tensor]
+                       ):
+        """
+        Invoked with the regions of both `text_detector` and
+        `text_recognizer` before they are invoked on the same screen, so that
+        the model may process all the regions in one pass. Does nothing by
+        default.
+
+        Args:
+            screen: torch.Tensor of float32 with shape (3, height, width)
+            bboxes: list of torch.Tensor of float32 with shape (1, 4)
+        """
+
+        pass
 
 class IconModel(abc.ABC):
     def icon_detector( self
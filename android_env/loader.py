@@ -143,6 +143,8 @@ def load( task_path: str
       gpu_mode='swiftshader_indirect',
       writable_system=False)
   coordinator_args: Dict[str, Any] = coordinator_args or {}
+  if coordinator_args.get("snapshot_reset", False):
+    emulator_launcher_args["snapshot_enabled"] = True
 
   # Prepare task.
   task_list = []
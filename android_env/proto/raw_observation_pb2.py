@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: android_env/proto/raw_observation.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'android_env/proto/raw_observation.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\'android_env/proto/raw_observation.proto\x12\x0b\x61ndroid_env\"\xa5\x01\n\x0eRawObservation\x12\x14\n\x0ctimestamp_us\x18\x01 \x01(\x03\x12\x31\n\x06screen\x18\x02 \x01(\x0b\x32!.android_env.RawObservation.Image\x1aJ\n\x05Image\x12\r\n\x05width\x18\x01 \x01(\x05\x12\x0e\n\x06height\x18\x02 \x01(\x05\x12\x14\n\x0cnum_channels\x18\x03 \x01(\x05\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'android_env.proto.raw_observation_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_RAWOBSERVATION']._serialized_start=57
+  _globals['_RAWOBSERVATION']._serialized_end=222
+  _globals['_RAWOBSERVATION_IMAGE']._serialized_start=148
+  _globals['_RAWOBSERVATION_IMAGE']._serialized_end=222
+# @@protoc_insertion_point(module_scope)
@@ -25,6 +25,7 @@ from android_env.templates.utils import ( parse_vh_vlm_action_from_action_markup
 from android_env.components.tools.easyocr_wrapper import EasyOCRWrapper
 from android_env.components.coordinator import EventCheckControl
 from android_env.wrappers import VhIoWrapper, TapActionWrapper, ImageRescaleWrapper
+from android_env.trajectory_store import frame_digest
 import android_env
 from typing import TypedDict, List, Tuple, Dict
 from typing import Optional, Any, Literal, Callable, Union
@@ -135,6 +136,13 @@ def evaluate_task( env: Environment, task_index: int
                                       , "total_reward": reward
                                       }
     if save_to is not None:
+        # identical screens share one array, which pickle saves only once
+        frames: Dict[bytes, np.ndarray] = {}
+        for rcd in trajectory:
+            if isinstance(rcd["observation"].get("pixels"), np.ndarray):
+                rcd["observation"]["pixels"] = frames.setdefault( frame_digest(rcd["observation"]["pixels"])
+                                                                , rcd["observation"]["pixels"]
+                                                                )
         with gzip.open(save_to, "wb") as f:
             pkl.dump(trajectory_dict, f)
 
@@ -0,0 +1,361 @@
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""
+A columnar trajectory store allowing random access to single steps.
+
+A store is a directory holding
+
+* `steps.bin`: a flat array of `STEP_DTYPE` records, one per step, holding
+  the action, the reward and where the other columns of the step are
+* `frames.bin`: the raw uint8 screens, one after another. the screens are
+  content-addressed, i.e., a screen identical to a saved one is not saved
+  again and the steps showing it refer to the same frame.
+* `view_hierarchies.bin`: the zlib-compressed VH XML strings
+* `episodes.jsonl`: one JSON object per episode with the task information,
+  the first step of the episode, its length, the sparse instructions and the
+  ends of the binary files after it is written
+
+`steps.bin` and `frames.bin` are memory-mapped when read, thus a step can be
+loaded without deserializing the episode it belongs to. An episode is
+committed by its line in `episodes.jsonl`, which is written at last, so the
+steps of an interrupted write are ignored.
+"""
+
+import hashlib
+import json
+import os
+import pickle as pkl
+import zlib
+
+from android_env.components import action_type
+import numpy as np
+
+from typing import Any, Iterable, Iterator, Optional
+from typing import Dict, List, Tuple
+
+#from absl import logging
+import logging
+
+logger = logging.getLogger("mobile_env.trajectory_store")
+
+STEP_DTYPE = np.dtype( [ ("episode", "<u4")
+                       , ("action_type", "<i4") # -1 for the first step of an episode
+                       , ("touch_position", "<f4", (2,))
+                       , ("input_token", "<i4")
+                       , ("reward", "<f4")
+                       , ("orientation", "<i4")
+                       , ("frame_offset", "<u8")
+                       , ("frame_shape", "<u4", (3,))
+                       , ("frame_digest", "V16")
+                       , ("vh_offset", "<u8")
+                       , ("vh_length", "<i8") # -1 for no VH
+                       ]
+                     )
+NO_ACTION = -1
+
+_STEPS = "steps.bin"
+_FRAMES = "frames.bin"
+_VIEW_HIERARCHIES = "view_hierarchies.bin"
+_EPISODES = "episodes.jsonl"
+
+class TrajectoryWriter:
+    #  class TrajectoryWriter {{{ # 
+    """
+    Appends episodes to a trajectory store, creating it if absent.
+    """
+
+    def __init__(self, path: str):
+        #  method __init__ {{{ # 
+        """
+        Args:
+            path (str): the directory of the store
+        """
+
+        self._path: str = path
+        os.makedirs(path, exist_ok=True)
+
+        # truncate the steps of an interrupted episode
+        episodes, episode_end = _load_episodes(path)
+        if os.path.exists(os.path.join(path, _EPISODES)):
+            os.truncate(os.path.join(path, _EPISODES), episode_end)
+        nb_steps: int = episodes[-1]["start"] + episodes[-1]["length"] if len(episodes)>0 else 0
+        self._nb_episodes: int = len(episodes)
+        self._nb_steps: int = nb_steps
+
+        step_file: str = os.path.join(path, _STEPS)
+        if os.path.exists(step_file):
+            os.truncate(step_file, nb_steps*STEP_DTYPE.itemsize)
+        for name, key in [(_FRAMES, "frame_end"), (_VIEW_HIERARCHIES, "vh_end")]:
+            if os.path.exists(os.path.join(path, name)):
+                os.truncate(os.path.join(path, name), episodes[-1][key] if len(episodes)>0 else 0)
+
+        # digest -> offset of the saved frames
+        self._frames: Dict[bytes, int] = {}
+        steps: np.ndarray = _memmap(step_file, STEP_DTYPE, nb_steps)
+        for digest, offset in zip(steps["frame_digest"].tolist(), steps["frame_offset"].tolist()):
+            self._frames.setdefault(digest, offset)
+        del steps
+
+        self._step_file = open(step_file, "ab")
+        self._frame_file = open(os.path.join(path, _FRAMES), "ab")
+        self._vh_file = open(os.path.join(path, _VIEW_HIERARCHIES), "ab")
+        self._episode_file = open(os.path.join(path, _EPISODES), "a")
+        #  }}} method __init__ # 
+
+    def append_episode(self, trajectory: List[Dict[str, Any]]):
+        #  method append_episode {{{ # 
+        """
+        Args:
+            trajectory (List[Dict[str, Any]]): the records of an episode as
+              saved by `RecorderWrapper`. the first record holds `task_id`,
+              `task` and `command` and no action. the others hold
+              `action_type`, `reward`, optional `touch_position`,
+              `input_token` and `instruction`. all the records hold
+              `observation` (the screen), `view_hierarchy` (XML string or
+              None) and `orientation`.
+        """
+
+        if len(trajectory)==0:
+            return
+
+        steps: np.ndarray = np.zeros((len(trajectory),), dtype=STEP_DTYPE)
+        instructions: Dict[str, List[str]] = {}
+        frame_offset: int = self._frame_file.tell()
+        vh_offset: int = self._vh_file.tell()
+        for i, record in enumerate(trajectory):
+            step: np.ndarray = steps[i]
+            step["episode"] = self._nb_episodes
+            step["action_type"] = record.get("action_type", NO_ACTION)
+            if "touch_position" in record:
+                step["touch_position"] = record["touch_position"]
+            step["input_token"] = record.get("input_token", -1)
+            step["reward"] = record.get("reward", 0.)
+            step["orientation"] = record.get("orientation", 0)
+            if "instruction" in record:
+                instructions[str(i)] = list(record["instruction"])
+
+            frame: np.ndarray = np.ascontiguousarray(record["observation"], dtype=np.uint8)
+            frame = frame.reshape(frame.shape + (1,)*(3-frame.ndim))
+            digest: bytes = frame_digest(frame)
+            step["frame_shape"] = frame.shape
+            step["frame_digest"] = digest
+            if digest in self._frames:
+                step["frame_offset"] = self._frames[digest]
+            else:
+                self._frame_file.write(frame.tobytes())
+                step["frame_offset"] = frame_offset
+                self._frames[digest] = frame_offset
+                frame_offset += frame.nbytes
+
+            view_hierarchy: Optional[str] = record.get("view_hierarchy")
+            step["vh_offset"] = vh_offset
+            if view_hierarchy is None:
+                step["vh_length"] = -1
+            else:
+                block: bytes = zlib.compress(view_hierarchy.encode("utf-8"))
+                self._vh_file.write(block)
+                step["vh_length"] = len(block)
+                vh_offset += len(block)
+        self._step_file.write(steps.tobytes())
+        for f in [self._frame_file, self._vh_file, self._step_file]:
+            f.flush()
+
+        episode: Dict[str, Any] = { "task_id": trajectory[0].get("task_id")
+                                  , "task": trajectory[0].get("task")
+                                  , "command": trajectory[0].get("command")
+                                  , "start": self._nb_steps
+                                  , "length": len(trajectory)
+                                  , "instructions": instructions
+                                  , "frame_end": frame_offset
+                                  , "vh_end": vh_offset
+                                  }
+        self._episode_file.write(json.dumps(episode) + "\n")
+        self._episode_file.flush()
+
+        self._nb_episodes += 1
+        self._nb_steps += len(trajectory)
+        #  }}} method append_episode # 
+
+    def close(self):
+        for f in [self._step_file, self._frame_file, self._vh_file, self._episode_file]:
+            f.close()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+    def __exit__(self, *args):
+        self.close()
+    #  }}} class TrajectoryWriter # 
+
+class TrajectoryStore:
+    #  class TrajectoryStore {{{ # 
+    """
+    Reads a trajectory store. The store is read as it is when opened.
+
+    `store[i]` gives the record of step `i` in the format saved by
+    `RecorderWrapper`, with the screen as a read-only memory-mapped array.
+    The columns of all the steps are available as `store.steps`, e.g.,
+    `store.steps["reward"]`, without loading the screens or VHs.
+    """
+
+    def __init__(self, path: str):
+        #  method __init__ {{{ # 
+        """
+        Args:
+            path (str): the directory of the store
+        """
+
+        self._path: str = path
+        self.episodes: List[Dict[str, Any]] = _load_episodes(path)[0]
+        nb_steps: int = self.episodes[-1]["start"] + self.episodes[-1]["length"] if len(self.episodes)>0 else 0
+
+        self.steps: np.ndarray = _memmap(os.path.join(path, _STEPS), STEP_DTYPE, nb_steps)
+        frame_end: int = self.episodes[-1]["frame_end"] if nb_steps>0 else 0
+        self._frames: np.ndarray = _memmap(os.path.join(path, _FRAMES), np.uint8, frame_end)
+        self._vh_fd: Optional[int] = os.open(os.path.join(path, _VIEW_HIERARCHIES), os.O_RDONLY)\
+                if os.path.exists(os.path.join(path, _VIEW_HIERARCHIES)) else None
+        #  }}} method __init__ # 
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def frame(self, index: int) -> np.ndarray:
+        step: np.ndarray = self.steps[index]
+        offset: int = int(step["frame_offset"])
+        shape: List[int] = step["frame_shape"].tolist()
+        return self._frames[offset:offset+int(np.prod(shape))].reshape(shape)
+
+    def view_hierarchy(self, index: int) -> Optional[str]:
+        step: np.ndarray = self.steps[index]
+        if step["vh_length"]<0:
+            return None
+        # `pread` shares no file position, thus forked readers are safe
+        block: bytes = os.pread(self._vh_fd, int(step["vh_length"]), int(step["vh_offset"]))
+        return zlib.decompress(block).decode("utf-8")
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        #  method __getitem__ {{{ # 
+        if index<0:
+            index += len(self)
+        step: np.ndarray = self.steps[index]
+        episode: Dict[str, Any] = self.episodes[int(step["episode"])]
+        offset: int = index - episode["start"]
+
+        record: Dict[str, Any] = {}
+        if step["action_type"]==NO_ACTION:
+            record["task_id"] = episode["task_id"]
+            record["task"] = episode["task"]
+            record["command"] = episode["command"]
+        else:
+            record["action_type"] = int(step["action_type"])
+            if step["input_token"]>=0:
+                record["input_token"] = int(step["input_token"])
+            if step["action_type"]==action_type.ActionType.TOUCH:
+                record["touch_position"] = np.array(step["touch_position"])
+            record["reward"] = float(step["reward"])
+            if str(offset) in episode["instructions"]:
+                record["instruction"] = episode["instructions"][str(offset)]
+        record["observation"] = self.frame(index)
+        record["view_hierarchy"] = self.view_hierarchy(index)
+        record["orientation"] = int(step["orientation"])
+        return record
+        #  }}} method __getitem__ # 
+
+    def episode(self, index: int) -> List[Dict[str, Any]]:
+        episode: Dict[str, Any] = self.episodes[index]
+        return [self[i] for i in range(episode["start"], episode["start"]+episode["length"])]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if self._vh_fd is not None:
+            os.close(self._vh_fd)
+            self._vh_fd = None
+    #  }}} class TrajectoryStore # 
+
+def frame_digest(frame: np.ndarray) -> bytes:
+    """
+    Returns the content address of a screen, taking its shape into account.
+    """
+
+    frame = np.ascontiguousarray(frame)
+    digest = hashlib.blake2b(repr((frame.dtype.str, frame.shape)).encode(), digest_size=16)
+    digest.update(frame.data)
+    return digest.digest()
+
+def convert_pickles(pickle_paths: Iterable[str], path: str) -> int:
+    #  function convert_pickles {{{ # 
+    """
+    Appends the trajectories saved by `RecorderWrapper` in pickles to a
+    store.
+
+    Args:
+        pickle_paths (Iterable[str]): the pickle files, each holding one or
+          more trajectories dumped one after another
+        path (str): the directory of the store
+
+    Returns:
+        int: the number of the converted trajectories
+    """
+
+    nb_trajectories = 0
+    with TrajectoryWriter(path) as writer:
+        for pkl_path in pickle_paths:
+            with open(pkl_path, "rb") as f:
+                while True:
+                    try:
+                        trajectory: List[Dict[str, Any]] = pkl.load(f)
+                    except EOFError:
+                        break
+                    writer.append_episode(trajectory)
+                    nb_trajectories += 1
+            logger.info("Converted %s.", pkl_path)
+    return nb_trajectories
+    #  }}} function convert_pickles # 
+
+def _load_episodes(path: str) -> Tuple[List[Dict[str, Any]], int]:
+    #  function _load_episodes {{{ # 
+    """
+    Returns:
+        List[Dict[str, Any]]: the committed episodes
+        int: the length in bytes of the lines of the committed episodes
+    """
+
+    episodes: List[Dict[str, Any]] = []
+    end = 0
+    episode_file: str = os.path.join(path, _EPISODES)
+    if not os.path.exists(episode_file):
+        return episodes, end
+    with open(episode_file, "rb") as f:
+        for l in f:
+            try:
+                if not l.endswith(b"\n"):
+                    raise ValueError("Incomplete line")
+                episodes.append(json.loads(l))
+            except ValueError:
+                # a line broken by an interrupted write
+                logger.warning("Ignored a broken episode line in %s.", episode_file)
+                break
+            end += len(l)
+    return episodes, end
+    #  }}} function _load_episodes # 
+
+def _memmap(file_name: str, dtype: np.dtype, length: int) -> np.ndarray:
+    if length==0:
+        return np.zeros((0,), dtype=dtype)
+    return np.memmap(file_name, dtype=dtype, mode="r", shape=(length,))
@@ -0,0 +1,130 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.trajectory_store."""
+
+import os
+import pickle
+import tempfile
+
+from absl.testing import absltest
+from android_env import trajectory_store
+from android_env.components import action_type
+import numpy as np
+
+
+def _trajectory(task_id, nb_steps):
+  trajectory = [{
+      'task_id': task_id,
+      'task': 'task ' + task_id,
+      'command': ['do it'],
+      'observation': np.zeros((4, 3, 3), dtype=np.uint8),
+      'view_hierarchy': '<hierarchy />',
+      'orientation': 0,
+  }]
+  for i in range(1, nb_steps):
+    trajectory.append({
+        'action_type': action_type.ActionType.TOUCH,
+        'touch_position': np.array([.5, .25], dtype=np.float32),
+        'reward': float(i),
+        'instruction': ['step %d' % i],
+        'observation': np.full((4, 3, 3), i, dtype=np.uint8),
+        'view_hierarchy': None,
+        'orientation': 1,
+    })
+  return trajectory
+
+
+class TrajectoryStoreTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._path = os.path.join(tempfile.mkdtemp(), 'store')
+
+  def test_random_access(self):
+    with trajectory_store.TrajectoryWriter(self._path) as writer:
+      writer.append_episode(_trajectory('a', 2))
+      writer.append_episode(_trajectory('b', 3))
+
+    store = trajectory_store.TrajectoryStore(self._path)
+    self.addCleanup(store.close)
+    self.assertLen(store, 5)
+    self.assertLen(store.episodes, 2)
+    np.testing.assert_array_equal([0., 1., 0., 1., 2.], store.steps['reward'])
+
+    first = store[2]
+    self.assertEqual('b', first['task_id'])
+    self.assertEqual('<hierarchy />', first['view_hierarchy'])
+    self.assertNotIn('action_type', first)
+
+    last = store[-1]
+    self.assertEqual(action_type.ActionType.TOUCH, last['action_type'])
+    np.testing.assert_allclose([.5, .25], last['touch_position'])
+    self.assertEqual(['step 2'], last['instruction'])
+    self.assertIsNone(last['view_hierarchy'])
+    np.testing.assert_array_equal(np.full((4, 3, 3), 2), last['observation'])
+    self.assertLen(store.episode(1), 3)
+
+  def test_identical_frames_saved_once(self):
+    with trajectory_store.TrajectoryWriter(self._path) as writer:
+      writer.append_episode(_trajectory('a', 3))
+    with trajectory_store.TrajectoryWriter(self._path) as writer:
+      # The frames are shared with the former episode.
+      writer.append_episode(_trajectory('b', 3))
+
+    frame_size = 4 * 3 * 3
+    self.assertEqual(
+        3 * frame_size,
+        os.path.getsize(os.path.join(self._path, 'frames.bin')))
+    store = trajectory_store.TrajectoryStore(self._path)
+    self.addCleanup(store.close)
+    self.assertEqual(store.steps['frame_offset'][1],
+                     store.steps['frame_offset'][4])
+    np.testing.assert_array_equal(np.full((4, 3, 3), 2), store[5]['observation'])
+
+  def test_interrupted_episode_dropped(self):
+    with trajectory_store.TrajectoryWriter(self._path) as writer:
+      writer.append_episode(_trajectory('a', 2))
+    # Steps written without the episode line, as if the writer were killed.
+    with open(os.path.join(self._path, 'steps.bin'), 'ab') as f:
+      f.write(b'\0' * trajectory_store.STEP_DTYPE.itemsize)
+    with open(os.path.join(self._path, 'episodes.jsonl'), 'a') as f:
+      f.write('{"task_id": ')
+
+    with trajectory_store.TrajectoryWriter(self._path) as writer:
+      writer.append_episode(_trajectory('b', 2))
+    store = trajectory_store.TrajectoryStore(self._path)
+    self.addCleanup(store.close)
+    self.assertEqual(['a', 'b'], [e['task_id'] for e in store.episodes])
+    self.assertLen(store, 4)
+    np.testing.assert_array_equal(np.full((4, 3, 3), 1), store[3]['observation'])
+
+  def test_convert_pickles(self):
+    pickle_path = os.path.join(tempfile.mkdtemp(), 'dump.0.pkl')
+    with open(pickle_path, 'ab') as f:
+      pickle.dump(_trajectory('a', 2), f)
+      pickle.dump(_trajectory('b', 2), f)
+
+    self.assertEqual(
+        2, trajectory_store.convert_pickles([pickle_path], self._path))
+    store = trajectory_store.TrajectoryStore(self._path)
+    self.addCleanup(store.close)
+    self.assertLen(store, 4)
+
+
+if __name__ == '__main__':
+  absltest.main()
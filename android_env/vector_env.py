@@ -0,0 +1,401 @@
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+import concurrent.futures
+import multiprocessing
+import multiprocessing.connection
+import traceback
+
+from android_env import interfaces
+import numpy as np
+import lxml.etree
+
+from typing import Any, Callable, Optional, NamedTuple, Sequence
+from typing import Dict, List, Tuple
+
+#from absl import logging
+import logging
+
+logger = logging.getLogger("mobile_env.vector_env")
+
+EnvFn = Callable[[], interfaces.env.Environment]
+
+class BatchedTimeStep(NamedTuple):
+    #  class BatchedTimeStep {{{ # 
+    """
+    The `TimeStep`s of all the environments at the same step.
+
+    Attributes:
+        step_type (np.ndarray): array of int64 with shape (N,) as
+          `interfaces.timestep.StepType`
+        reward (np.ndarray): array of float64 with shape (N,)
+        observation (Any): the observations stacked along a new first axis.
+          for a dict observation, each item is stacked individually. the
+          items that cannot be stacked (e.g., `view_hierarchy` or screens of
+          different sizes) are given as lists.
+        succeeds (List[Optional[bool]]): list with length N, True for
+          success, False for failure, and None for ending with exception or
+          not ending
+        final_observation (List[Any]): list with length N. if an episode ends
+          at this step and the environment is reset automatically,
+          `observation` holds the first observation of the new episode and
+          the last observation of the ended episode is given here. None for
+          the others.
+    """
+
+    step_type: np.ndarray
+    reward: np.ndarray
+    observation: Any
+    succeeds: List[Optional[bool]]
+    final_observation: List[Any]
+
+    def first(self) -> np.ndarray:
+        return self.step_type==interfaces.timestep.StepType.FIRST
+    def mid(self) -> np.ndarray:
+        return self.step_type==interfaces.timestep.StepType.MID
+    def last(self) -> np.ndarray:
+        return self.step_type==interfaces.timestep.StepType.LAST
+    #  }}} class BatchedTimeStep # 
+
+class VectorAndroidEnv:
+    #  class VectorAndroidEnv {{{ # 
+    """
+    Drives several environments (e.g., loaded by `android_env.load` or
+    `android_env.load_remote`) concurrently, each in a worker thread or
+    process, and batches their time steps.
+
+    Threads are adequate if the most time is spent waiting for the simulators
+    (e.g., remote simulators). Processes get around GIL if the environments
+    bear heavy local computation like the screen models, yet `env_fns` and
+    the actions should be picklable then.
+    """
+
+    def __init__( self
+                , env_fns: Sequence[EnvFn]
+                , use_processes: bool = False
+                , auto_reset: bool = True
+                ):
+        #  method __init__ {{{ # 
+        """
+        Args:
+            env_fns (Sequence[Callable[[], interfaces.env.Environment]]):
+              functions to create the environments, e.g.,
+              `functools.partial(android_env.load, ...)`. they are invoked in
+              the workers concurrently.
+            use_processes (bool): if the environments should be run in worker
+              processes rather than threads
+            auto_reset (bool): if an environment should be reset at once when
+              its episode ends. see `BatchedTimeStep.final_observation`.
+        """
+
+        self._nb_envs: int = len(env_fns)
+        self._use_processes: bool = use_processes
+        self._auto_reset: bool = auto_reset
+        self._closed: bool = False
+
+        # the environments already built are closed if any fails to be built
+        if self._use_processes:
+            self._connections: List[multiprocessing.connection.Connection] = []
+            self._processes: List[multiprocessing.Process] = []
+            try:
+                for env_fn in env_fns:
+                    connection: multiprocessing.connection.Connection
+                    worker_connection: multiprocessing.connection.Connection
+                    connection, worker_connection = multiprocessing.Pipe()
+                    process = multiprocessing.Process( target=_work
+                                                     , args=(worker_connection, env_fn, auto_reset)
+                                                     , daemon=True
+                                                     )
+                    self._connections.append(connection)
+                    process.start()
+                    worker_connection.close()
+                    self._processes.append(process)
+                for i, cnnct in enumerate(self._connections):
+                    _receive(cnnct, i)
+            except BaseException:
+                self.close()
+                raise
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor( max_workers=self._nb_envs
+                                                                  , thread_name_prefix="vector_env"
+                                                                  )
+            futures: List[concurrent.futures.Future] = [self._executor.submit(f) for f in env_fns]
+            concurrent.futures.wait(futures)
+            self._envs: List[interfaces.env.Environment] =\
+                    [ftr.result() for ftr in futures if ftr.exception() is None]
+            failures: List[BaseException] = [ftr.exception() for ftr in futures if ftr.exception() is not None]
+            if len(failures)>0:
+                self.close()
+                raise failures[0]
+        #  }}} method __init__ # 
+
+    @property
+    def nb_envs(self) -> int:
+        return self._nb_envs
+    def __len__(self) -> int:
+        return self._nb_envs
+
+    def observation_spec(self) -> Any:
+        return self.call("observation_spec")[0]
+    def action_spec(self) -> Any:
+        return self.call("action_spec")[0]
+
+    def reset(self, **kwargs) -> BatchedTimeStep:
+        #  method reset {{{ # 
+        """
+        Resets all the environments.
+
+        Args:
+            kwargs (Dict[str, Any]): passed to `reset` of each environment
+
+        Returns:
+            BatchedTimeStep: the first time steps
+        """
+
+        return _batch(self._dispatch("reset", [()]*self._nb_envs, kwargs))
+        #  }}} method reset # 
+
+    def switch_task(self, index: int, **kwargs) -> BatchedTimeStep:
+        #  method switch_task {{{ # 
+        """
+        Switches all the environments to the same task.
+
+        Args:
+            index (int): the task index
+            kwargs (Dict[str, Any]): passed to `switch_task` of each
+              environment
+
+        Returns:
+            BatchedTimeStep: the first time steps
+        """
+
+        return _batch(self._dispatch("switch_task", [(index,)]*self._nb_envs, kwargs))
+        #  }}} method switch_task # 
+
+    def step(self, actions: Sequence[Any]) -> BatchedTimeStep:
+        #  method step {{{ # 
+        """
+        Args:
+            actions (Sequence[Any]): the actions for each environment in order
+
+        Returns:
+            BatchedTimeStep: the new time steps
+        """
+
+        assert len(actions)==self._nb_envs\
+             , "{:d} actions for {:d} environments".format(len(actions), self._nb_envs)
+        return _batch(self._dispatch("step", [(act,) for act in actions], {}))
+        #  }}} method step # 
+
+    def call(self, name: str, *args, **kwargs) -> List[Any]:
+        #  method call {{{ # 
+        """
+        Invokes the same method of all the environments concurrently, e.g.,
+        `call("switch_task", 0)`.
+
+        Args:
+            name (str): the method name
+            args (Tuple[Any, ...]): positional arguments for the method
+            kwargs (Dict[str, Any]): keyword arguments for the method
+
+        Returns:
+            List[Any]: the returned values of each environment
+        """
+
+        return self._dispatch(name, [args]*self._nb_envs, kwargs)
+        #  }}} method call # 
+
+    def _dispatch( self
+                 , command: str
+                 , args: List[Tuple[Any, ...]]
+                 , kwargs: Dict[str, Any]
+                 ) -> List[Any]:
+        #  method _dispatch {{{ # 
+        if self._use_processes:
+            for cnnct, args_ in zip(self._connections, args):
+                cnnct.send((command, args_, kwargs))
+            # all the replies are read before raising any error so that no
+            # stale reply is left in the pipes for the next command
+            replies: List[Tuple[str, Any]] = [cnnct.recv() for cnnct in self._connections]
+            return [_unpack(rpl, i) for i, rpl in enumerate(replies)]
+        return list( self._executor.map( lambda env, args_: _run(env, command, args_, kwargs, self._auto_reset)
+                                       , self._envs, args
+                                       )
+                   )
+        #  }}} method _dispatch # 
+
+    def close(self):
+        #  method close {{{ # 
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._use_processes:
+            for cnnct in self._connections:
+                try:
+                    cnnct.send(("close", (), {}))
+                except (BrokenPipeError, EOFError):
+                    pass
+            for prcss in self._processes:
+                prcss.join(60.)
+                if prcss.is_alive():
+                    logger.warning("Environment worker %d is not closed in time. Terminate it.", prcss.pid)
+                    prcss.terminate()
+            for cnnct in self._connections:
+                cnnct.close()
+        else:
+            list(self._executor.map(lambda env: env.close(), self._envs))
+            self._executor.shutdown()
+        #  }}} method close # 
+    #  }}} class VectorAndroidEnv # 
+
+def _run( env: interfaces.env.Environment
+        , command: str
+        , args: Tuple[Any, ...]
+        , kwargs: Dict[str, Any]
+        , auto_reset: bool
+        ) -> Any:
+    #  function _run {{{ # 
+    """
+    Runs a command on an environment in the worker.
+
+    Returns:
+        Any: for "reset", "switch_task" and "step", (TimeStep, final
+          observation or None); for the other methods, the returned value
+    """
+
+    if command=="step":
+        step: interfaces.timestep.TimeStep = env.step(*args, **kwargs)
+        if auto_reset and step.last():
+            final_observation: Any = step.observation
+            step = step._replace(observation=env.reset().observation)
+            return step, final_observation
+        return step, None
+    if command in {"reset", "switch_task"}:
+        return getattr(env, command)(*args, **kwargs), None
+    return getattr(env, command)(*args, **kwargs)
+    #  }}} function _run # 
+
+def _stack(values: List[Any]) -> Any:
+    #  function _stack {{{ # 
+    if all(isinstance(v, dict) for v in values):
+        keys: Dict[str, None] = {}
+        for v in values:
+            keys.update(dict.fromkeys(v))
+        return {k: _stack([v.get(k) for v in values]) for k in keys}
+    if all(isinstance(v, np.ndarray) for v in values)\
+            and len({(v.shape, v.dtype) for v in values})==1:
+        return np.stack(values)
+    return values
+    #  }}} function _stack # 
+
+def _batch(results: List[Tuple[interfaces.timestep.TimeStep, Any]]) -> BatchedTimeStep:
+    #  function _batch {{{ # 
+    return BatchedTimeStep( step_type=np.array([stp.step_type for stp, _ in results], dtype=np.int64)
+                          , reward=np.array([stp.reward for stp, _ in results], dtype=np.float64)
+                          , observation=_stack([stp.observation for stp, _ in results])
+                          , succeeds=[stp.succeeds for stp, _ in results]
+                          , final_observation=[fnl for _, fnl in results]
+                          )
+    #  }}} function _batch # 
+
+#  Process Workers {{{ # 
+class _SerializedElement(bytes):
+    """
+    An `lxml.etree._Element` serialized to be sent through the pipe, as the
+    elements cannot be pickled.
+    """
+    pass
+
+def _map_observations(result: Any, function: Callable[[Any], Any]) -> Any:
+    #  function _map_observations {{{ # 
+    """
+    Applies `function` to each item of the observations in a TimeStep or a
+    result of "reset", "switch_task" or "step".
+    """
+
+    def _map(observation: Any) -> Any:
+        if isinstance(observation, dict):
+            return {k: function(v) for k, v in observation.items()}
+        return observation
+
+    if isinstance(result, interfaces.timestep.TimeStep):
+        return result._replace(observation=_map(result.observation))
+    if not isinstance(result, tuple) or len(result)!=2\
+            or not isinstance(result[0], interfaces.timestep.TimeStep):
+        return result
+
+    step: interfaces.timestep.TimeStep
+    final_observation: Any
+    step, final_observation = result
+    return step._replace(observation=_map(step.observation)), _map(final_observation)
+    #  }}} function _map_observations # 
+
+def _serialize_element(value: Any) -> Any:
+    if isinstance(value, lxml.etree._Element):
+        return _SerializedElement(lxml.etree.tostring(value))
+    return value
+def _deserialize_element(value: Any) -> Any:
+    if isinstance(value, _SerializedElement):
+        return lxml.etree.fromstring(value)
+    return value
+
+def _work( connection: multiprocessing.connection.Connection
+         , env_fn: EnvFn
+         , auto_reset: bool
+         ):
+    #  function _work {{{ # 
+    env: Optional[interfaces.env.Environment] = None
+    try:
+        env = env_fn()
+        connection.send(("ok", None))
+        while True:
+            command: str
+            args: Tuple[Any, ...]
+            kwargs: Dict[str, Any]
+            command, args, kwargs = connection.recv()
+            if command=="close":
+                break
+            try:
+                result: Any = _run(env, command, args, kwargs, auto_reset)
+                connection.send(("ok", _map_observations(result, _serialize_element)))
+            except Exception:
+                connection.send(("error", traceback.format_exc()))
+    except EOFError:
+        pass
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        if env is not None:
+            env.close()
+        connection.close()
+    #  }}} function _work # 
+
+def _receive(connection: multiprocessing.connection.Connection, index: int) -> Any:
+    #  function _receive {{{ # 
+    return _unpack(connection.recv(), index)
+    #  }}} function _receive # 
+
+def _unpack(reply: Tuple[str, Any], index: int) -> Any:
+    #  function _unpack {{{ # 
+    status: str
+    result: Any
+    status, result = reply
+    if status=="error":
+        raise RuntimeError("Environment worker {:d} failed:\n{:}".format(index, result))
+    return _map_observations(result, _deserialize_element)
+    #  }}} function _unpack # 
+#  }}} Process Workers # 
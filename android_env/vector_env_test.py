@@ -0,0 +1,148 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.vector_env."""
+
+import functools
+import os
+import tempfile
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_env import interfaces
+from android_env import vector_env
+import lxml.etree
+import numpy as np
+
+
+class _CountingEnv:
+  """Ends an episode after `episode_length` steps."""
+
+  def __init__(self, episode_length: int, closed_marker: str = ''):
+    self._episode_length = episode_length
+    self._closed_marker = closed_marker
+    self._step = 0
+    self.closed = False
+
+  def _observation(self):
+    return {
+        'pixels': np.full((2, 3, 3), self._step, dtype=np.uint8),
+        'view_hierarchy': lxml.etree.fromstring(
+            '<hierarchy step="{:d}" />'.format(self._step)),
+    }
+
+  def reset(self):
+    self._step = 0
+    return interfaces.timestep.restart(self._observation())
+
+  def switch_task(self, index):
+    del index
+    return self.reset()
+
+  def step(self, action):
+    if action < 0:
+      raise ValueError('Negative action.')
+    self._step += int(action)
+    if self._step >= self._episode_length:
+      return interfaces.timestep.success(1., self._observation())
+    return interfaces.timestep.transition(0., self._observation())
+
+  def observation_spec(self):
+    return {'pixels': (2, 3, 3)}
+
+  def close(self):
+    self.closed = True
+    # Tells the closing from other processes.
+    if self._closed_marker:
+      with open(self._closed_marker, 'w'):
+        pass
+
+
+def _broken_env():
+  raise ValueError('Broken environment.')
+
+
+class VectorAndroidEnvTest(parameterized.TestCase):
+
+  @parameterized.parameters(False, True)
+  def test_step_with_auto_reset(self, use_processes):
+    env = vector_env.VectorAndroidEnv(
+        [functools.partial(_CountingEnv, 1), functools.partial(_CountingEnv, 2)],
+        use_processes=use_processes)
+    self.addCleanup(env.close)
+    self.assertEqual({'pixels': (2, 3, 3)}, env.observation_spec())
+
+    step = env.reset()
+    np.testing.assert_array_equal([True, True], step.first())
+    self.assertEqual((2, 2, 3, 3), step.observation['pixels'].shape)
+    self.assertLen(step.observation['view_hierarchy'], 2)
+
+    step = env.step([1, 1])
+    np.testing.assert_array_equal([True, False], step.last())
+    np.testing.assert_array_equal([1., 0.], step.reward)
+    self.assertEqual([True, None], step.succeeds)
+    # The first environment restarts at once and keeps the last observation.
+    np.testing.assert_array_equal([0, 1], step.observation['pixels'][:, 0, 0, 0])
+    self.assertEqual(1, step.final_observation[0]['pixels'][0, 0, 0])
+    self.assertEqual(
+        '1', step.final_observation[0]['view_hierarchy'].get('step'))
+    self.assertIsNone(step.final_observation[1])
+
+    step = env.step([0, 1])
+    np.testing.assert_array_equal([False, True], step.last())
+
+  @parameterized.parameters(False, True)
+  def test_step_after_worker_error(self, use_processes):
+    env = vector_env.VectorAndroidEnv(
+        [functools.partial(_CountingEnv, 5)] * 2, use_processes=use_processes)
+    self.addCleanup(env.close)
+    env.reset()
+
+    # Raised as is by the threads and wrapped by the processes.
+    with self.assertRaises((ValueError, RuntimeError)):
+      env.step([-1, 1])
+    # The replies of the failed step are not mistaken for the next ones.
+    step = env.step([1, 1])
+    np.testing.assert_array_equal([1, 2], step.observation['pixels'][:, 0, 0, 0])
+    step = env.step([1, 1])
+    np.testing.assert_array_equal([2, 3], step.observation['pixels'][:, 0, 0, 0])
+
+  @parameterized.parameters(False, True)
+  def test_built_envs_closed_if_one_fails(self, use_processes):
+    marker = os.path.join(tempfile.mkdtemp(), 'closed')
+    with self.assertRaises((ValueError, RuntimeError)):
+      vector_env.VectorAndroidEnv(
+          [functools.partial(_CountingEnv, 1, marker), _broken_env],
+          use_processes=use_processes)
+    self.assertTrue(os.path.exists(marker))
+
+  def test_observations_of_different_shapes_listed(self):
+    observations = [{'pixels': np.zeros((2, 2))}, {'pixels': np.zeros((3, 2))}]
+    stacked = vector_env._stack(observations)
+    self.assertIsInstance(stacked['pixels'], list)
+    self.assertLen(stacked['pixels'], 2)
+
+  def test_call_and_close(self):
+    env = vector_env.VectorAndroidEnv([functools.partial(_CountingEnv, 1)] * 3)
+    envs = env._envs
+    self.assertLen(env.switch_task(0).reward, 3)
+    env.close()
+    self.assertTrue(all(e.closed for e in envs))
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,165 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.wrappers.image_rescale_wrapper."""
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_env import interfaces
+from android_env.interfaces import specs
+from android_env.wrappers import image_rescale_wrapper
+import numpy as np
+from PIL import Image
+
+
+class _FakeEnv:
+  """Returns the given screens one per step."""
+
+  def __init__(self, screens):
+    self._screens = list(screens)
+    self._shape = self._screens[0].shape
+
+  def observation_spec(self):
+    return {'pixels': specs.Array(
+        shape=self._shape, dtype=np.uint8, name='pixels')}
+
+  def reset(self):
+    return interfaces.timestep.restart({'pixels': self._screens.pop(0)})
+
+  def step(self, action):
+    del action
+    return interfaces.timestep.transition(0., {'pixels': self._screens.pop(0)})
+
+
+def _random_screen(shape, seed=0):
+  return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def _rescale(screen, zoom_factors, **kwargs):
+  env = image_rescale_wrapper.ImageRescaleWrapper(
+      _FakeEnv([screen]), zoom_factors=zoom_factors, **kwargs)
+  return env.reset().observation['pixels']
+
+
+def _area_reference(screen, out_height, out_width):
+  """Averages the covered pixels with float64 by brute force."""
+
+  def _coverage(in_size, out_size):
+    scale = in_size / out_size
+    start = np.arange(out_size)[:, None] * scale
+    pixels = np.arange(in_size)[None, :]
+    return np.clip(np.minimum(pixels + 1, start + scale)
+                   - np.maximum(pixels, start), 0, None) / scale
+
+  rows = _coverage(screen.shape[0], out_height)
+  columns = _coverage(screen.shape[1], out_width)
+  return np.einsum('ij,jkc,lk->ilc', rows, screen.astype(np.float64), columns)
+
+
+class ImageRescaleWrapperTest(parameterized.TestCase):
+
+  @parameterized.product(
+      resize_method=['pil', 'area', 'bilinear'], grayscale=[False, True])
+  def test_shape_and_dtype(self, resize_method, grayscale):
+    env = image_rescale_wrapper.ImageRescaleWrapper(
+        _FakeEnv([_random_screen((64, 48, 3))]), zoom_factors=(0.5, 0.25),
+        grayscale=grayscale, resize_method=resize_method)
+    pixels = env.reset().observation['pixels']
+    expected_shape = (32, 12, 1 if grayscale else 3)
+    self.assertEqual(expected_shape, pixels.shape)
+    self.assertEqual(np.uint8, pixels.dtype)
+    np.testing.assert_array_equal(expected_shape,
+                                  env.observation_spec()['pixels'].shape)
+
+  def test_area_matches_pil_box_at_integral_scale(self):
+    screen = _random_screen((64, 48, 3))
+    expected = np.array(Image.fromarray(screen).resize((24, 32), Image.BOX))
+    pixels = _rescale(screen, (0.5, 0.5), resize_method='area')
+    self.assertLessEqual(
+        np.abs(pixels.astype(np.int16) - expected).max(), 1)
+
+  @parameterized.parameters((0.625, 0.625), (0.33, 0.5), (1.5, 1.25))
+  def test_area_averages_covered_pixels(self, *zoom_factors):
+    screen = _random_screen((64, 48, 3))
+    pixels = _rescale(screen, zoom_factors, resize_method='area')
+    expected = _area_reference(screen, *pixels.shape[:2])
+    self.assertLessEqual(np.abs(pixels - expected).max(), 1.)
+
+  def test_bilinear_matches_pil_when_upscaling(self):
+    screen = _random_screen((32, 24, 3))
+    expected = np.array(
+        Image.fromarray(screen).resize((36, 48), Image.BILINEAR))
+    pixels = _rescale(screen, (1.5, 1.5), resize_method='bilinear')
+    self.assertLessEqual(
+        np.abs(pixels.astype(np.int16) - expected).max(), 1)
+
+  def test_bilinear_matches_pil_on_smooth_screen(self):
+    # Without fine details, skipping the antialiasing of PIL makes no
+    # difference when downscaling.
+    gradient = np.add.outer(np.arange(64), 2 * np.arange(48)).astype(np.uint8)
+    screen = np.stack([gradient] * 3, axis=-1)
+    expected = np.array(
+        Image.fromarray(screen).resize((17, 21), Image.BILINEAR))
+    pixels = _rescale(screen, (0.33, 0.36), resize_method='bilinear')
+    self.assertLessEqual(
+        np.abs(pixels.astype(np.int16) - expected).max(), 1)
+
+  def test_fixed_point_grayscale(self):
+    levels = np.append(np.arange(0, 256, 5), 255).astype(np.uint8)
+    screen = np.stack(
+        np.meshgrid(levels, levels, levels, indexing='ij'),
+        axis=-1).reshape((levels.size, -1, 3))
+    # The floating-point conversion used before.
+    expected = np.dot(
+        screen, image_rescale_wrapper.RGB_TO_GRAYSCALE_COEFFICIENTS).astype(
+            np.uint8)
+    pixels = _rescale(screen, None, grayscale=True)
+    self.assertEqual(screen.shape[:2] + (1,), pixels.shape)
+    self.assertLessEqual(
+        np.abs(pixels[..., 0].astype(np.int16) - expected).max(), 1)
+    self.assertEqual(255, _rescale(np.full((2, 2, 3), 255, dtype=np.uint8),
+                                   None, grayscale=True).min())
+
+  @parameterized.parameters(False, True)
+  def test_output_buffer_reuse(self, reuse_output_buffer):
+    screens = [_random_screen((64, 48, 3), seed) for seed in range(2)]
+    env = image_rescale_wrapper.ImageRescaleWrapper(
+        _FakeEnv(screens), resize_method='area',
+        reuse_output_buffer=reuse_output_buffer)
+    first = env.reset().observation['pixels']
+    first_copy = first.copy()
+    second = env.step(None).observation['pixels']
+
+    np.testing.assert_array_equal(
+        _rescale(screens[1], (0.5, 0.5), resize_method='area'), second)
+    if reuse_output_buffer:
+      # The former screen is overwritten by the next step.
+      self.assertIs(first, second)
+    else:
+      self.assertIsNot(first, second)
+      np.testing.assert_array_equal(first_copy, first)
+
+
+  def test_output_buffer_reuse_rejected_for_pil(self):
+    with self.assertRaises(AssertionError):
+      image_rescale_wrapper.ImageRescaleWrapper(
+          _FakeEnv([_random_screen((64, 48, 3))]), resize_method='pil',
+          reuse_output_buffer=True)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -19,16 +19,22 @@ Created by Danyang Zhang @X-Lance.
 from android_env.wrappers import base_wrapper
 from android_env.environment import AndroidEnv
 from android_env.components import action_type
-from typing import Dict, List
-from typing import Any
+from android_env import trajectory_store
+from typing import Dict, List, Tuple
+from typing import Any, Optional
 #from android_env.interfaces import specs
 from android_env.interfaces import timestep
 import os.path
 import lxml.etree
 import numpy as np
 import pickle as pkl
+import queue
+import threading
 
 #from absl import logging
+import logging
+
+logger = logging.getLogger("mobile_env.wrapper.recorder")
 
 # autosave at the reset time and episode end.
 
@@ -37,11 +43,49 @@ def is_real_action(action: action_type.ActionType) -> bool:
 
 class RecorderWrapper(base_wrapper.BaseWrapper):
     #  class `RecorderWrapper` {{{ # 
-    def __init__(self, env: AndroidEnv, dump_file: str):
+    def __init__( self, env: AndroidEnv, dump_file: str
+                , columnar: bool = False
+                , asynchronous: bool = False
+                , max_pending_trajectories: int = 4
+                ):
+        """
+        Args:
+            env (AndroidEnv): the environment to be wrapped
+            dump_file (str): the trajectories are pickled to
+              `<dump_file without extension>.<index>.pkl` one by one, or
+              appended to the trajectory store at the directory
+              `<dump_file without extension>` if `columnar` is set
+            columnar (bool): whether to save the trajectories into a
+              `trajectory_store` so that single steps can be loaded without
+              unpickling the whole trajectory
+            asynchronous (bool): whether to serialize the VHs and write the
+              trajectories in a background thread rather than in the step
+              thread. the thread writes the trajectories as they finish, and
+              `close` waits for the ones still queued and then raises the
+              errors of the writer, thus the wrapper should be closed
+              explicitly.
+            max_pending_trajectories (int): the number of the finished
+              trajectories waiting for the background writer. `step` blocks
+              at the end of an episode if the writer falls behind.
+        """
+
         super(RecorderWrapper, self).__init__(env)
 
         self._index: int = 0
         self.dump_file: str = os.path.splitext(dump_file)[0]
+        self._writer: Optional[trajectory_store.TrajectoryWriter] =\
+                trajectory_store.TrajectoryWriter(self.dump_file) if columnar else None
+
+        self._pending_trajectories: Optional[queue.Queue[Optional[Tuple[int, List[Dict[str, Any]]]]]] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        # indices of the trajectories failing to be written in background and
+        # the first error
+        self._failed_indices: List[int] = []
+        self._write_error: Optional[Exception] = None
+        if asynchronous:
+            self._pending_trajectories = queue.Queue(maxsize=max_pending_trajectories)
+            self._writer_thread = threading.Thread(target=self._write_pending_trajectories, daemon=True)
+            self._writer_thread.start()
 
         self.prev_type: action_type.ActionType = action_type.ActionType.LIFT
         self._buffer: Dict[str, Any] = {}
@@ -88,11 +132,8 @@ class RecorderWrapper(base_wrapper.BaseWrapper):
         if len(instruction)>0:
             record["instruction"] = instruction
         record["observation"] = timestep.observation["pixels"]
-        record["view_hierarchy"] = lxml.etree.tostring( timestep.observation["view_hierarchy"]
-                                                      , encoding="unicode"
-                                                      ) if "view_hierarchy" in timestep.observation\
-                                                       and timestep.observation["view_hierarchy"] is not None\
-                                                      else None
+        # serialized when the trajectory is written
+        record["view_hierarchy"] = timestep.observation.get("view_hierarchy")
         record["orientation"] = np.argmax(timestep.observation["orientation"])
         #self.current_trajectory.append(record)
         self._buffer = record
@@ -117,11 +158,7 @@ class RecorderWrapper(base_wrapper.BaseWrapper):
             record["task"] = self._env.task_name
             record["command"] = self._env.command()
             record["observation"] = timestep.observation["pixels"]
-            record["view_hierarchy"] = lxml.etree.tostring( timestep.observation["view_hierarchy"]
-                                                          , encoding="unicode"
-                                                          ) if "view_hierarchy" in timestep.observation\
-                                                           and timestep.observation["view_hierarchy"] is not None\
-                                                          else None
+            record["view_hierarchy"] = timestep.observation.get("view_hierarchy")
             record["orientation"] = np.argmax(timestep.observation["orientation"])
             #self.current_trajectory.append(record)
             self._buffer = record
@@ -134,19 +171,64 @@ class RecorderWrapper(base_wrapper.BaseWrapper):
     def close(self):
         #print("\x1b[31mCLOSE!\x1b[0m")
         self._save()
+        if self._writer_thread is not None:
+            # flush the pending trajectories
+            self._pending_trajectories.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+        if self._writer is not None:
+            self._writer.close()
         self._env.close()
+        if self._write_error is not None:
+            raise RuntimeError( "Failed to save trajectories {:}.".format(", ".join(map(str, self._failed_indices)))
+                              ) from self._write_error
 
     def _save(self):
         #  function `_save` {{{ # 
         if len(self._buffer)>0 and self.is_valid:
             self.current_trajectory.append(self._buffer)
-        if len(self.current_trajectory)>1:
-            with open(self.dump_file + ".{:d}.pkl".format(self._index), "ab") as f:
-                pkl.dump(self.current_trajectory, f)
+        if len(self.current_trajectory)>1 and self._pending_trajectories is not None:
+            self._pending_trajectories.put((self._index, self.current_trajectory))
+        elif len(self.current_trajectory)>1:
+            self._write(self._index, self.current_trajectory)
 
         self.current_trajectory = []
         self._buffer = {}
         self.is_valid = False
         self._index += 1
         #  }}} function `_save` # 
+
+    def _write(self, index: int, trajectory: List[Dict[str, Any]]):
+        #  function `_write` {{{ # 
+        # identical screens share one array, which pickle saves only once
+        frames: Dict[bytes, np.ndarray] = {}
+        for record in trajectory:
+            record["observation"] = frames.setdefault( trajectory_store.frame_digest(record["observation"])
+                                                     , record["observation"]
+                                                     )
+            if isinstance(record["view_hierarchy"], lxml.etree._Element):
+                record["view_hierarchy"] = lxml.etree.tostring( record["view_hierarchy"]
+                                                              , encoding="unicode"
+                                                              )
+        if self._writer is not None:
+            self._writer.append_episode(trajectory)
+        else:
+            with open(self.dump_file + ".{:d}.pkl".format(index), "ab") as f:
+                pkl.dump(trajectory, f)
+        #  }}} function `_write` # 
+
+    def _write_pending_trajectories(self):
+        #  function `_write_pending_trajectories` {{{ # 
+        while True:
+            pending: Optional[Tuple[int, List[Dict[str, Any]]]] = self._pending_trajectories.get()
+            if pending is None:
+                break
+            try:
+                self._write(*pending)
+            except Exception as e:
+                logger.exception("Failed to save trajectory %d.", pending[0])
+                self._failed_indices.append(pending[0])
+                if self._write_error is None:
+                    self._write_error = e
+        #  }}} function `_write_pending_trajectories` # 
     #  }}} class `RecorderWrapper` # 
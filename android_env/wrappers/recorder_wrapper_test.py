@@ -0,0 +1,164 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.wrappers.recorder_wrapper."""
+
+import os
+import pickle
+import tempfile
+import time
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from android_env import interfaces
+from android_env import trajectory_store
+from android_env.components import action_type
+from android_env.wrappers import recorder_wrapper
+import numpy as np
+
+
+class _FakeEnv:
+  """Ends an episode after two steps."""
+
+  task_id = 'task'
+  task_name = 'Task'
+
+  def __init__(self):
+    self._episode = 0
+    self._step = 0
+    self.closed = False
+
+  def _observation(self):
+    return {
+        'pixels': np.full((2, 3, 3), 10 * self._episode + self._step,
+                          dtype=np.uint8),
+        'orientation': np.array([1, 0, 0, 0], dtype=np.uint8),
+    }
+
+  def reset(self):
+    self._episode += 1
+    self._step = 0
+    return interfaces.timestep.restart(self._observation())
+
+  def step(self, action):
+    del action
+    self._step += 1
+    if self._step >= 2:
+      return interfaces.timestep.success(1., self._observation())
+    return interfaces.timestep.transition(0., self._observation())
+
+  def command(self):
+    return ['do it']
+
+  def task_instructions(self):
+    return []
+
+  def close(self):
+    self.closed = True
+
+
+def _play(env):
+  touch = {
+      'action_type': np.array(action_type.ActionType.TOUCH),
+      'touch_position': np.array([.5, .5]),
+  }
+  env.reset()
+  env.step(touch)
+  env.step(touch)
+
+
+def _wait_for_file(path, timeout=5.):
+  deadline = time.monotonic() + timeout
+  while not os.path.exists(path):
+    if time.monotonic() > deadline:
+      raise AssertionError('%s is not written in time.' % path)
+    time.sleep(.01)
+
+
+class RecorderWrapperTest(parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._dir = tempfile.mkdtemp()
+
+  def test_trajectory_written_in_step(self):
+    env = recorder_wrapper.RecorderWrapper(
+        _FakeEnv(), os.path.join(self._dir, 'run.pkl'))
+    _play(env)
+
+    # Written at the episode end without waiting for `close`. The reset
+    # counts as the end of an empty trajectory 0.
+    with open(os.path.join(self._dir, 'run.1.pkl'), 'rb') as f:
+      trajectory = pickle.load(f)
+    self.assertLen(trajectory, 3)
+    self.assertEqual('task', trajectory[0]['task_id'])
+    self.assertEqual(1., trajectory[-1]['reward'])
+    env.close()
+
+  def test_asynchronous_writes_flushed_on_close(self):
+    env = recorder_wrapper.RecorderWrapper(
+        _FakeEnv(), os.path.join(self._dir, 'run.pkl'), asynchronous=True,
+        max_pending_trajectories=1)
+    _play(env)
+    # Written by the thread as the episode ends rather than on `close`.
+    _wait_for_file(os.path.join(self._dir, 'run.1.pkl'))
+    for _ in range(2):
+      _play(env)
+    env.close()
+
+    # Each reset also ends an empty trajectory, which isn't written.
+    for episode, index in zip(range(1, 4), range(1, 6, 2)):
+      with open(os.path.join(self._dir, 'run.%d.pkl' % index), 'rb') as f:
+        trajectory = pickle.load(f)
+      np.testing.assert_array_equal(
+          [10 * episode, 10 * episode + 1, 10 * episode + 2],
+          [record['observation'][0, 0, 0] for record in trajectory])
+
+  @parameterized.parameters(False, True)
+  def test_columnar_store(self, asynchronous):
+    env = recorder_wrapper.RecorderWrapper(
+        _FakeEnv(), os.path.join(self._dir, 'run.pkl'), columnar=True,
+        asynchronous=asynchronous)
+    for _ in range(3):
+      _play(env)
+    env.close()
+
+    store = trajectory_store.TrajectoryStore(os.path.join(self._dir, 'run'))
+    self.addCleanup(store.close)
+    self.assertLen(store.episodes, 3)
+    self.assertLen(store, 9)
+    # The episodes are stored in order.
+    np.testing.assert_array_equal(
+        [10, 11, 12, 20, 21, 22, 30, 31, 32],
+        [store[i]['observation'][0, 0, 0] for i in range(len(store))])
+    self.assertEqual('task', store[3]['task_id'])
+    np.testing.assert_array_equal([0., 0., 1.] * 3, store.steps['reward'])
+
+  def test_write_error_raised_on_close(self):
+    fake_env = _FakeEnv()
+    env = recorder_wrapper.RecorderWrapper(
+        fake_env, os.path.join(self._dir, 'missing', 'run.pkl'),
+        asynchronous=True)
+    _play(env)
+
+    with self.assertRaisesRegex(RuntimeError, 'trajectories 1'):
+      env.close()
+    self.assertTrue(fake_env.closed)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -28,6 +28,7 @@ from android_env.interfaces.env import Environment
 from android_env.components import action_type
 
 import enum
+import copy
 from transformers import PreTrainedTokenizer
 import numpy as np
 import lxml.etree
@@ -163,6 +164,9 @@ class VhIoWrapper(base_wrapper.BaseWrapper):
         super(VhIoWrapper, self).__init__(env)
 
         self._bbox_list: List[List[int]] = [] # bboxes are saved as [x0, y0, x1, y1]
+        # the VH tree `self._bbox_list` is filtered from; the controller
+        # returns the same tree for an unchanged VH
+        self._filtered_view_hierarchy: Optional[lxml.etree._Element] = None
         self._instructions: List[str] = []
 
         self._tokenizer: PreTrainedTokenizer = tokenizer
@@ -360,8 +364,14 @@ class VhIoWrapper(base_wrapper.BaseWrapper):
                     return timestep._replace(reward=total_reward)
                 retry_counter -= retry_delta
 
-        if timestep.observation["view_hierarchy"] is not None:
-            self._bbox_list: List[List[int]] = self._filter_elements(timestep.observation["view_hierarchy"])[1]
+        view_hierarchy: Optional[lxml.etree._Element] = timestep.observation["view_hierarchy"]
+        if view_hierarchy is not None\
+                and view_hierarchy is not self._filtered_view_hierarchy:
+            # the tree is shared with the other consumers and reused by the
+            # controller for an unchanged VH, thus it is filtered as a copy
+            # as `filter_elements` may modify it
+            self._bbox_list: List[List[int]] = self._filter_elements(copy.deepcopy(view_hierarchy))[1]
+            self._filtered_view_hierarchy = view_hierarchy
         return timestep._replace(reward=total_reward)
         #  }}} method _process_timestep # 
 
@@ -0,0 +1,63 @@
+# coding=utf-8
+# Copyright 2023 SJTU X-Lance Lab
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#     http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Created by Danyang Zhang @X-Lance.
+
+"""Tests for android_env.wrappers.vh_io_wrapper."""
+
+from absl.testing import absltest
+from android_env import interfaces
+from android_env.wrappers import vh_io_wrapper
+import lxml.etree
+import mock
+
+_VIEW_HIERARCHY = b"""<hierarchy>
+  <node clickable="true" long-clickable="false" bounds="[0,0][100,100]">
+    <node clickable="false" long-clickable="false" bounds="[10,10][50,50]" />
+  </node>
+</hierarchy>"""
+
+
+class VhIoWrapperTest(absltest.TestCase):
+
+  def _timestep(self, view_hierarchy):
+    return interfaces.timestep.transition(
+        0., {'view_hierarchy': view_hierarchy})
+
+  def test_shared_view_hierarchy_not_modified(self):
+    view_hierarchy = lxml.etree.fromstring(_VIEW_HIERARCHY)
+    original = lxml.etree.tostring(view_hierarchy)
+    env = vh_io_wrapper.VhIoWrapper(mock.MagicMock(), tokenizer=None)
+
+    env._process_timestep(self._timestep(view_hierarchy))
+    self.assertEqual([[10, 10, 50, 50]], env._bbox_list)
+    # The controller returns the same tree for an unchanged VH.
+    env._process_timestep(self._timestep(view_hierarchy))
+    self.assertEqual(original, lxml.etree.tostring(view_hierarchy))
+
+  def test_unchanged_view_hierarchy_filtered_once(self):
+    view_hierarchy = lxml.etree.fromstring(_VIEW_HIERARCHY)
+    filter_elements = mock.MagicMock(return_value=([], [[0, 0, 1, 1]]))
+    env = vh_io_wrapper.VhIoWrapper(
+        mock.MagicMock(), tokenizer=None, filter_elements=filter_elements)
+
+    for _ in range(2):
+      env._process_timestep(self._timestep(view_hierarchy))
+    filter_elements.assert_called_once()
+    self.assertIsNot(view_hierarchy, filter_elements.call_args[0][0])
+
+
+if __name__ == '__main__':
+  absltest.main()